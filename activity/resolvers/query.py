@@ -10,7 +10,9 @@ from django.db.models.functions import Coalesce
 from core.constances import ORDER_BY, ORDER_DIRECTION, COULD_NOT_ORDER_BY_START_DATE, COULD_NOT_USE_EVENT_FILTER
 from core.resolvers.query_entities import conditional_tags_filter, conditional_tag_lists_filter
 from core.resolvers import query_entity_filters as filters
-from event.lib import complement_expected_range
+from core.resolvers.cursor_pagination import EntityCursor, cached_count
+from core.resolvers.loaders import prime_entity_loaders
+from event.lib import schedule_expected_range
 
 query = ObjectType("Query")
 
@@ -22,8 +24,11 @@ class TextPageEntityFilter(filters.PageEntityFilter):
     def add(self, query):
         query.add(~Q(page__isnull=True) & Q(page__page_type='text'), Q.OR)
 
+    def add_subtype(self, query):
+        query.add(Q(subtype=self.key) & Q(page__page_type='text'), Q.OR)
 
-def conditional_subtypes_filter(subtypes):
+
+def conditional_subtypes_filter(subtypes, use_subtype=False):
     query = Q()
 
     for entity_filter in [filters.NewsEntityFilter,
@@ -34,7 +39,7 @@ def conditional_subtypes_filter(subtypes):
                           filters.QuestionEntityFilter,
                           filters.WikiEntityFilter,
                           TextPageEntityFilter]:
-        entity_filter().add_if_applicable(query, subtypes)
+        entity_filter(use_subtype).add_if_applicable(query, subtypes)
 
     return query
 
@@ -83,12 +88,16 @@ def resolve_activities(
         orderDirection=ORDER_DIRECTION.desc,
         sortPinned=False,
         statusPublished=None,
-        userGuid=None
+        userGuid=None,
+        after=None
 ):
     # pylint: disable=unused-argument
     # pylint: disable=too-many-arguments
     # pylint: disable=too-many-locals
     # pylint: disable=too-many-branches
+    # pylint: disable=too-many-statements
+
+    cursor = EntityCursor(after, orderBy, orderDirection, sortPinned) if after is not None else None
 
     if orderBy == ORDER_BY.timeUpdated:
         order_by = 'updated_at'
@@ -140,7 +149,7 @@ def resolve_activities(
     else:
         qs = Entity.objects.visible(info.context["request"].user)
 
-    qs = qs.filter(conditional_subtypes_filter(subtypes) &
+    qs = qs.filter(conditional_subtypes_filter(subtypes, use_subtype=bool(cursor)) &
                    conditional_tags_filter(tags, matchStrategy == 'any') &
                    conditional_tag_lists_filter(tagCategories, matchStrategy != 'all') &
                    conditional_group_filter(containerGuid) &
@@ -157,13 +166,18 @@ def resolve_activities(
 
     if subtypes == ['event']:
         qs2 = deepcopy(qs).annotate(start_date=F('event__start_date'))
-        complement_expected_range(qs2, offset, limit)
+        schedule_expected_range(qs2, 0 if cursor else offset, limit)
 
-    qs = qs.order_by(*order).select_subclasses()
-
-    total = qs.count()
+    next_cursor = None
+    if cursor:
+        total = cached_count(qs)
+        qs, next_cursor = cursor.page(cursor.filter(qs), limit)
+    else:
+        qs = qs.order_by(*order).select_subclasses()
+        total = qs.count()
+        qs = list(qs[offset:offset + limit])
 
-    qs = qs[offset:offset + limit]
+    prime_entity_loaders(info, qs)
 
     activities = []
 
@@ -178,5 +192,6 @@ def resolve_activities(
 
     return {
         'total': total,
-        'edges': activities
+        'edges': activities,
+        'cursor': next_cursor,
     }
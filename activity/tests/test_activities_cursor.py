@@ -0,0 +1,89 @@
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from blog.models import Blog
+from core.constances import ACCESS_TYPE, COULD_NOT_USE_CURSOR, INVALID_CURSOR
+from core.models import Entity
+from core.tests.helpers import PleioTenantTestCase
+from news.models import News
+from user.factories import UserFactory
+
+
+class ActivitiesCursorTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = UserFactory()
+        now = timezone.now()
+        self.blogs = [mixer.blend(Blog,
+                                  owner=self.user,
+                                  read_access=[ACCESS_TYPE.public],
+                                  published=now - timezone.timedelta(hours=n % 3))
+                      for n in range(7)]
+        self.news = mixer.blend(News,
+                                owner=self.user,
+                                read_access=[ACCESS_TYPE.public],
+                                published=now - timezone.timedelta(days=1))
+
+        self.query = """
+            query ActivityList($subtypes: [String], $limit: Int, $after: String, $orderBy: OrderBy, $sortPinned: Boolean) {
+                activities(subtypes: $subtypes, limit: $limit, after: $after, orderBy: $orderBy, sortPinned: $sortPinned) {
+                    total
+                    cursor
+                    edges {
+                        entity {
+                            guid
+                        }
+                    }
+                }
+            }
+        """
+
+    def fetch_all(self, **variables):
+        guids = []
+        after = ""
+        while after is not None:
+            result = self.graphql_client.post(self.query, {"limit": 3, "after": after, **variables})
+            activities = result["data"]["activities"]
+            guids.extend(edge["entity"]["guid"] for edge in activities["edges"])
+            after = activities["cursor"]
+        return guids, activities["total"]
+
+    def test_subtype_is_stored(self):
+        self.assertEqual(Entity.objects.get(id=self.blogs[0].id).subtype, 'blog')
+        self.assertEqual(Entity.objects.get(id=self.news.id).subtype, 'news')
+
+    def test_subtype_is_kept_when_saving_base_entity(self):
+        entity = Entity.objects.get(id=self.blogs[0].id)
+        entity.is_pinned = True
+        entity.save()
+
+        self.assertEqual(Entity.objects.get(id=self.blogs[0].id).subtype, 'blog')
+        guids, _ = self.fetch_all(subtypes=["blog"])
+        self.assertIn(self.blogs[0].guid, guids)
+
+    def test_walk_all_pages(self):
+        guids, total = self.fetch_all(subtypes=["blog"])
+
+        expected = [e.guid for e in sorted(self.blogs, key=lambda e: (e.published, e.id), reverse=True)]
+        self.assertEqual(guids, expected)
+        self.assertEqual(total, 7)
+
+    def test_walk_all_pages_sort_pinned(self):
+        self.news.is_pinned = True
+        self.news.save()
+
+        guids, total = self.fetch_all(sortPinned=True, orderBy="lastAction")
+
+        self.assertEqual(guids[0], self.news.guid)
+        self.assertEqual(len(set(guids)), 8)
+        self.assertEqual(total, 8)
+
+    def test_cursor_needs_date_ordering(self):
+        with self.assertGraphQlError(COULD_NOT_USE_CURSOR):
+            self.graphql_client.post(self.query, {"after": "", "orderBy": "title"})
+
+    def test_invalid_cursor(self):
+        with self.assertGraphQlError(INVALID_CURSOR):
+            self.graphql_client.post(self.query, {"after": "not-a-cursor"})
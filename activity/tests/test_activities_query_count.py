@@ -0,0 +1,90 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+
+from blog.models import Blog
+from core.constances import ACCESS_TYPE
+from core.models import Group
+from core.tests.helpers import PleioTenantTestCase
+from user.factories import UserFactory
+
+
+class ActivitiesQueryCountTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.owner = UserFactory()
+        self.user = UserFactory()
+        self.group = mixer.blend(Group, owner=self.owner)
+        self.group.join(self.owner, 'owner')
+        self.group.join(self.user, 'member')
+
+        self.query = """
+            query ActivityList($limit: Int) {
+                activities(limit: $limit) {
+                    total
+                    edges {
+                        guid
+                        entity {
+                            guid
+                            ... on Blog {
+                                title
+                                votes
+                                hasVoted
+                                isBookmarked
+                                isFollowing
+                                views
+                                writeAccessId
+                                owner {
+                                    guid
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        """
+
+    def create_blogs(self, amount):
+        for n in range(amount):
+            blog = Blog.objects.create(
+                title="Blog %s" % n,
+                owner=UserFactory(),
+                group=self.group if n % 2 else None,
+                read_access=[ACCESS_TYPE.public],
+                write_access=[ACCESS_TYPE.group.format(self.group.id)],
+            )
+            blog.add_vote(self.user, 1)
+            blog.add_bookmark(self.user)
+
+    def count_queries(self):
+        self.graphql_client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            result = self.graphql_client.post(self.query, {"limit": 100})
+        return len(context.captured_queries), result
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.create_blogs(3)
+        small_page, result = self.count_queries()
+        self.assertEqual(result["data"]["activities"]["total"], 3)
+
+        self.create_blogs(12)
+        large_page, result = self.count_queries()
+        self.assertEqual(result["data"]["activities"]["total"], 15)
+
+        self.assertEqual(small_page, large_page)
+
+    def test_batched_values(self):
+        self.create_blogs(4)
+
+        _, result = self.count_queries()
+
+        for edge in result["data"]["activities"]["edges"]:
+            entity = edge["entity"]
+            self.assertEqual(entity["votes"], 1)
+            self.assertTrue(entity["hasVoted"])
+            self.assertTrue(entity["isBookmarked"])
+            self.assertFalse(entity["isFollowing"])
+            self.assertEqual(entity["views"], 0)
+            self.assertIsNotNone(entity["owner"]["guid"])
@@ -31,6 +31,12 @@ beat_schedule = {
         'task': 'control.tasks.update_elasticsearch_status',
         'schedule': crontab(minute=30, hour=6)
     },
+    'flush_view_counts': {
+        'task': 'core.tasks.cronjobs.dispatch_task',
+        'schedule': crontab(minute='*/5'),
+        'args': ['core.tasks.cronjobs.flush_view_counts'],
+        'kwargs': {'spread': 4 * 60},
+    },
     'process_range_events': {
         'task': 'event.tasks.process_range_events',
         'schedule': crontab(hour=3, minute=30),
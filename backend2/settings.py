@@ -68,6 +68,16 @@ ELASTICSEARCH_DSL_INDEX_SETTINGS = {'number_of_shards': 1,
 
 ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'core.elasticsearch.CustomSignalProcessor'
 
+# Changes are collected for this many seconds before they are sent to the index in bulk
+ELASTICSEARCH_INDEX_QUEUE_WINDOW = int(os.getenv('ELASTICSEARCH_INDEX_QUEUE_WINDOW', '10'))
+ELASTICSEARCH_INDEX_QUEUE_BATCH_SIZE = int(os.getenv('ELASTICSEARCH_INDEX_QUEUE_BATCH_SIZE', '1000'))
+
+# Seconds a search result is reused for the same query, filters and access rights
+SEARCH_RESULT_CACHE_TIMEOUT = int(os.getenv('SEARCH_RESULT_CACHE_TIMEOUT', '30'))
+
+# Number of tenants that are indexed at the same time during a full rebuild
+ELASTICSEARCH_REBUILD_CONCURRENCY = int(os.getenv('ELASTICSEARCH_REBUILD_CONCURRENCY', '4'))
+
 EMAIL_DISABLED = os.getenv('EMAIL_DISABLED') == 'True'
 
 FROM_EMAIL = os.getenv('FROM_EMAIL')
@@ -182,6 +192,8 @@ MIDDLEWARE = [
 ]
 
 TENANT_MIDDLEWARE = [
+    'core.middleware.ConfigSnapshotMiddleware',
+    'core.middleware.AccessContextMiddleware',
     'core.middleware.TenantPrimaryDomainRedirectMiddleware',
     'core.middleware.CustomLocaleMiddleware',
     'core.middleware.AnonymousVisitorSessionMiddleware',
@@ -336,6 +348,26 @@ DEFAULT_FILE_STORAGE = "django_tenants.files.storage.TenantFileSystemStorage"
 MEDIA_ROOT = os.getenv("MEDIA_ROOT") if os.getenv("MEDIA_ROOT") else os.path.join(BASE_DIR, 'media/')
 BACKUP_PATH = os.getenv("BACKUP_PATH") if os.getenv("BACKUP_PATH") else os.path.join(MEDIA_ROOT, 'backups/')
 
+# Hand authorized file downloads to the front proxy instead of streaming them through Django.
+# FILE_OFFLOAD_HEADER is X-Accel-Redirect (nginx) or X-Sendfile (apache/lighttpd). For X-Accel-Redirect
+# FILE_OFFLOAD_PREFIX is the internal location that maps to MEDIA_ROOT, X-Sendfile gets the absolute path.
+FILE_OFFLOAD_HEADER = os.getenv("FILE_OFFLOAD_HEADER", "")
+FILE_OFFLOAD_PREFIX = os.getenv("FILE_OFFLOAD_PREFIX", "/protected/")
+
+# Votes of the last LEADERBOARD_WINDOW_DAYS count for the trending tags and top users,
+# that are cached for LEADERBOARD_CACHE_TIMEOUT seconds.
+LEADERBOARD_WINDOW_DAYS = int(os.getenv("LEADERBOARD_WINDOW_DAYS", "30"))
+LEADERBOARD_CACHE_TIMEOUT = int(os.getenv("LEADERBOARD_CACHE_TIMEOUT", "300"))
+
+# Number of tenants that run the same cron job at the same time.
+CRON_MAX_CONCURRENT_TENANTS = int(os.getenv("CRON_MAX_CONCURRENT_TENANTS", "8"))
+
+# Avatars downloaded at the same time by an avatar export, and at most from one host.
+AVATAR_EXPORT_CONCURRENCY = int(os.getenv("AVATAR_EXPORT_CONCURRENCY", "16"))
+AVATAR_EXPORT_CONNECTIONS_PER_HOST = int(os.getenv("AVATAR_EXPORT_CONNECTIONS_PER_HOST", "8"))
+# (connect, read) timeout in seconds
+AVATAR_EXPORT_TIMEOUT = (5, 60)
+
 DATABASE_ROUTERS = (
     'django_tenants.routers.TenantSyncRouter',
     'backend2.dbrouter.PrimaryReplicaRouter',
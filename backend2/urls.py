@@ -8,6 +8,7 @@ from ariadne_django.views import GraphQLView
 from ariadne.contrib.tracing.opentracing import OpenTracingExtensionSync
 from .schema import schema
 
+from core.resolvers.loaders import graphql_context
 from core.sitemaps import sitemaps
 from core import superadmin_views as core_superadmin
 from core import views as core_views
@@ -44,7 +45,7 @@ urlpatterns = [
     path('superadmin/support_contract', core_superadmin.SupportContract.as_view()),
     path('superadmin/agreements', core_superadmin.agreements),
     path('superadmin/meetings', core_superadmin.meetings_settings, name='superadmin_meetings_settings'),
-    path('graphql', GraphQLView.as_view(schema=schema, extensions=[OpenTracingExtensionSync], introspection=settings.DEBUG), name='graphql'),
+    path('graphql', GraphQLView.as_view(schema=schema, context_value=graphql_context, extensions=[OpenTracingExtensionSync], introspection=settings.DEBUG), name='graphql'),
 
     path('file/download/<uuid:file_id>', file_views.download, name='download'),
     path('file/download/<uuid:file_id>/<str:file_name>', file_views.download, name='download'),
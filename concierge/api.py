@@ -19,8 +19,8 @@ def sync_site():
     return client.post(UPDATE_ORIGIN_SITE_URL, {f"origin_site_{key}": value for key, value in tenant_summary().items()})
 
 
-def fetch_avatar(user: User):
-    client = ConciergeClient("fetch_avatar")
+def fetch_avatar(user: User, session=None):
+    client = ConciergeClient("fetch_avatar", session)
     return client.fetch(FETCH_AVATAR_URL.format(user.email))
 
 
@@ -105,14 +105,15 @@ class ApiTokenData:
 
 
 class ConciergeClient:
-    def __init__(self, resource_id):
+    def __init__(self, resource_id, session=None):
         self.method = resource_id
         self.response = None
+        self.session = session or requests
 
     def fetch(self, resource):
         self.response = None
         try:
-            self.response = requests.get(get_account_url(resource), headers={
+            self.response = self.session.get(get_account_url(resource), headers={
                 'x-oidc-client-id': settings.OIDC_RP_CLIENT_ID,
                 'x-oidc-client-secret': settings.OIDC_RP_CLIENT_SECRET,
             }, timeout=30)
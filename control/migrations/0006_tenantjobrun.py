@@ -0,0 +1,35 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0008_groupcopy_copy_members'),
+        ('control', '0005_fileoperationlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantJobRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=255)),
+                ('task', models.CharField(max_length=255)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('duration', models.FloatField(default=0)),
+                ('rows', models.IntegerField(null=True)),
+                ('success', models.BooleanField(default=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_runs', to='tenants.client')),
+            ],
+            options={
+                'ordering': ('-started_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tenantjobrun',
+            index=models.Index(fields=['task', 'started_at'], name='tenant_job_run_task_idx'),
+        ),
+    ]
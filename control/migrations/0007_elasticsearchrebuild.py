@@ -0,0 +1,47 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0008_groupcopy_copy_members'),
+        ('control', '0006_tenantjobrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ElasticsearchRebuild',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.CharField(max_length=32, unique=True)),
+                ('indexes', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('swapped_at', models.DateTimeField(null=True)),
+                ('cancelled_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ElasticsearchRebuildStep',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.CharField(max_length=255)),
+                ('state', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('done', 'done'), ('failed', 'failed')], default='pending', max_length=16)),
+                ('documents', models.IntegerField(default=0)),
+                ('errors', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField(null=True)),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='elasticsearch_rebuild_steps', to='tenants.client')),
+                ('rebuild', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='steps', to='control.elasticsearchrebuild')),
+            ],
+            options={
+                'ordering': ('id',),
+                'unique_together': {('rebuild', 'index', 'client')},
+            },
+        ),
+    ]
@@ -3,7 +3,7 @@ import uuid
 
 from enum import Enum
 from celery import signature, chain
-from django.db import models
+from django.db import models, transaction
 from django.forms import Select, TextInput
 from django.utils import timezone
 from django.utils.module_loading import import_string
@@ -219,3 +219,166 @@ class FileOperationLog(models.Model):
     client = models.ForeignKey('tenants.Client', null=True, on_delete=models.CASCADE, related_name='file_operation_log')
     operation = models.CharField(max_length=255)
     result = models.JSONField(default=dict)
+
+
+class TenantJobRunManager(models.Manager):
+
+    def record(self, schema_name, job, task, started_at, duration, rows=None, error=''):
+        with schema_context('public'):
+            return self.create(client=Client.objects.get(schema_name=schema_name),
+                               job=job,
+                               task=task,
+                               started_at=started_at,
+                               duration=duration,
+                               rows=rows,
+                               success=not error,
+                               error=error)
+
+    def idle_clients(self, task, since):
+        """
+        Clients where every run of the task since the given moment completed without processing any rows
+        """
+        runs = self.get_queryset().filter(task=task, started_at__gte=since) \
+            .order_by() \
+            .values('client_id') \
+            .annotate(total=models.Count('id'),
+                      idle=models.Count('id', filter=models.Q(success=True, rows=0)))
+        return {run['client_id'] for run in runs if run['total'] == run['idle']}
+
+    def summary(self, since):
+        return self.get_queryset().filter(started_at__gte=since) \
+            .order_by() \
+            .values('job', 'task') \
+            .annotate(runs=models.Count('id'),
+                      failures=models.Count('id', filter=models.Q(success=False)),
+                      rows=models.Sum('rows'),
+                      average_duration=models.Avg('duration'),
+                      max_duration=models.Max('duration'),
+                      last_run=models.Max('started_at')) \
+            .order_by('job', 'task')
+
+
+class TenantJobRun(models.Model):
+    class Meta:
+        ordering = ('-started_at',)
+        indexes = [
+            models.Index(fields=['task', 'started_at'], name='tenant_job_run_task_idx'),
+        ]
+
+    objects = TenantJobRunManager()
+
+    client = models.ForeignKey('tenants.Client', on_delete=models.CASCADE, related_name='job_runs')
+    job = models.CharField(max_length=255)
+    task = models.CharField(max_length=255)
+    started_at = models.DateTimeField(default=timezone.now)
+    duration = models.FloatField(default=0)
+    rows = models.IntegerField(null=True)
+    success = models.BooleanField(default=True)
+    error = models.TextField(blank=True, default='')
+
+
+class ElasticsearchRebuildManager(models.Manager):
+
+    def active(self):
+        return self.get_queryset().filter(swapped_at__isnull=True, cancelled_at__isnull=True).first()
+
+    def start(self, index_names, clients):
+        version = timezone.now().strftime('%Y%m%d%H%M%S')
+        rebuild = self.create(version=version, indexes=index_names)
+        ElasticsearchRebuildStep.objects.bulk_create([
+            ElasticsearchRebuildStep(rebuild=rebuild, index=index_name, client=client)
+            for index_name in index_names
+            for client in clients
+        ])
+        return rebuild
+
+
+class ElasticsearchRebuild(models.Model):
+    class Meta:
+        ordering = ('-created_at',)
+
+    objects = ElasticsearchRebuildManager()
+
+    version = models.CharField(max_length=32, unique=True)
+    indexes = models.JSONField(default=list)
+    created_at = models.DateTimeField(default=timezone.now)
+    swapped_at = models.DateTimeField(null=True)
+    cancelled_at = models.DateTimeField(null=True)
+
+    def index_name(self, alias):
+        return "%s_%s" % (alias, self.version)
+
+    def progress(self):
+        steps = self.steps.order_by() \
+            .values('state') \
+            .annotate(count=models.Count('id'), documents=models.Sum('documents'), errors=models.Sum('errors'))
+        states = {row['state']: row for row in steps}
+        return {
+            "version": self.version,
+            "indexes": self.indexes,
+            "created_at": self.created_at,
+            "swapped_at": self.swapped_at,
+            "steps": sum(row['count'] for row in states.values()),
+            **{state: states[state]['count'] if state in states else 0
+               for state, _ in ElasticsearchRebuildStep.STATE_TYPES},
+            "documents": sum(row['documents'] or 0 for row in states.values()),
+            "errors": sum(row['errors'] or 0 for row in states.values()),
+        }
+
+
+class ElasticsearchRebuildStepManager(models.Manager):
+
+    def claim(self, rebuild):
+        """
+        Take the next pending step of the rebuild; concurrent workers never get the same step.
+        """
+        with transaction.atomic():
+            step = self.get_queryset() \
+                .select_for_update(skip_locked=True) \
+                .filter(rebuild=rebuild, state='pending') \
+                .order_by('id') \
+                .first()
+            if step:
+                step.state = 'running'
+                step.started_at = timezone.now()
+                step.save(update_fields=['state', 'started_at'])
+        return step
+
+    def reset(self, rebuild):
+        """ Steps that were interrupted or failed are picked up again """
+        return self.get_queryset() \
+            .filter(rebuild=rebuild, state__in=['running', 'failed']) \
+            .update(state='pending', started_at=None, finished_at=None)
+
+
+class ElasticsearchRebuildStep(models.Model):
+    STATE_TYPES = (
+        ('pending', 'pending'),
+        ('running', 'running'),
+        ('done', 'done'),
+        ('failed', 'failed'),
+    )
+
+    class Meta:
+        ordering = ('id',)
+        unique_together = ('rebuild', 'index', 'client')
+
+    objects = ElasticsearchRebuildStepManager()
+
+    rebuild = models.ForeignKey('control.ElasticsearchRebuild', on_delete=models.CASCADE, related_name='steps')
+    index = models.CharField(max_length=255)
+    client = models.ForeignKey('tenants.Client', on_delete=models.CASCADE, related_name='elasticsearch_rebuild_steps')
+    state = models.CharField(max_length=16, choices=STATE_TYPES, default='pending')
+    documents = models.IntegerField(default=0)
+    errors = models.IntegerField(default=0)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+    error = models.TextField(blank=True, default='')
+
+    def finish(self, documents, errors, error=''):
+        self.state = 'failed' if error else 'done'
+        self.documents = documents
+        self.errors = errors
+        self.error = error
+        self.finished_at = timezone.now()
+        self.save(update_fields=['state', 'documents', 'errors', 'error', 'finished_at'])
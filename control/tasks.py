@@ -21,7 +21,7 @@ from control.lib import get_full_url, reverse
 from control.models import AccessLog, AccessCategory
 from control.utils.group_copy import GroupCopyRunner
 from core import config
-from core.elasticsearch import elasticsearch_status_report
+from core.elasticsearch import elasticsearch_status_report, index_queue_stats
 from core.exceptions import ExceptionDuringQueryIndex, UnableToTestIndex
 from core.lib import test_elasticsearch_index
 from core.utils.export import compress_path
@@ -437,7 +437,8 @@ def update_elasticsearch_status_for_tenant(client_id):
             }
         try:
             index_status_result = {
-                "result": elasticsearch_status_report(report_on_alert=True)
+                "result": elasticsearch_status_report(report_on_alert=True),
+                "queue": index_queue_stats(),
             }
         except Exception as e:
             index_status_result = {"exception": e.__class__,
@@ -0,0 +1,39 @@
+from http import HTTPStatus
+
+from control.models import TenantJobRun
+from control.tests.helpers import Control as _
+
+
+class TestViewCronRunsTestCase(_.BaseTestCase):
+
+    def test_anonymous_visitor(self):
+        response = self.client.get(_.reverse('cron_runs'))
+
+        self.assertNotEqual(response.status_code, HTTPStatus.OK)
+        self.assertTemplateNotUsed(response, "tools/cron_runs.html")
+
+    def test_view_cron_runs(self):
+        TenantJobRun.objects.create(client=self.public_tenant,
+                                    job='hourly',
+                                    task='core.tasks.cronjobs.send_notifications',
+                                    duration=1.5,
+                                    rows=10)
+        TenantJobRun.objects.create(client=self.public_tenant,
+                                    job='hourly',
+                                    task='core.tasks.cronjobs.send_notifications',
+                                    duration=0.5,
+                                    success=False,
+                                    error="Exception: failed")
+
+        self.client.force_login(self.admin)
+        response = self.client.get(_.reverse('cron_runs'))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTemplateUsed(response, "tools/cron_runs.html")
+
+        summary, = response.context['summary']
+        self.assertEqual(summary['runs'], 2)
+        self.assertEqual(summary['failures'], 1)
+        self.assertEqual(summary['rows'], 10)
+        self.assertEqual(summary['max_duration'], 1.5)
+        self.assertEqual(len(response.context['failures']), 1)
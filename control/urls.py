@@ -21,4 +21,5 @@ urlpatterns = [
     path('tools/elasticsearch/<int:client_id>/<int:record_id>', views.elasticsearch_status_details, name='elasticsearch_status'),
     path('tools/elasticsearch/<int:client_id>', views.elasticsearch_status_details, name='elasticsearch_status'),
     path('tools/elasticsearch', views.elasticsearch_status, name='elasticsearch_status'),
+    path('tools/cron', views.cron_runs, name='cron_runs'),
 ]
@@ -14,6 +14,7 @@ from django.contrib import messages, auth
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
 from django.http import FileResponse, HttpResponseNotFound, StreamingHttpResponse
 from django.shortcuts import render, redirect, reverse
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from django.views.decorators.http import require_http_methods
 
@@ -21,7 +22,7 @@ from control.lib import get_full_url, schema_config
 from core.lib import get_full_url as subsite_url
 from control.utils.backup import schedule_backup
 from tenants.models import Client, Agreement, AgreementVersion
-from control.models import AccessLog, AccessCategory, SiteFilter, Task, ElasticsearchStatus
+from control.models import AccessLog, AccessCategory, SiteFilter, Task, ElasticsearchStatus, TenantJobRun, ElasticsearchRebuild
 from control.forms import AddSiteForm, DeleteSiteForm, ConfirmSiteBackupForm, SearchUserForm, AgreementAddForm, AgreementAddVersionForm
 from core.models import SiteStat
 from user.models import User
@@ -485,9 +486,12 @@ def elasticsearch_status(request):
             status['details_url'] = reverse("elasticsearch_status", args=[client.id])
         rows.append(status)
 
+    rebuild = ElasticsearchRebuild.objects.first()
+
     # render summary of all sites with elasticsearch issues
     return render(request, "tools/elasticsearch_summary.html", {
-        'rows': rows
+        'rows': rows,
+        'rebuild': rebuild.progress() if rebuild else None,
     })
 
 
@@ -518,3 +522,19 @@ def elasticsearch_status_details(request, client_id, record_id=None):
 
     # render elasticsearch status of one site
     return render(request, "tools/elasticsearch_details.html", context)
+
+
+@login_required
+@user_passes_test(is_admin)
+def cron_runs(request):
+    since = timezone.now() - timezone.timedelta(days=1)
+
+    context = {
+        'since': since,
+        'summary': TenantJobRun.objects.summary(since),
+        'failures': TenantJobRun.objects.filter(started_at__gte=since, success=False).select_related('client')[:50],
+        'slowest': TenantJobRun.objects.filter(started_at__gte=since).select_related('client').order_by('-duration')[:25],
+    }
+
+    # render timing of the cron jobs per task and the runs that need attention
+    return render(request, "tools/cron_runs.html", context)
@@ -1,3 +1,7 @@
+import copy
+import threading
+import uuid
+
 from django.db import connection
 from django.core.cache import cache
 from django.apps import apps
@@ -193,13 +197,38 @@ Valid JSONFields types:
 """
 
 
+CONFIG_VERSION_KEY = '__CONFIG_VERSION__'
+
+
 class ConfigBackend():
+    """
+    Site settings are stored in the database and cached per key.
+
+    Within a request a tenant-scoped snapshot of all settings is used instead, see
+    begin_snapshot(). Snapshots are kept in-process between requests and are
+    validated against a per-tenant version that is changed by every set().
+    """
+
     def __init__(self):
         self._model = apps.get_model('core.Setting')
+        self._snapshots = {}
+        self._local = threading.local()
         self.init()
 
+    @staticmethod
+    def _cache_key(key):
+        return "%s%s" % (connection.schema_name, key)
+
+    @staticmethod
+    def _version_key():
+        return "%s%s" % (connection.schema_name, CONFIG_VERSION_KEY)
+
     def get(self, key):
-        value = cache.get("%s%s" % (connection.schema_name, key))
+        snapshot = self._active_snapshot()
+        if snapshot is not None:
+            return snapshot.get(key)
+
+        value = cache.get(self._cache_key(key))
 
         if value is None:
             try:
@@ -207,7 +236,7 @@ class ConfigBackend():
             except self._model.DoesNotExist:
                 pass
             else:
-                cache.set("%s%s" % (connection.schema_name, key), value)
+                cache.set(self._cache_key(key), value)
 
         return value
 
@@ -217,14 +246,89 @@ class ConfigBackend():
             setting.value = value
             setting.save()
 
-        cache.set("%s%s" % (connection.schema_name, key), value)
+        cache.set(self._cache_key(key), value)
 
     def init(self):
         # fill cache on init
         if not connection.schema_name == 'public':
             for setting in self._model.objects.all():
                 if setting.key in DEFAULT_SITE_CONFIG:
-                    cache.set("%s%s" % (connection.schema_name, setting.key), setting.value)
+                    cache.set(self._cache_key(setting.key), setting.value)
+            self._snapshots.pop(connection.schema_name, None)
+            self._bump_version()
+
+    def begin_snapshot(self):
+        """
+        Pin a snapshot of all site settings for the current thread.
+
+        Costs one cache round-trip when the in-process snapshot is still current,
+        otherwise one multi-get (plus one query for settings missing from the cache).
+        Returns the snapshot that was pinned before, to restore with end_snapshot().
+        """
+        previous = getattr(self._local, 'snapshot', None)
+        if connection.schema_name == 'public':
+            return previous
+
+        version = cache.get(self._version_key())
+        if version is None:
+            version = self._bump_version()
+
+        snapshot = self._snapshots.get(connection.schema_name)
+        if not snapshot or snapshot[0] != version:
+            snapshot = (version, self._load_snapshot())
+            self._snapshots[connection.schema_name] = snapshot
+
+        self._local.snapshot = (connection.schema_name, snapshot[1])
+        return previous
+
+    def end_snapshot(self, previous=None):
+        self._local.snapshot = previous
+
+    def _active_snapshot(self):
+        pinned = getattr(self._local, 'snapshot', None)
+        if pinned and pinned[0] == connection.schema_name:
+            return pinned[1]
+        return None
+
+    def _load_snapshot(self):
+        cache_keys = {self._cache_key(key): key for key in DEFAULT_SITE_CONFIG}
+        values = {cache_keys[cache_key]: value
+                  for cache_key, value in cache.get_many(list(cache_keys)).items()
+                  if value is not None}
+
+        missing = [key for key in DEFAULT_SITE_CONFIG if key not in values]
+        if missing:
+            stored = {setting.key: setting.value
+                      for setting in self._model.objects.filter(key__in=missing)}
+            cache.set_many({self._cache_key(key): value
+                            for key, value in stored.items()
+                            if value is not None})
+            values.update(stored)
+
+        return values
+
+    def invalidate(self, key, value=None):
+        """
+        Called whenever a stored setting changes. Updates the pinned snapshot and
+        makes snapshots in other processes stale.
+        """
+        if connection.schema_name == 'public':
+            return
+
+        self._snapshots.pop(connection.schema_name, None)
+        snapshot = self._active_snapshot()
+        if snapshot is not None:
+            # copy on write; the pinned dict may be shared with other threads
+            snapshot = {k: v for k, v in snapshot.items() if k != key}
+            if value is not None:
+                snapshot[key] = value
+            self._local.snapshot = (connection.schema_name, snapshot)
+        self._bump_version()
+
+    def _bump_version(self):
+        version = uuid.uuid4().hex
+        cache.set(self._version_key(), version, None)
+        return version
 
 
 class Config():
@@ -244,6 +348,9 @@ class Config():
             result = default
             setattr(self, key, default)
             return result
+        if isinstance(result, (dict, list)):
+            # snapshot values are shared; protect them from in-place changes
+            return copy.deepcopy(result)
         return result
 
     def __setattr__(self, key, value):
@@ -256,3 +363,12 @@ class Config():
 
     def reset(self):
         self._backend.init()
+
+    def begin_snapshot(self):
+        return self._backend.begin_snapshot()
+
+    def end_snapshot(self, previous=None):
+        self._backend.end_snapshot(previous)
+
+    def invalidate(self, key, value=None):
+        self._backend.invalidate(key, value)
@@ -57,6 +57,8 @@ USER_NOT_SITE_ADMIN = "user_not_site_admin"
 USER_NOT_SUPERADMIN = "user_not_superadmin"
 COULD_NOT_ORDER_BY_START_DATE = "order_by_start_date_is_only_for_events"
 COULD_NOT_USE_EVENT_FILTER = "event_filter_is_only_for_events"
+COULD_NOT_USE_CURSOR = "cursor_is_only_for_date_ordering"
+INVALID_CURSOR = "invalid_cursor"
 EVENT_IS_FULL = "event_is_full"
 EVENT_INVALID_STATE = "event_invalid_state"
 EVENT_RANGE_NOT_POSSIBLE = 'event_range_not_possible'
@@ -1,18 +1,28 @@
 import logging
+import uuid
+from collections import defaultdict
 
 from django.apps import apps
-from django.db import models
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
+from django_elasticsearch_dsl.apps import DEDConfig
 from django_elasticsearch_dsl.registries import registry
 from django_elasticsearch_dsl.signals import BaseSignalProcessor
-from django_tenants.utils import parse_tenant_config_path
-from elasticsearch.helpers import BulkIndexError
-from elasticsearch_dsl import Index
+from django_tenants.utils import parse_tenant_config_path, schema_context
+from elasticsearch.helpers import BulkIndexError, streaming_bulk
+from elasticsearch_dsl import Index, connections
 
 from core.lib import tenant_schema
 
 logger = logging.getLogger(__name__)
 
+INDEX_QUEUE_FLUSH_KEY = '__INDEX_QUEUE_FLUSH__'
+INDEX_QUEUE_STATS_KEY = '__INDEX_QUEUE_STATS__'
+SEARCH_CACHE_VERSION_KEY = '__SEARCH_CACHE_VERSION__'
+
 
 def log_elasticsearch_error(msg, e, instance, alternative_logger=None):
     _logger = alternative_logger or logger
@@ -27,14 +37,12 @@ class CustomSignalProcessor(BaseSignalProcessor):
     """
 
     def handle_save(self, sender, instance, **kwargs):
-        """Overwrite default handle_save and stop raising exception on error
+        """Overwrite default handle_save; changes are queued and indexed in bulk by a background task.
+        Also stop raising exception on error.
         """
         try:
-            if isinstance(instance, apps.get_model('file.FileFolder')) and instance.group and not settings.ENV == 'test':
-                schedule_index_document(instance)
-            else:
-                registry.update(instance)
-                registry.update_related(instance)
+            if DEDConfig.autosync_enabled():
+                queue_index_update(instance)
         except Exception as e:
             retry_index_document(instance)
             log_elasticsearch_error('sending update task', e, instance)
@@ -43,6 +51,11 @@ class CustomSignalProcessor(BaseSignalProcessor):
         """Overwrite default handle_pre_delete and stop raising exception on error
         """
         try:
+            if is_indexed_model(sender) and rebuild_in_progress():
+                updates = defaultdict(dict)
+                _collect_index_updates(instance, updates)
+                record_rebuild_changes([(doc.django.model._meta.label, pk)
+                                        for doc, instances in updates.items() for pk in instances])
             registry.delete_related(instance)
         except Exception as e:
             log_elasticsearch_error('sending pre-delete task', e, instance)
@@ -52,6 +65,8 @@ class CustomSignalProcessor(BaseSignalProcessor):
         """
         try:
             registry.delete(instance, raise_on_error=False)
+            if is_indexed_model(sender):
+                invalidate_search_cache()
         except Exception as e:
             if isinstance(e, BulkIndexError) and 'not_found' in str(e):
                 return
@@ -74,6 +89,182 @@ class CustomSignalProcessor(BaseSignalProcessor):
         models.signals.pre_delete.disconnect(self.handle_pre_delete)
 
 
+def is_indexed_model(model):
+    # pylint: disable=protected-access
+    return model in registry.get_models() or model in registry._related_models
+
+
+class PendingIndexUpdates:
+    """
+    Updates made in one transaction, or savepoint, stored in the search index queue when it commits.
+    Django forgets the callback, and with it the updates, when the transaction is rolled back.
+    """
+
+    def __init__(self):
+        self.items = set()
+        self.stored = False
+
+    def __call__(self):
+        self.stored = True
+        store_index_updates(self.items)
+
+
+def queue_index_update(instance):
+    """
+    Remember the instance for the search index queue. The queue is written when the
+    current transaction commits.
+    """
+    if not is_indexed_model(instance.__class__):
+        return
+
+    item = (tenant_schema(), instance._meta.label, str(instance.pk))
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        store_index_updates({item})
+        return
+
+    savepoint_ids = set(connection.savepoint_ids)
+    for callback_savepoint_ids, callback in reversed(connection.run_on_commit):
+        if isinstance(callback, PendingIndexUpdates) and not callback.stored \
+                and callback_savepoint_ids == savepoint_ids:
+            callback.items.add(item)
+            return
+
+    pending = PendingIndexUpdates()
+    pending.items.add(item)
+    transaction.on_commit(pending)
+
+
+def store_index_updates(items):
+    # pylint: disable=import-outside-toplevel
+    per_schema = defaultdict(list)
+    for schema_name, label, object_id in items:
+        per_schema[schema_name].append((label, object_id))
+
+    from core.models import SearchIndexQueueItem
+    for schema_name, schema_items in per_schema.items():
+        with schema_context(schema_name):
+            SearchIndexQueueItem.objects.enqueue(schema_items)
+        schedule_index_queue_flush(schema_name)
+
+
+def schedule_index_queue_flush(schema_name, force=False):
+    """
+    Schedule at most one flush per tenant per window.
+    """
+    # pylint: disable=import-outside-toplevel
+    from core.tasks.elasticsearch_tasks import elasticsearch_flush_index_queue
+
+    window = settings.ELASTICSEARCH_INDEX_QUEUE_WINDOW
+    if force:
+        elasticsearch_flush_index_queue.delay(schema_name)
+    elif cache.add("%s%s" % (schema_name, INDEX_QUEUE_FLUSH_KEY), True, window):
+        elasticsearch_flush_index_queue.apply_async((schema_name,), countdown=window)
+
+
+def release_index_queue_flush(schema_name):
+    cache.delete("%s%s" % (schema_name, INDEX_QUEUE_FLUSH_KEY))
+
+
+def flush_index_queue(limit=None):
+    """
+    Update the search index for queued objects of the current tenant in bulk.
+    Returns statistics of the flush.
+    """
+    # pylint: disable=import-outside-toplevel
+    from core.models import SearchIndexQueueItem
+    from core.utils.elasticsearch import delete_document_if_found
+
+    started_at = timezone.now()
+    items = SearchIndexQueueItem.objects.take(limit or settings.ELASTICSEARCH_INDEX_QUEUE_BATCH_SIZE)
+    if not items:
+        return None
+
+    if rebuild_in_progress():
+        record_rebuild_changes([(item.model, item.object_id) for item in items])
+
+    per_model = defaultdict(set)
+    for item in items:
+        per_model[item.model].add(item.object_id)
+
+    updates = defaultdict(dict)
+    try:
+        for label, object_ids in per_model.items():
+            model = apps.get_model(label)
+            found = {str(instance.pk): instance for instance in model.objects.filter(pk__in=object_ids)}
+
+            for object_id in object_ids - set(found):
+                if model in registry.get_models():
+                    delete_document_if_found(object_id)
+
+            for instance in found.values():
+                _collect_index_updates(instance, updates)
+
+        for doc, instances in updates.items():
+            chunk_size = 10 if doc.django.model.__name__ == 'FileFolder' else 500
+            doc().update(list(instances.values()), parallel=False, chunk_size=chunk_size)
+    except Exception:
+        SearchIndexQueueItem.objects.enqueue([(item.model, item.object_id) for item in items])
+        raise
+
+    invalidate_search_cache()
+
+    latencies = [(started_at - item.created_at).total_seconds() for item in items]
+    stats = {
+        "flushed_at": started_at.isoformat(),
+        "batch_size": len(items),
+        "documents": sum(len(instances) for instances in updates.values()),
+        "latency_avg": round(sum(latencies) / len(latencies), 3),
+        "latency_max": round(max(latencies), 3),
+        "duration": round((timezone.now() - started_at).total_seconds(), 3),
+    }
+    cache.set("%s%s" % (tenant_schema(), INDEX_QUEUE_STATS_KEY), stats, None)
+    logger.info("Search index queue flushed@%s: %s", tenant_schema(), stats)
+    return stats
+
+
+def _collect_index_updates(instance, updates):
+    for doc in registry._models.get(instance.__class__, []):  # pylint: disable=protected-access
+        if not doc.django.ignore_signals:
+            updates[doc][instance.pk] = instance
+
+    for doc in registry._get_related_doc(instance):  # pylint: disable=protected-access
+        try:
+            related = doc().get_instances_from_related(instance)
+        except ObjectDoesNotExist:
+            related = None
+        if related is None:
+            continue
+        if isinstance(related, models.Model):
+            related = [related]
+        for related_instance in related:
+            updates[doc][related_instance.pk] = related_instance
+
+
+def index_queue_stats():
+    # pylint: disable=import-outside-toplevel
+    from core.models import SearchIndexQueueItem
+
+    pending = SearchIndexQueueItem.objects.order_by('created_at')
+    oldest = pending.first()
+    return {
+        "pending": pending.count(),
+        "oldest_pending": round((timezone.now() - oldest.created_at).total_seconds(), 3) if oldest else None,
+        "last_flush": cache.get("%s%s" % (tenant_schema(), INDEX_QUEUE_STATS_KEY)),
+    }
+
+
+def search_cache_version():
+    return cache.get("%s%s" % (tenant_schema(), SEARCH_CACHE_VERSION_KEY)) or ''
+
+
+def invalidate_search_cache(schema_name=None):
+    """
+    Cached search results of the tenant are not used anymore after its documents changed.
+    """
+    cache.set("%s%s" % (schema_name or tenant_schema(), SEARCH_CACHE_VERSION_KEY), uuid.uuid4().hex, None)
+
+
 def retry_index_document(instance):
     if settings.ENV == 'test':
         return
@@ -98,8 +289,160 @@ def schedule_index_document(instance):
     elasticsearch_index_document.delay(schema_name, instance.id, instance.__class__.__name__)
 
 
+def index_documents(alias):
+    return [doc for doc in registry.get_documents() if doc.Index.name == alias]
+
+
+def index_chunk_size(doc):
+    return 10 if doc.django.model.__name__ == 'FileFolder' else 500
+
+
+def delete_index(index):
+    """
+    Delete an index, or the indexes behind it when the name is an alias of a rebuilt index.
+    """
+    # pylint: disable=protected-access
+    es_client = connections.get_connection()
+    if es_client.indices.exists_alias(name=index._name):
+        for name in es_client.indices.get_alias(name=index._name):
+            es_client.indices.delete(index=name)
+    else:
+        index.delete()
+
+
+def create_rebuild_indexes(rebuild):
+    """
+    Create the new version of the indexes of a rebuild next to the indexes in use.
+    Refreshing is off while the index is being filled.
+    """
+    # pylint: disable=protected-access
+    for index in registry.get_indices():
+        if index._name in rebuild.indexes:
+            new_index = index.clone(name=rebuild.index_name(index._name))
+            new_index.settings(refresh_interval="-1")
+            new_index.create()
+
+
+def index_tenant_into(alias, target):
+    """
+    Write all documents of the current tenant for the index into the target index
+    with streaming bulk requests. Returns the number of indexed and failed documents.
+    """
+    es_client = connections.get_connection()
+    indexed = failed = 0
+    for doc_class in index_documents(alias):
+        doc = doc_class()
+        actions = ({**action, '_index': target}
+                   for action in doc._get_actions(doc.get_indexing_queryset(), 'index'))  # pylint: disable=protected-access
+        for ok, item in streaming_bulk(es_client, actions,
+                                       chunk_size=index_chunk_size(doc_class),
+                                       max_retries=3,
+                                       raise_on_error=False,
+                                       raise_on_exception=False):
+            if ok:
+                indexed += 1
+            else:
+                failed += 1
+                logger.error("Elasticsearch rebuild error@%s: %s", tenant_schema(), item)
+    return indexed, failed
+
+
+def swap_index_aliases(rebuild):
+    """
+    Point the aliases to the rebuilt indexes in one atomic update and remove the previous indexes.
+    The first rebuild replaces the concrete index that has the name of the alias.
+    """
+    es_client = connections.get_connection()
+    actions = []
+    previous = []
+    for alias in rebuild.indexes:
+        target = rebuild.index_name(alias)
+        es_client.indices.put_settings(index=target, body={"index": {"refresh_interval": None}})
+        es_client.indices.refresh(index=target)
+
+        if es_client.indices.exists_alias(name=alias):
+            for name in es_client.indices.get_alias(name=alias):
+                actions.append({"remove": {"index": name, "alias": alias}})
+                previous.append(name)
+        elif es_client.indices.exists(index=alias):
+            actions.append({"remove_index": {"index": alias}})
+        actions.append({"add": {"index": target, "alias": alias}})
+
+    es_client.indices.update_aliases(body={"actions": actions})
+
+    for name in previous:
+        es_client.indices.delete(index=name, ignore=[404])
+
+
+def rebuild_in_progress():
+    # pylint: disable=import-outside-toplevel
+    from control.models import ElasticsearchRebuild
+    return ElasticsearchRebuild.objects.active() is not None
+
+
+def record_rebuild_changes(items):
+    """
+    Remember (model, object_id) pairs that are written to or deleted from the indexes in use
+    while a rebuild runs. The new indexes miss these changes until they are replayed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from core.models import SearchIndexRebuildItem
+    SearchIndexRebuildItem.objects.enqueue(items)
+
+
+def replay_rebuild_changes():
+    """
+    Queue the changes recorded during the rebuild for the current tenant again,
+    now that the aliases point to the rebuilt indexes.
+    """
+    # pylint: disable=import-outside-toplevel
+    from core.models import SearchIndexQueueItem, SearchIndexRebuildItem
+
+    items = SearchIndexRebuildItem.objects.take(settings.ELASTICSEARCH_INDEX_QUEUE_BATCH_SIZE)
+    while items:
+        SearchIndexQueueItem.objects.enqueue([(item.model, item.object_id) for item in items])
+        items = SearchIndexRebuildItem.objects.take(settings.ELASTICSEARCH_INDEX_QUEUE_BATCH_SIZE)
+    schedule_index_queue_flush(tenant_schema(), force=True)
+
+
+def index_changed_since(alias, since):
+    """
+    Index documents of the current tenant that changed while the new index was filled.
+    """
+    for doc_class in index_documents(alias):
+        doc = doc_class()
+        model = doc_class.django.model
+        if not any(field.name == 'updated_at' for field in model._meta.get_fields()):
+            continue
+        qs = doc.get_queryset().filter(updated_at__gte=since)
+        doc.update(qs, parallel=False, chunk_size=index_chunk_size(doc_class))
+    invalidate_search_cache()
+
+
+def elasticsearch_rebuild_progress(index_name=None):
+    """
+    Progress of the active rebuild for the current tenant, per index.
+    """
+    # pylint: disable=import-outside-toplevel
+    from control.models import ElasticsearchRebuild, ElasticsearchRebuildStep
+
+    schema_name = tenant_schema()
+    with schema_context('public'):
+        rebuild = ElasticsearchRebuild.objects.active()
+        if not rebuild:
+            return {}
+        steps = ElasticsearchRebuildStep.objects.filter(rebuild=rebuild, client__schema_name=schema_name)
+        if index_name:
+            steps = steps.filter(index=index_name)
+        return {step.index: {"version": rebuild.version,
+                             "state": step.state,
+                             "documents": step.documents}
+                for step in steps}
+
+
 def elasticsearch_status_report(index_name=None, report_on_alert=False):
     report = []
+    rebuild = elasticsearch_rebuild_progress(index_name)
     for document_class in registry.get_documents():
         if not index_name or index_name == document_class.Index.name:
             document = document_class()
@@ -113,11 +456,14 @@ def elasticsearch_status_report(index_name=None, report_on_alert=False):
             alert = less_then_expected or more_then_expected
 
             if alert or not report_on_alert:
-                report.append({
+                item = {
                     "index": document.Index.name,
                     "expected": expected,
                     "actual": actual,
                     "alert": more_then_expected or less_then_expected
-                })
+                }
+                if document.Index.name in rebuild:
+                    item["rebuild"] = rebuild[document.Index.name]
+                report.append(item)
 
     return sorted(report, key=lambda x: x['index'])
@@ -1,10 +1,16 @@
 from http import HTTPStatus
 import os.path
+import re
+from urllib.parse import quote
 
-from django.http import Http404, HttpResponse
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.template import loader
 from django.utils import timezone
 
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+RANGE_CHUNK_SIZE = 64 * 1024
+
 
 class HttpErrorReactPage(Http404):
     status_code = None
@@ -43,3 +49,111 @@ def file_blocked_response(request, filename, reason):
                             'Pragma': 'no-cache',
                             'Cache-Control': 'no-store, no-cache, must-revalidate, max-age=0',
                         })
+
+
+def file_response(request, upload, content_type=None, etag=None, content_disposition=None):
+    """
+    Serve an uploaded file after access has been checked.
+
+    Supports If-None-Match and single byte range requests (with If-Range). When
+    FILE_OFFLOAD_HEADER is configured the transfer is left to the front proxy.
+    """
+    etag = '"%s"' % etag if etag else None
+    headers = {'Accept-Ranges': 'bytes'}
+    if etag:
+        headers['ETag'] = etag
+    if content_disposition:
+        headers['Content-Disposition'] = content_disposition
+
+    if etag and _etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+        return HttpResponse(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    if settings.FILE_OFFLOAD_HEADER:
+        headers[settings.FILE_OFFLOAD_HEADER] = _offload_location(upload)
+        return HttpResponse(content_type=content_type, headers=headers)
+
+    size = upload.size
+    byte_range = _requested_range(request, etag, size)
+
+    if byte_range is False:
+        headers['Content-Range'] = 'bytes */%d' % size
+        return HttpResponse(status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+
+    if byte_range:
+        start, end = byte_range
+        headers['Content-Range'] = 'bytes %d-%d/%d' % (start, end, size)
+        headers['Content-Length'] = str(end - start + 1)
+        return StreamingHttpResponse(streaming_content=_read_range(upload.open('rb'), start, end),
+                                     status=HTTPStatus.PARTIAL_CONTENT,
+                                     content_type=content_type,
+                                     headers=headers)
+
+    response = FileResponse(upload.open('rb'), content_type=content_type)
+    if 'Content-Disposition' in response and not content_disposition:
+        # FileResponse would name the file after its storage path
+        del response['Content-Disposition']
+    response['Content-Length'] = size
+    for key, value in headers.items():
+        response[key] = value
+    return response
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # If-None-Match uses the weak comparison
+    return any(tag.strip().replace('W/', '', 1) == etag for tag in header.split(','))
+
+
+def _requested_range(request, etag, size):
+    """
+    The (start, end) byte range to serve, None for the whole file
+    or False when the range can not be satisfied.
+    """
+    header = request.META.get('HTTP_RANGE')
+    if not header or request.method not in ('GET', 'HEAD'):
+        return None
+
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range.strip() != etag:
+        return None
+
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Multiple or malformed ranges, send the whole file
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(file, start, end):
+    with file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _offload_location(upload):
+    if settings.FILE_OFFLOAD_HEADER.lower() == 'x-sendfile':
+        return upload.path
+    relative_path = os.path.relpath(upload.path, settings.MEDIA_ROOT)
+    return settings.FILE_OFFLOAD_PREFIX.rstrip('/') + '/' + quote(relative_path)
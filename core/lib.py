@@ -31,6 +31,7 @@ from urllib.parse import urljoin
 from core import config
 from core.constances import ACCESS_TYPE
 from core.exceptions import IgnoreIndexError, UnableToTestIndex
+from core.utils.access import get_access_context
 
 logger = logging.getLogger(__name__)
 
@@ -132,6 +133,10 @@ def get_acl(user):
         acl.add(ACCESS_TYPE.logged_in)
         acl.add(ACCESS_TYPE.user.format(user.id))
 
+        access_context = get_access_context(user)
+        if access_context:
+            return acl.union(access_context.acl())
+
         if user.memberships:
             groups = set(
                 ACCESS_TYPE.group.format(membership.group.id) for membership in
@@ -1,3 +1,4 @@
+from django.template.loader import get_template
 from django.utils.module_loading import import_string
 
 from core import config
@@ -5,6 +6,7 @@ from core.utils.mail import EmailSettingsTokenizer
 
 
 class MailerBase:
+    delivery = None
 
     def __init__(self, **kwargs):
         self.kwargs = kwargs
@@ -55,11 +57,45 @@ class MailerBase:
             raise MailerBase.IgnoreInactiveUserMailError(f"Did not send mail to {email}")
         return True
 
+    def assert_receiver_is_not_inactive(self, email):
+        if self.delivery:
+            return self.delivery.assert_not_known_inactive_user(email)
+        return self.assert_not_known_inactive_user(email)
+
     @classmethod
     def class_id(cls):
         return f"{cls.__module__}.{cls.__qualname__}"
 
 
+class MailDelivery:
+    """
+    State shared by the mailers of one batch: one mail connection,
+    one lookup of inactive receivers and templates that are compiled once.
+    """
+
+    def __init__(self, connection=None):
+        self.connection = connection
+        self.inactive_emails = None
+        self._templates = {}
+
+    def prefetch_inactive_users(self, emails):
+        from user.models import User
+        self.inactive_emails = set(User.objects.filter(is_active=False, email__in=emails)
+                                   .values_list('email', flat=True))
+
+    def assert_not_known_inactive_user(self, email):
+        if self.inactive_emails is None:
+            return MailerBase.assert_not_known_inactive_user(email)
+        if email in self.inactive_emails:
+            raise MailerBase.IgnoreInactiveUserMailError(f"Did not send mail to {email}")
+        return True
+
+    def get_template(self, template_name):
+        if template_name not in self._templates:
+            self._templates[template_name] = get_template(template_name)
+        return self._templates[template_name]
+
+
 def assert_valid_mailer_subclass(mailer):
     if isinstance(mailer, str):
         mailer_class = import_string(mailer)
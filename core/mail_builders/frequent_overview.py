@@ -1,10 +1,14 @@
+import uuid
+
 from django.db.models import Q
 from django.utils.timezone import timedelta, localtime
 from django.utils.translation import gettext as _
 
 from core import config
+from core.constances import ACCESS_TYPE, USER_ROLES
 from core.lib import get_full_url
 from core.mail_builders.template_mailer import TemplateMailerBase
+from core.utils.access import get_acls
 from core.utils.entity import load_entity_by_id
 from core.utils.mail import UnsubscribeTokenizer
 
@@ -17,6 +21,28 @@ def schedule_frequent_overview_mail(user, interval):
     })
 
 
+def schedule_frequent_overview_mails(users, interval, chunk_size=500):
+    """
+    Select the content of the overview mails of many users at once and schedule
+    a mail for every user that has something to read.
+    Returns the number of scheduled mails.
+    """
+    from core.models import MailInstance
+    candidates = OverviewCandidates(interval)
+    scheduled = 0
+
+    chunk = []
+    for user in users.iterator(chunk_size=chunk_size):
+        chunk.append(user)
+        if len(chunk) == chunk_size:
+            scheduled += len(MailInstance.objects.submit_many(FrequentOverviewMailer, candidates.mailer_kwargs(chunk)))
+            chunk = []
+    if chunk:
+        scheduled += len(MailInstance.objects.submit_many(FrequentOverviewMailer, candidates.mailer_kwargs(chunk)))
+
+    return scheduled
+
+
 class FrequentOverviewMailer(TemplateMailerBase):
 
     _unsubscribe_url = None
@@ -27,7 +53,11 @@ class FrequentOverviewMailer(TemplateMailerBase):
         self.interval = kwargs['interval']
 
     def get_context(self):
-        collection = EntityCollection(self.user, self.interval)
+        if 'entities' in self.kwargs:
+            collection = EntityCollection.from_ids(self.user, self.interval,
+                                                   self.kwargs['entities'], self.kwargs['featured'])
+        else:
+            collection = EntityCollection(self.user, self.interval)
 
         # do not send mail when there are now new notifications
         if not collection.has_content():
@@ -114,16 +144,102 @@ class FrequentOverviewMailer(TemplateMailerBase):
         return serializable_entities
 
 
+class OverviewCandidates:
+    """
+    All content that may appear in the overview mails of one interval, loaded once.
+    Users with the same acl share the list of content they can see, what remains
+    per user (viewed content, featured content, tags) is decided in memory.
+    """
+
+    def __init__(self, interval):
+        from core.models import Entity
+        from core.models.tags import synonym_map
+        self.interval = interval
+        since = localtime() - EntityCollection.get_delta(interval)
+        self.entities = list(Entity.objects.published()
+                             .filter(published__gte=since)
+                             .select_subclasses()
+                             .order_by('-published'))
+        self.synonyms = synonym_map()
+
+        self._by_acl = {}
+        self._by_user_access = {}
+        for entity in self.entities:
+            for access in entity.read_access:
+                if access.startswith('user:'):
+                    self._by_user_access.setdefault(access, []).append(entity)
+
+    def visible(self, user, acl):
+        if user.has_role(USER_ROLES.ADMIN):
+            return self.entities
+
+        shared_acl = frozenset(access for access in acl if not access.startswith('user:'))
+        if shared_acl not in self._by_acl:
+            self._by_acl[shared_acl] = [e for e in self.entities if shared_acl.intersection(e.read_access)]
+        visible = self._by_acl[shared_acl]
+
+        personal = self._by_user_access.get(ACCESS_TYPE.user.format(user.id))
+        if personal:
+            ids = {e.id for e in visible}
+            visible = sorted(visible + [e for e in personal if e.id not in ids],
+                             key=lambda e: e.published, reverse=True)
+        return visible
+
+    def translate_tags(self, tags):
+        return [self.synonyms.get(tag.lower(), tag.lower()) for tag in tags]
+
+    def collections(self, users):
+        from core.models import EntityView
+        acls = get_acls(users)
+        viewed = {}
+        for viewer_id, entity_id in EntityView.objects.filter(viewer__in=users,
+                                                              entity_id__in=[e.id for e in self.entities]) \
+                .values_list('viewer_id', 'entity_id'):
+            viewed.setdefault(viewer_id, set()).add(entity_id)
+
+        for user in users:
+            yield user, EntityCollection(user, self.interval,
+                                         candidates=self.visible(user, acls[user.id]),
+                                         viewed=viewed.get(user.id, set()),
+                                         translate_tags=self.translate_tags)
+
+    def mailer_kwargs(self, users):
+        return [{
+            'user': user.guid,
+            'interval': self.interval,
+            'entities': [e.guid for e in collection.get_entities()],
+            'featured': [e.guid for e in collection.get_featured()],
+        } for user, collection in self.collections(users) if collection.has_content()]
+
+
 class EntityCollection:
     _is_processed = False
     _entities = None
     _featured = None
     MAX_FEATURED = 3
     MAX_ENTITIES = 5
+    CONTENT_TYPES = ('news', 'blog', 'event', 'wiki', 'question')
 
-    def __init__(self, user, interval):
+    def __init__(self, user, interval, candidates=None, viewed=None, translate_tags=None):
+        """
+        Without candidates the content is selected with queries for this user,
+        otherwise from the (visible) candidates in memory.
+        """
         self.user = user
         self.interval = interval
+        self._candidates = candidates
+        self._viewed = viewed or set()
+        self._translate_tags = translate_tags
+
+    @classmethod
+    def from_ids(cls, user, interval, entity_ids, featured_ids):
+        from core.models import Entity
+        collection = cls(user, interval)
+        entities = Entity.objects.filter(id__in=[*entity_ids, *featured_ids]).select_subclasses().in_bulk()
+        collection._entities = [entities[pk] for pk in map(uuid.UUID, entity_ids) if pk in entities]
+        collection._featured = [entities[pk] for pk in map(uuid.UUID, featured_ids) if pk in entities]
+        collection._is_processed = True
+        return collection
 
     def has_content(self):
         if self.get_entities() or self.get_featured():
@@ -144,26 +260,31 @@ class EntityCollection:
 
         lower_bound = self._get_lower_bound()
 
-        self._featured = self._process_featured(lower_bound
-                                                )[:self.MAX_FEATURED]
-        self._entities = self._process_entities(lower_bound, featured=self._featured
-                                                )[:self.MAX_ENTITIES]
+        if self._candidates is not None:
+            self._featured = self._select_featured(lower_bound)[:self.MAX_FEATURED]
+            self._entities = self._select_entities(lower_bound, featured=self._featured)[:self.MAX_ENTITIES]
+        else:
+            self._featured = self._process_featured(lower_bound
+                                                    )[:self.MAX_FEATURED]
+            self._entities = self._process_entities(lower_bound, featured=self._featured
+                                                    )[:self.MAX_ENTITIES]
 
         self._is_processed = True
 
     def _get_lower_bound(self):
         # if user has never received overview mails use last interval period for time delta
-        delta = self._get_delta()
+        delta = self.get_delta(self.interval)
         time_threshold = localtime() - delta
         last_occassion = self.user.profile.overview_email_last_received
         if last_occassion and last_occassion > time_threshold:
             return last_occassion
         return time_threshold
 
-    def _get_delta(self):
-        if self.interval == "monthly":
+    @staticmethod
+    def get_delta(interval):
+        if interval == "monthly":
             return timedelta(weeks=4)
-        if self.interval == "weekly":
+        if interval == "weekly":
             return timedelta(weeks=1)
         return timedelta(days=1)
 
@@ -178,6 +299,14 @@ class EntityCollection:
         featured_entities = featured_entities.select_subclasses()
         return featured_entities
 
+    def _select_featured(self, since):
+        if self.interval == 'monthly' or not config.EMAIL_OVERVIEW_ENABLE_FEATURED:
+            return []
+
+        featured = [e for e in self._candidates
+                    if (e.is_recommended or e.is_featured) and e.published >= since]
+        return sorted(featured, key=lambda e: e.published)
+
     def _process_entities(self, since, featured):
         from core.models import Entity
 
@@ -193,6 +322,20 @@ class EntityCollection:
 
         return self._tags_on_top(entities)
 
+    def _select_entities(self, since, featured):
+        excluded = set(self._viewed)
+        if config.EMAIL_OVERVIEW_ENABLE_FEATURED:
+            excluded.update(e.id for e in featured)
+
+        entities = [e for e in self._candidates
+                    if e._meta.model_name in self.CONTENT_TYPES
+                    and e.id not in excluded
+                    and e.published >= since]
+
+        tags = set(self._translate_tags(self.user.profile.overview_email_tags))
+        selected = [e for e in entities if tags.intersection(e._tag_summary)]
+        return selected + [e for e in entities if not tags.intersection(e._tag_summary)]
+
     @staticmethod
     def _filter_valid_content_type(qs):
         # pylint: disable=unsupported-binary-operation
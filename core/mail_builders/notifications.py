@@ -1,4 +1,8 @@
+from datetime import timedelta
+
 from django.apps import apps
+from django.db.models import DateTimeField, DurationField, Exists, ExpressionWrapper, F, OuterRef, Q, Value
+from django.utils import timezone
 from django.utils.translation import ugettext as _
 from notifications.models import Notification
 
@@ -8,6 +12,9 @@ from core.mail_builders.template_mailer import TemplateMailerBase
 from core.utils.mail import UnsubscribeTokenizer
 
 
+COLLECTED_VERBS = ['created', 'commented', 'mentioned']
+
+
 class MailTypeEnum:
     DIRECT = 'direct'
     COLLECTED = 'collected'
@@ -22,6 +29,61 @@ def schedule_notification_mail(user, notifications, mail_type):
     })
 
 
+def schedule_notification_mails(user_notifications, mail_type):
+    """ Schedule one mail for each (user, notifications) pair in batches """
+    from core.models import MailInstance
+    MailInstance.objects.submit_many(NotificationsMailer, [{
+        'user': user.guid,
+        'notifications': [n.pk for n in notifications],
+        'mail_type': mail_type,
+    } for user, notifications in user_notifications])
+
+
+def schedule_collected_notification_mails(max_notifications=20):
+    """
+    Schedule a mail with the recent unsent notifications of every user that wants them
+    and did not receive such a mail within their notification interval.
+    Returns the number of users and notifications that were scheduled.
+    """
+    User = apps.get_model('user.User')
+
+    def within_interval(recipient):
+        interval = ExpressionWrapper(F('%s___profile__notification_email_interval_hours' % recipient) * timedelta(hours=1),
+                                     output_field=DurationField())
+        return Q(timestamp__gte=ExpressionWrapper(Value(now, output_field=DateTimeField()) - interval,
+                                                  output_field=DateTimeField()))
+
+    now = timezone.now()
+    emailed_within_interval = Notification.objects.filter(within_interval('recipient'),
+                                                          recipient_id=OuterRef('recipient_id'),
+                                                          emailed=True)
+    pending = Notification.objects.filter(within_interval('recipient'),
+                                          emailed=False,
+                                          verb__in=COLLECTED_VERBS,
+                                          recipient__is_active=True,
+                                          recipient___profile__receive_notification_email=True) \
+        .filter(~Exists(emailed_within_interval)) \
+        .order_by('recipient_id', '-timestamp')
+
+    notifications = {}
+    for notification in pending:
+        recipient_notifications = notifications.setdefault(notification.recipient_id, [])
+        if len(recipient_notifications) < max_notifications:
+            recipient_notifications.append(notification)
+
+    if not notifications:
+        return 0, 0
+
+    users = User.objects.in_bulk(list(notifications))
+    schedule_notification_mails([(users[user_id], user_notifications)
+                                 for user_id, user_notifications in notifications.items()],
+                                MailTypeEnum.COLLECTED)
+
+    notification_ids = [n.id for user_notifications in notifications.values() for n in user_notifications]
+    Notification.objects.filter(id__in=notification_ids).update(emailed=True)
+    return len(notifications), len(notification_ids)
+
+
 class NotificationsMailer(TemplateMailerBase):
 
     _unsubscribe_url = None
@@ -28,9 +28,12 @@ class TemplateMailerBase(MailerBase):
         pass
 
     def send(self):
-        self.assert_not_known_inactive_user(self.get_receiver_email())
+        self.assert_receiver_is_not_inactive(self.get_receiver_email())
         with translation.override(self.get_language()):
-            html_template = get_template(self.get_template())
+            if self.delivery:
+                html_template = self.delivery.get_template(self.get_template())
+            else:
+                html_template = get_template(self.get_template())
             html_content = html_template.render(self.get_context())
             text_content = html_to_text(html_content)
 
@@ -40,7 +43,8 @@ class TemplateMailerBase(MailerBase):
                                            body=text_content,
                                            from_email=from_mail,
                                            to=[self.get_receiver_email()],
-                                           headers=self.get_headers())
+                                           headers=self.get_headers(),
+                                           connection=self.delivery.connection if self.delivery else None)
             email.attach_alternative(html_content, "text/html")
 
             self.pre_send(email)
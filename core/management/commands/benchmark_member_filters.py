@@ -0,0 +1,82 @@
+import random
+import timeit
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.lib import is_schema_public
+from core.models import ProfileField, UserProfile, UserProfileField
+from core.models.user import split_profile_field_value
+from user.models import User
+
+OPTIONS = ['Amsterdam', 'Rotterdam', 'Utrecht', 'Den Haag', 'Eindhoven', 'Groningen', 'Tilburg', 'Almere']
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_value_filter(key, values):
+    value_match = Q()
+    for value in values:
+        value_match |= Q(value=value)
+        value_match |= Q(value__startswith=value + ',')
+        value_match |= Q(value__contains=',' + value + ',')
+        value_match |= Q(value__endswith=',' + value)
+    return UserProfileField.objects.filter(Q(profile_field__key=key) & value_match)
+
+
+class Command(BaseCommand):
+    help = 'Compare profile field and user search filters on generated users; all data is rolled back'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--iterations', type=int, default=10)
+
+    def handle(self, *args, **options):
+        if is_schema_public():
+            return
+
+        try:
+            with transaction.atomic():
+                self.run(options['users'], options['iterations'])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, amount, iterations):
+        field = ProfileField.objects.create(key='benchmark_%s' % uuid.uuid4().hex[:8],
+                                            name='Benchmark',
+                                            field_type='multi_select_field')
+
+        self.stdout.write("Creating %s users" % amount)
+        batch = 5000
+        for start in range(0, amount, batch):
+            users = User.objects.bulk_create([User(name="Gebruiker %s" % n, email="benchmark-%s@example.com" % n)
+                                              for n in range(start, min(start + batch, amount))])
+            profiles = UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+            values = [",".join(random.sample(OPTIONS, random.randint(1, 3))) for _ in profiles]
+            UserProfileField.objects.bulk_create([UserProfileField(user_profile=profile,
+                                                                   profile_field=field,
+                                                                   value=value,
+                                                                   value_list=split_profile_field_value(value))
+                                                  for profile, value in zip(profiles, values)])
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE user_user")
+            cursor.execute("ANALYZE core_userprofilefield")
+
+        queries = [
+            ("filter (text patterns)", legacy_value_filter(field.key, ['Utrecht'])),
+            ("filter (value_list)", UserProfileField.objects.with_any_value(field.key, ['Utrecht'])),
+            ("search profile value", UserProfileField.objects.filter(profile_field=field, value__icontains='trech')),
+            ("search users", User.objects.get_filtered_users(q='bruiker 4242')),
+        ]
+
+        self.stdout.write("%-24s %10s  %s" % ("query", "ms", "plan"))
+        for label, qs in queries:
+            duration = timeit.timeit(qs.count, number=iterations) / iterations
+            plan = "index" if "Index Scan" in qs.explain() else "sequential scan"
+            self.stdout.write("%-24s %10.2f  %s" % (label, duration * 1000, plan))
@@ -0,0 +1,75 @@
+import json
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from core.utils.convert import _render, render_rich_text
+
+DOCUMENT_SIZES = [
+    ('1KB', 1024),
+    ('20KB', 20 * 1024),
+    ('200KB', 200 * 1024),
+]
+
+
+def text(value, bold=False):
+    node = {'type': 'text', 'text': value}
+    if bold:
+        node['marks'] = [{'type': 'bold'}]
+    return node
+
+
+def paragraph(n):
+    return {'type': 'paragraph', 'content': [
+        text("Paragraaf %s met wat tekst over het project, " % n),
+        text("belangrijk", bold=True),
+        text(" en een verwijzing naar "),
+        {'type': 'mention', 'attrs': {'id': str(n), 'label': "Gebruiker %s" % n}},
+        {'type': 'hardBreak'},
+        text("Een tweede regel in dezelfde paragraaf."),
+    ]}
+
+
+def section(n):
+    items = [{'type': 'listItem', 'content': [{'type': 'paragraph', 'content': [text("Punt %s" % i)]}]}
+             for i in range(3)]
+    return [
+        {'type': 'heading', 'attrs': {'level': 2}, 'content': [text("Hoofdstuk %s" % n)]},
+        paragraph(n),
+        {'type': 'bulletList', 'content': items},
+        {'type': 'blockquote', 'content': [paragraph(n)]},
+        {'type': 'orderedList', 'content': items},
+    ]
+
+
+def build_document(size):
+    content = []
+    document = ''
+    while len(document) < size:
+        content.extend(section(len(content)))
+        document = json.dumps({'type': 'doc', 'content': content})
+    return document
+
+
+class Command(BaseCommand):
+    help = 'Compare rendering rich text on every call with the content keyed cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100,
+                            help="Number of renders per document size")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        self.stdout.write("%-8s %12s %12s %10s" % ("size", "uncached ms", "cached ms", "speedup"))
+        for label, size in DOCUMENT_SIZES:
+            document = build_document(size)
+            render_rich_text(document)
+
+            uncached = timeit.timeit(lambda: _render(document), number=iterations) / iterations
+            cached = timeit.timeit(lambda: render_rich_text(document), number=iterations) / iterations
+
+            self.stdout.write("%-8s %12.3f %12.3f %9.0fx" % (label,
+                                                             uncached * 1000,
+                                                             cached * 1000,
+                                                             uncached / max(cached, 1e-9)))
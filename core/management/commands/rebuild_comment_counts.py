@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.lib import is_schema_public
+from core.models import EntityCommentCount
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored comment count of all entities'
+
+    def handle(self, *args, **options):
+        if is_schema_public():
+            return
+
+        updated = EntityCommentCount.objects.rebuild()
+
+        self.stdout.write(f"Rebuilt comment count for {updated} entities")
@@ -15,6 +15,7 @@ from django.template.response import TemplateResponse
 from core import config
 from core.constances import OIDC_PROVIDER_OPTIONS
 from core.lib import get_client_ip
+from core.utils.access import begin_access_scope, end_access_scope
 
 
 def is_ip_whitelisted(request):
@@ -32,6 +33,38 @@ def is_ip_whitelisted(request):
     return False
 
 
+class ConfigSnapshotMiddleware:
+    """
+    Read all site settings at once and use them for the rest of the request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config.begin_snapshot()
+        try:
+            return self.get_response(request)
+        finally:
+            config.end_snapshot()
+
+
+class AccessContextMiddleware:
+    """
+    Remember group memberships and subgroups of users for the rest of the request
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        begin_access_scope()
+        try:
+            return self.get_response(request)
+        finally:
+            end_access_scope()
+
+
 class UserLastOnlineMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
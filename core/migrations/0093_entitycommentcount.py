@@ -0,0 +1,24 @@
+# Generated by Django 3.2.18 on 2023-05-22 10:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0092_alter_group_plugins'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityCommentCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('comments', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('entity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='comment_counter', to='core.entity')),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.18 on 2023-05-30 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0094_searchindexqueueitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entity',
+            name='subtype',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='entity',
+            index=models.Index(fields=['published', 'id'], name='entity_published_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='entity',
+            index=models.Index(fields=['last_action', 'id'], name='entity_last_action_id_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0095_entity_subtype'),
+    ]
+
+    operations = [
+        # Every view before this migration was already counted; keep only the first view per viewer
+        migrations.RunSQL(
+            """
+            DELETE FROM core_entityview WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY entity_id, viewer_id ORDER BY id) AS position
+                    FROM core_entityview WHERE viewer_id IS NOT NULL
+                ) views WHERE position > 1
+            );
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            """
+            DELETE FROM core_entityview WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY entity_id, session ORDER BY id) AS position
+                    FROM core_entityview WHERE session IS NOT NULL
+                ) views WHERE position > 1
+            );
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RunSQL(
+            "DELETE FROM core_entityview WHERE viewer_id IS NULL AND session IS NULL;",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddField(
+            model_name='entityview',
+            name='counted',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='entityview',
+            name='counted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddConstraint(
+            model_name='entityview',
+            constraint=models.UniqueConstraint(condition=models.Q(('viewer__isnull', False)), fields=('entity', 'viewer'), name='entity_view_unique_viewer'),
+        ),
+        migrations.AddConstraint(
+            model_name='entityview',
+            constraint=models.UniqueConstraint(condition=models.Q(('session__isnull', False)), fields=('entity', 'session'), name='entity_view_unique_session'),
+        ),
+    ]
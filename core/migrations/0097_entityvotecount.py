@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def count_votes(apps, schema_editor):
+    Annotation = apps.get_model('core', 'Annotation')
+    Entity = apps.get_model('core', 'Entity')
+    EntityVoteCount = apps.get_model('core', 'EntityVoteCount')
+
+    since = django.utils.timezone.now() - django.utils.timezone.timedelta(days=settings.LEADERBOARD_WINDOW_DAYS)
+    totals = Annotation.objects.filter(key='voted', created_at__gte=since, object_id__in=Entity.objects.values('id')) \
+        .order_by() \
+        .values('object_id') \
+        .annotate(votes=models.Count('id'), last_voted_at=models.Max('created_at'))
+
+    EntityVoteCount.objects.bulk_create([EntityVoteCount(entity_id=row['object_id'],
+                                                         votes=row['votes'],
+                                                         last_voted_at=row['last_voted_at'])
+                                         for row in totals], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0096_entityview_unique_viewer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntityVoteCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('votes', models.IntegerField(default=0)),
+                ('last_voted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('entity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='vote_counter', to='core.entity')),
+            ],
+        ),
+        migrations.RunPython(count_votes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_thread_roots(apps, schema_editor):
+    Comment = apps.get_model('core', 'Comment')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    comment_type = ContentType.objects.filter(app_label='core', model='comment').first()
+    comment_type_id = comment_type.id if comment_type else None
+
+    parents = {row[0]: row[1:] for row in Comment.objects.values_list('id', 'content_type_id', 'object_id')}
+
+    def position(comment_id):
+        seen = set()
+        depth = 0
+        content_type_id, object_id = parents[comment_id]
+        while content_type_id == comment_type_id and object_id in parents and object_id not in seen:
+            seen.add(object_id)
+            depth += 1
+            content_type_id, object_id = parents[object_id]
+        if content_type_id == comment_type_id:
+            return None, None, depth
+        return content_type_id, object_id, depth
+
+    comments = []
+    for comment_id in parents:
+        root_content_type_id, root_id, depth = position(comment_id)
+        comments.append(Comment(id=comment_id,
+                                root_content_type_id=root_content_type_id,
+                                root_id=root_id,
+                                depth=depth))
+
+    Comment.objects.bulk_update(comments, ['root_content_type', 'root_id', 'depth'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0097_entityvotecount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='root_content_type',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='contenttypes.contenttype'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='root_id',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(fill_thread_roots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_user_trigram_indexes'),
+        ('core', '0098_comment_thread_root'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofilefield',
+            name='value_list',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), blank=True, default=list, size=None),
+        ),
+        migrations.RunSQL(
+            sql="UPDATE core_userprofilefield SET value_list = string_to_array(value, ',') WHERE value <> ''",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='userprofilefield',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['value_list'], name='core_userprofilefield_values'),
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS core_userprofilefield_value_trgm ON core_userprofilefield USING gin ((UPPER("value"::text)) gin_trgm_ops)',
+            reverse_sql='DROP INDEX IF EXISTS core_userprofilefield_value_trgm',
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0100_userimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='avatarexport',
+            name='failed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='avatarexport',
+            name='processed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='avatarexport',
+            name='total',
+            field=models.IntegerField(default=0),
+        ),
+    ]
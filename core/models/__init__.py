@@ -4,7 +4,7 @@ from .annotation import Annotation
 from .mixin import VoteMixin, BookmarkMixin, FollowMixin, NotificationMixin, ArticleMixin, RevisionMixin
 from .attachment import Attachment
 from .comment import Comment, CommentMixin, CommentRequest
-from .entity import Entity, EntityView, EntityViewCount
+from .entity import Entity, EntityView, EntityViewCount, EntityCommentCount, EntityVoteCount
 from .export import AvatarExport
 from .group import Group, GroupMembership, GroupInvitation, Subgroup, GroupProfileFieldSetting
 from .image import ResizedImage, ResizedImageMixin
@@ -13,11 +13,12 @@ from .profile_set import ProfileSet
 from .push_notification import WebPushSubscription
 from .revision import Revision
 from .rich_fields import MentionMixin, AttachmentMixin
-from .search import SearchQueryJournal
+from .search import SearchQueryJournal, SearchIndexQueueItem, SearchIndexRebuildItem
 from .setting import Setting
 from .shared import read_access_default, write_access_default
 from .site import SiteInvitation, SiteAccessRequest, SiteStat
 from .tags import Tag, TagSynonym, TagsModel
 from .user import UserProfile, ProfileField, UserProfileField, ProfileFieldValidator
+from .user_import import UserImport
 from .videocall import VideoCall, VideoCallGuest
 from .widget import Widget
@@ -39,6 +39,12 @@ class Comment(VoteMixin, MentionMixin, AttachmentMixin, CommentMixin):
     object_id = models.UUIDField(default=uuid.uuid4)
     container = GenericForeignKey('content_type', 'object_id')
 
+    # The object at the top of the thread, stored so a thread is read with one query
+    root_content_type = models.ForeignKey(ContentType, on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    root_id = models.UUIDField(null=True, blank=True, db_index=True)
+    root_container = GenericForeignKey('root_content_type', 'root_id')
+    depth = models.IntegerField(default=0)
+
     @property
     def guid(self):
         return str(self.id)
@@ -76,6 +82,7 @@ class Comment(VoteMixin, MentionMixin, AttachmentMixin, CommentMixin):
 
     def save(self, *args, **kwargs):
         created = self._state.adding
+        self.update_thread_position()
         super(Comment, self).save(*args, **kwargs)
         if created:
             self.create_notifications()
@@ -112,13 +119,35 @@ class Comment(VoteMixin, MentionMixin, AttachmentMixin, CommentMixin):
             return self.container.can_read(user)
         return False
 
+    def update_thread_position(self):
+        if self.content_type_id == ContentType.objects.get_for_model(Comment).id:
+            parent = self.container
+            self.root_content_type_id = parent.root_content_type_id if parent else None
+            self.root_id = parent.root_id if parent else None
+            self.depth = parent.depth + 1 if parent else 0
+        else:
+            self.root_content_type_id = self.content_type_id
+            self.root_id = self.object_id
+            self.depth = 0
+
     def get_root_container(self, parent=None):
         if not parent:
+            if self.root_id:
+                return self.root_container
             parent = self.container
         if isinstance(parent, Comment):
             return self.get_root_container(parent.container)
         return parent
 
+    def get_root_entity_id(self):
+        """ Id of the entity at the top of the thread, without loading it """
+        from core.models import Entity
+        if not self.root_id:
+            container = self.get_root_container()
+            return container.pk if isinstance(container, Entity) else None
+        model = ContentType.objects.get_for_id(self.root_content_type_id).model_class()
+        return self.root_id if model and issubclass(model, Entity) else None
+
     def index_instance(self):
         return self.get_root_container()
 
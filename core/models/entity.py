@@ -1,10 +1,12 @@
 import logging
 import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.postgres.fields import ArrayField
-from django.db import models
-from django.db.models import Q
+from django.db import connection, models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from model_utils.managers import InheritanceManager
@@ -14,6 +16,7 @@ from core.constances import ENTITY_STATUS, USER_ROLES
 from core.lib import get_acl, datetime_isoformat, get_model_name, tenant_schema, get_access_id, datetime_utciso
 from core.models.tags import TagsModel
 from core.models.shared import read_access_default, write_access_default
+from core.utils.access import get_access_context
 
 logger = logging.getLogger(__name__)
 
@@ -98,6 +101,10 @@ class EntityManager(InheritanceManager):
 class Entity(TagsModel):
     class Meta:
         ordering = ['published']
+        indexes = [
+            models.Index(fields=['published', 'id'], name='entity_published_id_idx'),
+            models.Index(fields=['last_action', 'id'], name='entity_last_action_id_idx'),
+        ]
 
     objects = EntityManager()
 
@@ -141,6 +148,9 @@ class Entity(TagsModel):
     is_featured = models.BooleanField(default=False)
     is_recommended = models.BooleanField(default=False)
 
+    # Denormalized type_to_string, lets lists filter on subtype without joining every subclass table
+    subtype = models.CharField(max_length=64, blank=True, default='', db_index=True)
+
     @property
     def guid(self):
         return str(self.id)
@@ -174,10 +184,17 @@ class Entity(TagsModel):
         except ObjectDoesNotExist:
             return None
 
+    def get_subtype(self):
+        """ Empty for a base Entity instance, that does not know its subclass """
+        return getattr(self, 'type_to_string', '')
+
     def save(self, *args, **kwargs):
         created = self._state.adding
         if not created:
             self.cleanup_notifications()
+        subtype = self.get_subtype()
+        if subtype:
+            self.subtype = subtype
         super(Entity, self).save(*args, **kwargs)
         if created:
             self.send_notifications_on_create()
@@ -227,12 +244,17 @@ class Entity(TagsModel):
         if user.is_authenticated and user.has_role(USER_ROLES.ADMIN):
             return True
 
-        if user.is_authenticated and self.group and self.group.members.filter(user=user,
-                                                                              type__in=['admin', 'owner']).exists():
+        if user.is_authenticated and self.group_id and self._is_group_admin(user):
             return True
 
         return len(get_acl(user) & set(self.write_access)) > 0
 
+    def _is_group_admin(self, user):
+        access_context = get_access_context(user)
+        if access_context:
+            return access_context.is_group_admin(self.group_id)
+        return self.group.members.filter(user=user, type__in=['admin', 'owner']).exists()
+
     def get_read_access(self):
         return self.read_access
 
@@ -262,12 +284,81 @@ class Entity(TagsModel):
         }
 
 
+class EntityViewManager(models.Manager):
+
+    def register(self, entity_id, viewer_id=None, session=None):
+        """
+        Store the first view of an entity by a user or session.
+        Returns True if this was a new viewer, repeated views are ignored by the unique constraints.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO {} (entity_id, viewer_id, session, created_at, counted) "
+                "VALUES (%s, %s, %s, %s, false) ON CONFLICT DO NOTHING".format(self.model._meta.db_table),
+                [entity_id, viewer_id, session, timezone.now()])
+            return cursor.rowcount == 1
+
+    def cleanup(self, before):
+        """
+        Remove counted anonymous views from before the given moment.
+        The session they belong to has expired, so they will not be seen again.
+        """
+        return self.filter(counted=True, viewer__isnull=True, created_at__lt=before).delete()[0]
+
+
 class EntityView(models.Model):
     entity = models.ForeignKey('core.Entity', on_delete=models.CASCADE, related_name="views")
     viewer = models.ForeignKey('user.User', on_delete=models.CASCADE, related_name="viewed_entities",
                                null=True, blank=True, default=None)
     session = models.TextField(max_length=128, null=True, blank=True, default=None)
     created_at = models.DateTimeField(default=timezone.now)
+    counted = models.BooleanField(default=False)
+
+    objects = EntityViewManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'viewer'],
+                                    condition=Q(viewer__isnull=False),
+                                    name='entity_view_unique_viewer'),
+            models.UniqueConstraint(fields=['entity', 'session'],
+                                    condition=Q(session__isnull=False),
+                                    name='entity_view_unique_session'),
+        ]
+
+
+class EntityViewCountManager(models.Manager):
+
+    def flush(self, batch_size=10000):
+        """
+        Add the views that were registered since the last flush to the counters
+        """
+        flushed = 0
+        while True:
+            with transaction.atomic():
+                views = list(EntityView.objects.filter(counted=False)
+                             .select_for_update(skip_locked=True)
+                             .order_by('id')
+                             .values_list('id', 'entity_id', 'created_at')[:batch_size])
+                if not views:
+                    return flushed
+
+                totals = {}
+                for _, entity_id, created_at in views:
+                    count, last_view = totals.get(entity_id, (0, created_at))
+                    totals[entity_id] = (count + 1, max(last_view, created_at))
+
+                existing = set(self.filter(entity_id__in=totals).values_list('entity_id', flat=True))
+                for entity_id in existing:
+                    count, last_view = totals[entity_id]
+                    self.filter(entity_id=entity_id).update(views=F('views') + count,
+                                                            updated_at=Greatest(F('updated_at'), last_view))
+                self.bulk_create([self.model(entity_id=entity_id, views=count, updated_at=last_view)
+                                  for entity_id, (count, last_view) in totals.items()
+                                  if entity_id not in existing])
+
+                EntityView.objects.filter(id__in=[pk for pk, _, _ in views]).update(counted=True)
+                flushed += len(views)
 
 
 class EntityViewCount(models.Model):
@@ -275,3 +366,117 @@ class EntityViewCount(models.Model):
     views = models.IntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(default=timezone.now)
+
+    objects = EntityViewCountManager()
+
+
+class EntityCommentCountManager(models.Manager):
+
+    def increment(self, entity_id):
+        _, created = self.get_or_create(entity_id=entity_id, defaults={'comments': 1})
+        if not created:
+            self.filter(entity_id=entity_id).update(comments=F('comments') + 1,
+                                                    updated_at=timezone.now())
+
+    def decrement(self, entity_id):
+        # Never create counters here; the entity itself may be on its way out.
+        self.filter(entity_id=entity_id).update(comments=Greatest(F('comments') - 1, 0),
+                                                updated_at=timezone.now())
+
+    def rebuild(self):
+        """
+        Recalculate all counters from the comment table, grouped by the stored thread root
+        """
+        from core.models import Comment
+
+        totals = dict(Comment.objects.filter(root_id__isnull=False)
+                      .order_by()
+                      .values('root_id')
+                      .annotate(total=models.Count('id'))
+                      .values_list('root_id', 'total'))
+
+        entity_ids = set(Entity.objects.filter(id__in=totals.keys()).values_list('id', flat=True))
+        self.exclude(entity_id__in=entity_ids).delete()
+
+        existing = {c.entity_id: c for c in self.filter(entity_id__in=entity_ids)}
+        now = timezone.now()
+        for entity_id, counter in existing.items():
+            counter.comments = totals[entity_id]
+            counter.updated_at = now
+        self.bulk_update(existing.values(), ['comments', 'updated_at'], batch_size=1000)
+        self.bulk_create([self.model(entity_id=entity_id, comments=totals[entity_id])
+                          for entity_id in entity_ids if entity_id not in existing], batch_size=1000)
+
+        return len(entity_ids)
+
+
+class EntityCommentCount(models.Model):
+    """
+    Number of comments, including replies, on an entity. Maintained by comment signals.
+    """
+    objects = EntityCommentCountManager()
+
+    entity = models.OneToOneField('core.Entity', on_delete=models.CASCADE, related_name="comment_counter")
+    comments = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+
+class EntityVoteCountManager(models.Manager):
+
+    @staticmethod
+    def window_start():
+        return timezone.now() - timezone.timedelta(days=settings.LEADERBOARD_WINDOW_DAYS)
+
+    def increment(self, entity_id, voted_at):
+        _, created = self.get_or_create(entity_id=entity_id, defaults={'votes': 1, 'last_voted_at': voted_at})
+        if not created:
+            self.filter(entity_id=entity_id).update(votes=F('votes') + 1,
+                                                    last_voted_at=Greatest(F('last_voted_at'), voted_at))
+
+    def decrement(self, entity_id, voted_at):
+        # Votes from before the window were already left out by the last refresh
+        if voted_at >= self.window_start():
+            self.filter(entity_id=entity_id).update(votes=Greatest(F('votes') - 1, 0))
+
+    def refresh(self):
+        """
+        Recalculate the counters from the votes within the window, with one aggregate query.
+        """
+        from core.models import Annotation
+
+        totals = {row['object_id']: row for row in Annotation.objects
+                  .filter(key='voted', created_at__gte=self.window_start(),
+                          object_id__in=Entity.objects.values('id'))
+                  .order_by()
+                  .values('object_id')
+                  .annotate(votes=models.Count('id'), last_voted_at=models.Max('created_at'))}
+
+        self.exclude(entity_id__in=totals.keys()).delete()
+
+        existing = {c.entity_id: c for c in self.filter(entity_id__in=totals.keys())}
+        changed = []
+        for entity_id, counter in existing.items():
+            if (counter.votes, counter.last_voted_at) != (totals[entity_id]['votes'], totals[entity_id]['last_voted_at']):
+                counter.votes = totals[entity_id]['votes']
+                counter.last_voted_at = totals[entity_id]['last_voted_at']
+                changed.append(counter)
+        self.bulk_update(changed, ['votes', 'last_voted_at'], batch_size=1000)
+        self.bulk_create([self.model(entity_id=entity_id, votes=row['votes'], last_voted_at=row['last_voted_at'])
+                          for entity_id, row in totals.items() if entity_id not in existing], batch_size=1000)
+
+        return len(totals)
+
+    def visible(self, user):
+        return self.filter(votes__gt=0, entity__read_access__overlap=list(get_acl(user)))
+
+
+class EntityVoteCount(models.Model):
+    """
+    Number of votes on an entity within the leaderboard window. Maintained by vote signals and
+    recalculated by a daily task, so votes that leave the window stop counting.
+    """
+    objects = EntityVoteCountManager()
+
+    entity = models.OneToOneField('core.Entity', on_delete=models.CASCADE, related_name="vote_counter")
+    votes = models.IntegerField(default=0)
+    last_voted_at = models.DateTimeField(default=timezone.now)
@@ -18,6 +18,9 @@ class AvatarExport(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
     initiator = models.ForeignKey('user.User', on_delete=models.CASCADE)
     status = models.CharField(max_length=11, choices=STATUS_CHOICES, default='pending')
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
     created_at = models.DateTimeField(default=localtime)
     updated_at = models.DateTimeField(auto_now=True)
     file = models.ForeignKey('file.FileFolder', on_delete=models.CASCADE, null=True)
@@ -14,6 +14,7 @@ from django.utils import timezone
 from core.lib import ACCESS_TYPE, get_access_ids, access_id_to_acl
 from core.constances import USER_ROLES
 from core.models.featured import FeaturedCoverMixin
+from core.utils.access import get_access_context, invalidate_access_context
 from core.utils.convert import tiptap_to_text
 from .tags import TagsModel
 from .rich_fields import AttachmentMixin, ReplaceAttachments
@@ -111,6 +112,10 @@ class Group(TagsModel, FeaturedCoverMixin, AttachmentMixin):
         if not user.is_authenticated:
             return False
 
+        access_context = get_access_context(user)
+        if access_context:
+            return access_context.is_member(self.id)
+
         try:
             return self.members.filter(user=user).exists()
         except ObjectDoesNotExist:
@@ -120,6 +125,10 @@ class Group(TagsModel, FeaturedCoverMixin, AttachmentMixin):
         if not user.is_authenticated:
             return False
 
+        access_context = get_access_context(user)
+        if access_context:
+            return access_context.is_full_member(self.id)
+
         try:
             return self.members.filter(
                 user=user,
@@ -132,6 +141,10 @@ class Group(TagsModel, FeaturedCoverMixin, AttachmentMixin):
         if not user.is_authenticated:
             return False
 
+        access_context = get_access_context(user)
+        if access_context:
+            return access_context.role(self.id) == 'pending'
+
         return self.members.filter(user=user, type='pending').exists()
 
     def can_write(self, user):
@@ -141,9 +154,13 @@ class Group(TagsModel, FeaturedCoverMixin, AttachmentMixin):
         if user.has_role(USER_ROLES.ADMIN):
             return True
 
-        if user == self.owner:
+        if user.id == self.owner_id:
             return True
 
+        access_context = get_access_context(user)
+        if access_context:
+            return access_context.is_group_admin(self.id)
+
         return self.members.filter(user=user, type__in=['admin', 'owner']).exists()
 
     def join(self, user, member_type='member'):
@@ -157,6 +174,7 @@ class Group(TagsModel, FeaturedCoverMixin, AttachmentMixin):
                 'is_notifications_enabled': self.auto_notification
             }
         )
+        invalidate_access_context(user.id)
 
         # send welcome message for new members
         if obj.type == 'member' and not already_member and self.welcome_message:
@@ -175,6 +193,8 @@ class Group(TagsModel, FeaturedCoverMixin, AttachmentMixin):
             return self.members.get(user=user).delete()
         except ObjectDoesNotExist:
             return False
+        finally:
+            invalidate_access_context(user.id)
 
     def set_member_is_notifications_enabled(self, user, is_notifications_enabled):
         member = self.members.filter(user=user).first()
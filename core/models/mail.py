@@ -1,12 +1,16 @@
 import logging
+import time
 import traceback
+from smtplib import SMTPServerDisconnected
 
+from django.core.mail import get_connection
 from django.db import models
 from django.utils import timezone
 from django.utils.module_loading import import_string
 
+from core import config
 from core.lib import tenant_schema
-from core.mail_builders.base import MailerBase, assert_valid_mailer_subclass
+from core.mail_builders.base import MailDelivery, MailerBase, assert_valid_mailer_subclass
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +31,23 @@ class MailInstanceManager(models.Manager):
 
         return instance
 
+    def submit_many(self, mailer, mailer_kwargs_list, batch_size=100):
+        """
+        Store a mail instance for each set of kwargs and enqueue them in batches
+        """
+        assert_valid_mailer_subclass(mailer)
+
+        instances = self.bulk_create([self.model(mailer=mailer.class_id(),
+                                                 mailer_kwargs=mailer_kwargs)
+                                      for mailer_kwargs in mailer_kwargs_list])
+
+        from core.tasks import send_mail_by_instances
+        ids = [instance.id for instance in instances]
+        for offset in range(0, len(ids), batch_size):
+            send_mail_by_instances.delay(tenant_schema(), ids[offset:offset + batch_size])
+
+        return instances
+
 
 class MailInstance(models.Model):
     objects = MailInstanceManager()
@@ -42,22 +63,39 @@ class MailInstance(models.Model):
         return mailer_class(**self.mailer_kwargs)
 
     def send(self):
-        mailer: MailerBase = self._build_mailer()
-
+        log = self.deliver(self._build_mailer())
+        if log:
+            log.save()
+
+    def deliver(self, mailer: MailerBase, delivery: MailDelivery = None):
+        """
+        Send the mail and return the (unsaved) log record,
+        or None if the mail was not sent on purpose.
+        """
+        mailer.delivery = delivery
         try:
             self.error = None
             result = mailer.send()
         except MailerBase.FailSilentlyError:
-            return
+            return None
         except Exception as e:
-            self.error = e
-            result = {
-                'error': str(e),
-                'error_type': str(e.__class__),
-                'traceback': traceback.format_exc()
-            }
-
-        MailLog.objects.create(
+            return self.failed(mailer, e)
+
+        return self._log(mailer, result)
+
+    def failed(self, mailer: MailerBase, error):
+        """
+        The (unsaved) log record of a mail that could not be sent.
+        """
+        self.error = error
+        return self._log(mailer, {
+            'error': str(error),
+            'error_type': str(error.__class__),
+            'traceback': traceback.format_exc()
+        })
+
+    def _log(self, mailer, result):
+        return MailLog(
             subject=mailer.get_subject(),
             sender=mailer.get_sender(),
             receiver=mailer.get_receiver(),
@@ -67,6 +105,74 @@ class MailInstance(models.Model):
         )
 
 
+def reopen_connection(connection):
+    try:
+        connection.close()
+        connection.open()
+        return True
+    except Exception as e:
+        logger.error("Could not reconnect to the mail server: %s", e)
+        return False
+
+
+def deliver_mail_instances(instance_ids):
+    """
+    Send a batch of mail instances over one mail connection and log them at once.
+    Returns the delivery statistics of the batch.
+    """
+    started = time.monotonic()
+    stats = {'sent': 0, 'failed': 0, 'skipped': 0, 'errors': []}
+
+    mailers = []
+    for instance in MailInstance.objects.filter(id__in=instance_ids).order_by('id'):
+        try:
+            mailers.append((instance, instance._build_mailer()))
+        except MailerBase.FailSilentlyError:
+            stats['skipped'] += 1
+        except Exception as e:
+            instance.error = e
+            stats['failed'] += 1
+            stats['errors'].append(instance)
+
+    logs = []
+    previous_snapshot = config.begin_snapshot()
+    connection = get_connection()
+    try:
+        try:
+            connection.open()
+        except Exception as e:
+            logger.error("Could not connect to the mail server: %s", e)
+            for instance, mailer in mailers:
+                logs.append(instance.failed(mailer, e))
+                stats['failed'] += 1
+                stats['errors'].append(instance)
+            mailers = []
+
+        delivery = MailDelivery(connection)
+        delivery.prefetch_inactive_users([mailer.get_receiver_email() for _, mailer in mailers])
+
+        for instance, mailer in mailers:
+            log = instance.deliver(mailer, delivery)
+            if isinstance(instance.error, SMTPServerDisconnected) and reopen_connection(connection):
+                log = instance.deliver(mailer, delivery)
+            if not log:
+                stats['skipped'] += 1
+                continue
+            logs.append(log)
+            if instance.error:
+                stats['failed'] += 1
+                stats['errors'].append(instance)
+            else:
+                stats['sent'] += 1
+        MailLog.objects.bulk_create(logs)
+    finally:
+        connection.close()
+        config.end_snapshot(previous_snapshot)
+
+    stats['seconds'] = time.monotonic() - started
+    return stats
+
+
 def load_mailinstance(pk):
     return MailInstance.objects.get(id=pk)
 
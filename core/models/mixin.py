@@ -282,8 +282,7 @@ class CommentMixin(models.Model):
         if not user.is_authenticated:
             return False
 
-        if isinstance(self, apps.get_model('core', 'Comment')) and \
-                isinstance(self.container, apps.get_model('core', 'Comment')):
+        if isinstance(self, apps.get_model('core', 'Comment')) and self.depth > 0:
             return False
 
         if self.group and not self.group.is_full_member(user) and not user.has_role(USER_ROLES.ADMIN):
@@ -291,19 +290,54 @@ class CommentMixin(models.Model):
 
         return True
 
-    def get_flat_comment_list(self, comments=None):
-        if not comments:
-            comments = self.comments.all()
-        for item in comments:
+    def get_comment_thread(self):
+        """
+        Comments on this object with their replies attached, read in one query.
+        """
+        if not hasattr(self, '_thread_comments'):
+            Comment = apps.get_model('core', 'Comment')
+            if isinstance(self, Comment):
+                comments = Comment.objects.filter(root_id=self.root_id, depth__gt=self.depth)
+            else:
+                comments = Comment.objects.filter(root_id=self.pk)
+            build_comment_thread(self, comments.select_related('owner'))
+        return self._thread_comments
+
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_thread_comments', None)
+        super(CommentMixin, self).refresh_from_db(*args, **kwargs)
+
+    def get_flat_comment_list(self):
+        for item in self.get_comment_thread():
             yield item
-            if item.comments.count() > 0:
-                for x in self.get_flat_comment_list(item.comments.all()):
-                    yield x
+            yield from item.get_flat_comment_list()
 
     class Meta:
         abstract = True
 
 
+def build_comment_thread(container, comments):
+    """
+    Attach the replies of every comment in `comments` to their parent,
+    with the parent as cached container, starting from `container`.
+    """
+    Comment = apps.get_model('core', 'Comment')
+
+    children = {}
+    for comment in comments:
+        children.setdefault(comment.object_id, []).append(comment)
+
+    def attach(parent, root):
+        parent._thread_comments = children.get(parent.pk, [])
+        for comment in parent._thread_comments:
+            Comment.container.set_cached_value(comment, parent)
+            if root is not None:
+                Comment.root_container.set_cached_value(comment, root)
+            attach(comment, root)
+
+    attach(container, None if isinstance(container, Comment) else container)
+
+
 class RevisionMixin(models.Model):
     class Meta:
         abstract = True
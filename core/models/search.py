@@ -1,6 +1,6 @@
 import re
 
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Count
 from django.utils import timezone
 
@@ -55,3 +55,58 @@ class SearchQueryJournal(models.Model):
 
     def __repr__(self):
         return f"<{self.__class__.__name__}: {self}>"
+
+
+class SearchIndexQueueManager(models.Manager):
+
+    def enqueue(self, items):
+        """
+        Record (model, object_id) pairs. Pairs already waiting in the queue are left alone,
+        that is how repeated updates within one flush window are coalesced.
+        """
+        self.bulk_create([self.model(model=model, object_id=str(object_id))
+                          for model, object_id in items],
+                         ignore_conflicts=True)
+
+    def take(self, limit):
+        with transaction.atomic():
+            items = list(self.get_queryset()
+                         .select_for_update(skip_locked=True)
+                         .order_by('created_at')[:limit])
+            self.filter(pk__in=[item.pk for item in items]).delete()
+        return items
+
+
+class SearchIndexQueueItem(models.Model):
+    """
+    Objects that changed since the search index was last updated.
+    """
+    objects = SearchIndexQueueManager()
+
+    class Meta:
+        unique_together = ('model', 'object_id')
+
+    model = models.CharField(max_length=128)
+    object_id = models.CharField(max_length=64)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"SearchIndexQueueItem[{self.model}:{self.object_id}]"
+
+
+class SearchIndexRebuildItem(models.Model):
+    """
+    Objects that changed while a rebuild of the search indexes was running.
+    They are queued again when the rebuilt indexes are taken into use.
+    """
+    objects = SearchIndexQueueManager()
+
+    class Meta:
+        unique_together = ('model', 'object_id')
+
+    model = models.CharField(max_length=128)
+    object_id = models.CharField(max_length=64)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"SearchIndexRebuildItem[{self.model}:{self.object_id}]"
@@ -1,8 +1,41 @@
+import uuid
+
 from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
 from django.db import models
-from django.db.models import Q
 
-from core.lib import NumberIncrement
+from core.lib import NumberIncrement, tenant_schema
+
+SYNONYM_MAP_VERSION_KEY = '__TAG_SYNONYM_MAP_VERSION__'
+
+# schema name: (version, {synonym label: tag label})
+_synonym_maps = {}
+
+
+def synonym_map():
+    """
+    Synonym to tag label for the current tenant. The map is kept in the process
+    and loaded again when another process changed a tag or synonym.
+    """
+    key = "%s%s" % (tenant_schema(), SYNONYM_MAP_VERSION_KEY)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    loaded = _synonym_maps.get(tenant_schema())
+    if loaded and loaded[0] == version:
+        return loaded[1]
+
+    mapping = {label.lower(): tag_label.lower()
+               for label, tag_label in TagSynonym.objects.values_list('label', 'tag__label')}
+    _synonym_maps[tenant_schema()] = (version, mapping)
+    return mapping
+
+
+def invalidate_synonym_map():
+    cache.set("%s%s" % (tenant_schema(), SYNONYM_MAP_VERSION_KEY), uuid.uuid4().hex, None)
+    _synonym_maps.pop(tenant_schema(), None)
 
 
 class Tag(models.Model):
@@ -10,13 +43,25 @@ class Tag(models.Model):
 
     @staticmethod
     def translate_tags(tags):
-        synonym_to_tag = {s.label.lower(): s.tag.label.lower() for s in TagSynonym.objects.all()}
+        synonym_to_tag = synonym_map()
         for tag in tags:
             ltag = tag.lower()
-            try:
-                yield synonym_to_tag[ltag]
-            except KeyError:
-                yield ltag
+            yield synonym_to_tag.get(ltag, ltag)
+
+    @staticmethod
+    def resolve_labels(labels):
+        """
+        Tag objects for the given labels or synonyms, by lowercase label. Missing tags are created.
+        """
+        translated = {label.lower(): tag_label for label, tag_label in zip(labels, Tag.translate_tags(labels))}
+        tags = {tag.label: tag for tag in Tag.objects.filter(label__in=set(translated.values()))}
+
+        missing = set(translated.values()) - set(tags)
+        if missing:
+            Tag.objects.bulk_create([Tag(label=label) for label in missing], ignore_conflicts=True)
+            tags.update((tag.label, tag) for tag in Tag.objects.filter(label__in=missing))
+
+        return {label: tags[tag_label] for label, tag_label in translated.items()}
 
     @property
     def all_matches(self):
@@ -51,7 +96,7 @@ class EntityTag(models.Model):
 
     @classmethod
     def summary(cls, entity_id):
-        return [et.tag.label for et in cls.objects.filter(entity_id=entity_id)]
+        return [et.tag.label for et in cls.objects.filter(entity_id=entity_id).select_related('tag')]
 
     def __str__(self):
         return "%s (%s)" % (self.author_label, self.tag.label)
@@ -92,51 +137,71 @@ class TagsModel(models.Model):
 
     category_tags = models.JSONField(default=list, blank=True)
 
+    def _entity_tags(self):
+        try:
+            return self._prefetched_entity_tags
+        except AttributeError:
+            return list(EntityTag.objects.filter(entity_id=self.id).select_related('tag'))
+
     @property
     def tags(self):
-        my_tags = EntityTag.objects.filter(entity_id=self.id)
-        return [ref.author_label for ref in my_tags]
+        return [ref.author_label for ref in self._entity_tags()]
 
     @property
     def tags_matches(self):
-        my_tags = EntityTag.objects.filter(entity_id=self.id)
+        entity_tags = self._entity_tags()
+        synonyms = {}
+        for tag_id, label in TagSynonym.objects.filter(tag_id__in={ref.tag_id for ref in entity_tags}) \
+                .values_list('tag_id', 'label'):
+            synonyms.setdefault(tag_id, []).append(label)
+
         result = []
-        for entity_tag in my_tags:
-            result.extend(entity_tag.tag.all_matches)
+        for entity_tag in entity_tags:
+            result.append(entity_tag.tag.label)
+            result.extend(synonyms.get(entity_tag.tag_id, []))
         for category in self.category_tags:
             result.extend(flat_category_tags(category, brief=True))
         return result
 
     @tags.setter
     def tags(self, tags):
+        resolved = Tag.resolve_labels(tags)
+
         expected = []
         tag_mapping = dict()
         for tag in tags:
-            tag_obj = Tag.objects.filter(Q(label=tag.lower()) | Q(synonyms__label=tag.lower())).first()
-            if not tag_obj:
-                tag_obj = Tag.objects.create(label=tag.lower())
-            expected.append(tag_obj)
-            if not tag_mapping.get(tag_obj.label):
+            tag_obj = resolved[tag.lower()]
+            if tag_obj.label not in tag_mapping:
+                expected.append(tag_obj)
                 tag_mapping[tag_obj.label] = tag
 
-        expected_labels = {tag.label for tag in expected}
-        for label in self.tags:
-            if label not in expected_labels:
-                try:
-                    remove = EntityTag.objects.get(tag__label=label.lower(), entity_id=self.id)
-                    remove.delete()
-                except EntityTag.DoesNotExist:
-                    pass
+        existing = {}
+        obsolete = []
+        for ref in EntityTag.objects.filter(entity_id=self.id).select_related('tag'):
+            if ref.tag.label in tag_mapping and ref.tag.label not in existing:
+                existing[ref.tag.label] = ref
+            else:
+                obsolete.append(ref.id)
+        if obsolete:
+            EntityTag.objects.filter(id__in=obsolete).delete()
 
         weight = NumberIncrement()
+        changed = []
+        created = []
         for tag_obj in expected:
-            obj, _ = EntityTag.objects.get_or_create(tag=tag_obj,
-                                                     entity_id=self.id)
-            obj.author_label = tag_mapping[tag_obj.label]
-            obj.weight = weight.next()
-            obj.save()
-
-        self._expected_labels = expected_labels
+            ref = existing.get(tag_obj.label)
+            author_label, ref_weight = tag_mapping[tag_obj.label], weight.next()
+            if not ref:
+                created.append(EntityTag(tag=tag_obj, entity_id=self.id, author_label=author_label, weight=ref_weight))
+            elif (ref.author_label, ref.weight) != (author_label, ref_weight):
+                ref.author_label, ref.weight = author_label, ref_weight
+                changed.append(ref)
+        EntityTag.objects.bulk_update(changed, ['author_label', 'weight'])
+        EntityTag.objects.bulk_create(created)
+
+        self._expected_labels = set(tag_mapping)
+        self._pending_tag_summary = [tag_obj.label for tag_obj in expected]
+        self.__dict__.pop('_prefetched_entity_tags', None)
 
     @property
     def category_tags_index(self):
@@ -147,15 +212,34 @@ class TagsModel(models.Model):
         assert is_registered_for_tags(self.__class__), \
             "Register the base TagsModel model using register_model_for_tags at the app's ready method."
         assert '_tag_summary' in [f.name for f in self._meta.fields], "Provide a _tag_summary ArrayField"
-        self._tag_summary = EntityTag.summary(self.id)
+        if hasattr(self, '_pending_tag_summary'):
+            self._tag_summary = self.__dict__.pop('_pending_tag_summary')
+        else:
+            self._tag_summary = EntityTag.summary(self.id)
         self._category_summary = [*self.category_tags_index]
         super(TagsModel, self).save(*args, **kwargs)
 
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_prefetched_entity_tags', None)
+        super(TagsModel, self).refresh_from_db(*args, **kwargs)
+
     def delete(self, *args, **kwargs):
         super(TagsModel, self).delete(*args, **kwargs)
         EntityTag.objects.filter(entity_id=self.id).delete()
 
 
+def prefetch_tags(entities):
+    """
+    Load the tags of a list of entities with one query; the tags properties of the entities use them.
+    """
+    entities = [e for e in entities if isinstance(e, TagsModel)]
+    per_entity = {}
+    for ref in EntityTag.objects.filter(entity_id__in=[e.id for e in entities]).select_related('tag'):
+        per_entity.setdefault(ref.entity_id, []).append(ref)
+    for entity in entities:
+        entity._prefetched_entity_tags = per_entity.get(entity.id, [])
+
+
 def flat_category_tags(category, brief=False):
     if not category:
         return
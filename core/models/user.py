@@ -3,6 +3,7 @@ import logging
 from auditlog.registry import auditlog
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 
 from django.utils import timezone
 from datetime import datetime
@@ -248,6 +249,10 @@ class UserProfileFieldManager(models.Manager):
             return qs
         return qs.filter(read_access__overlap=list(get_acl(user)))
 
+    def with_any_value(self, key, values):
+        """ Fields with key `key` holding one or more of `values` """
+        return self.get_queryset().filter(profile_field__key=key, value_list__overlap=list(values))
+
 
 def validate_profile_sections(sections):
     profile_sections = []
@@ -262,9 +267,17 @@ def validate_profile_sections(sections):
     return profile_sections
 
 
+def split_profile_field_value(value):
+    """ Multi value profile fields are stored comma separated """
+    return value.split(',') if value else []
+
+
 class UserProfileField(models.Model):
     class Meta:
         unique_together = ('user_profile', 'profile_field')
+        indexes = [
+            GinIndex(fields=['value_list'], name='core_userprofilefield_values'),
+        ]
 
     objects = UserProfileFieldManager()
 
@@ -272,6 +285,8 @@ class UserProfileField(models.Model):
     user_profile = models.ForeignKey('core.UserProfile', on_delete=models.CASCADE, related_name="user_profile_fields")
     profile_field = models.ForeignKey('core.ProfileField', on_delete=models.CASCADE, related_name="profile_fields")
     value = models.TextField()
+    # The separate values of `value`, to filter on with an index
+    value_list = ArrayField(models.TextField(), blank=True, default=list)
     value_date = models.DateField(default=None, blank=True, null=True)
     read_access = ArrayField(
         models.CharField(max_length=64),
@@ -318,6 +333,7 @@ class UserProfileField(models.Model):
 
     def save(self, *args, **kwargs):
         self.set_date_field_value()
+        self.value_list = split_profile_field_value(self.value)
         super(UserProfileField, self).save(*args, **kwargs)
 
     def index_instance(self):
@@ -0,0 +1,39 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class UserImport(models.Model):
+    """
+    Progress of a csv user import, polled by the admin interface.
+    """
+    class Meta:
+        ordering = ('-created_at',)
+
+    STATUS_CHOICES = (
+        ("pending", _("Pending")),
+        ("in_progress", _("In progress")),
+        ("ready", _("Ready")),
+        ("failed", _("Failed")),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    initiator = models.ForeignKey('user.User', on_delete=models.CASCADE)
+    status = models.CharField(max_length=11, choices=STATUS_CHOICES, default='pending')
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    created = models.IntegerField(default=0)
+    updated = models.IntegerField(default=0)
+    error = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def guid(self):
+        return str(self.id)
+
+    def __str__(self):
+        return f"UserImport[{self.status} {self.processed}/{self.total}]"
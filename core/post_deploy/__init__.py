@@ -134,4 +134,26 @@ def fix_user_profile_field_acl():
         field.save()
         count+=1
 
-    logger.info("Fixed ACL of %i profile fields in schema %s", count,  tenant_schema())
\ No newline at end of file
+    logger.info("Fixed ACL of %i profile fields in schema %s", count,  tenant_schema())
+
+
+@post_deploy_action
+def populate_entity_subtype():
+    """
+    Fill Entity.subtype for entities saved before the column existed
+    """
+    if is_schema_public():
+        return
+
+    from core.models import Entity
+
+    ids_by_subtype = {}
+    for entity in Entity.objects.filter(subtype='').select_subclasses().iterator(chunk_size=10000):
+        ids_by_subtype.setdefault(entity.get_subtype(), []).append(entity.id)
+
+    for subtype, ids in ids_by_subtype.items():
+        for offset in range(0, len(ids), 10000):
+            Entity.objects.filter(id__in=ids[offset:offset + 10000]).update(subtype=subtype)
+
+    logger.info("Populated subtype of %i entities in schema %s",
+                sum(len(ids) for ids in ids_by_subtype.values()), tenant_schema())
@@ -21,10 +21,12 @@ from .filters import filters
 from .revision import revision, content_version
 from .scalar import secure_rich_text
 from .site_settings import site_settings_private, site_settings_public
+from .user_import import user_import
 
 resolvers = [
     query, mutation, viewer, entity, user, group, member, comment, profile_item,
     profile_field_validator, invite, subgroup_list, subgroup, email_overview,
     notification, attachment, notifications_list, filters, revision, content_version,
-    secure_rich_text, site_agreement, site_agreement_version, site_settings_private, site_settings_public
+    secure_rich_text, site_agreement, site_agreement_version, site_settings_private, site_settings_public,
+    user_import
 ]
@@ -0,0 +1,130 @@
+"""
+Keyset pagination for entity lists.
+
+Instead of counting and skipping `offset` rows, the next page continues after
+the sort key of the last entity of the previous page. With an index on
+(sort key, id) the database reads only the rows of the page itself.
+"""
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from graphql import GraphQLError
+
+from core.constances import COULD_NOT_USE_CURSOR, INVALID_CURSOR, ORDER_BY, ORDER_DIRECTION
+from core.models import Entity
+
+CURSOR_ORDER_FIELDS = {
+    ORDER_BY.timePublished: 'published',
+    ORDER_BY.timeCreated: 'created_at',
+    ORDER_BY.timeUpdated: 'updated_at',
+    ORDER_BY.lastAction: 'last_action',
+}
+
+COUNT_CACHE_TIMEOUT = 60
+
+
+class EntityCursor:
+
+    def __init__(self, after, order_by=None, order_direction=None, sort_pinned=False):
+        order_field = CURSOR_ORDER_FIELDS.get(order_by or ORDER_BY.timePublished)
+        if not order_field:
+            raise GraphQLError(COULD_NOT_USE_CURSOR)
+
+        descending = order_direction != ORDER_DIRECTION.asc
+        self.order_field = order_field
+        self.keys = [(order_field, descending), ('id', descending)]
+        if sort_pinned:
+            self.keys.insert(0, ('is_pinned', True))
+
+        self.after = self.decode(after) if after else None
+
+    @property
+    def key_names(self):
+        return [name for name, _ in self.keys]
+
+    def ordering(self):
+        # Entities without a value for the sort field (drafts) come last in both directions
+        return [F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+                for name, descending in self.keys]
+
+    def filter(self, qs):
+        """ Order the queryset on the cursor keys and skip everything up to the cursor """
+        qs = qs.order_by(*self.ordering())
+        if self.after is not None:
+            qs = qs.filter(self.after_filter(self.after))
+        return qs
+
+    def after_filter(self, values):
+        """ Lexicographic (key1, key2, ...) > values, respecting the direction of each key """
+        query = Q(pk__in=[])
+        equal = Q()
+        for (name, descending), value in zip(self.keys, values):
+            query |= equal & self._beyond(name, descending, value)
+            equal &= Q(**{name: value}) if value is not None else Q(**{'%s__isnull' % name: True})
+        return query
+
+    @staticmethod
+    def _beyond(name, descending, value):
+        if value is None:
+            # nothing comes after the trailing null values
+            return Q(pk__in=[])
+        beyond = Q(**{'%s__%s' % (name, 'lt' if descending else 'gt'): value})
+        if Entity._meta.get_field(name).null:
+            beyond |= Q(**{'%s__isnull' % name: True})
+        return beyond
+
+    def page(self, qs, limit):
+        """
+        Read the sort keys of one page with a narrow query, then load the
+        entities of that page with their subclasses by primary key.
+        """
+        rows = list(qs.values_list(*self.key_names)[:limit + 1])
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+
+        ids = [row[-1] for row in rows]
+        entities = Entity.objects.filter(id__in=ids).select_subclasses().in_bulk()
+        edges = [entities[pk] for pk in ids if pk in entities]
+
+        return edges, self.encode(rows[-1]) if has_next else None
+
+    @staticmethod
+    def encode(values):
+        data = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+        data[-1] = str(data[-1])
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    def decode(self, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            assert isinstance(data, list) and len(data) == len(self.keys)
+            values = []
+            for (name, _), value in zip(self.keys, data):
+                if name == self.order_field and value is not None:
+                    value = parse_datetime(value)
+                    assert value is not None
+                values.append(value)
+            return values
+        except Exception:
+            raise GraphQLError(INVALID_CURSOR)
+
+
+def cached_count(qs):
+    """
+    Count of a list query, cached for a short while so paging through a
+    large list does not count all rows for every page.
+    """
+    sql, params = qs.order_by().query.sql_with_params()
+    digest = hashlib.md5(('%s%r' % (sql, params)).encode()).hexdigest()
+    key = "%sentity_count_%s" % (connection.schema_name, digest)
+
+    total = cache.get(key)
+    if total is None:
+        total = qs.count()
+        cache.set(key, total, COUNT_CACHE_TIMEOUT)
+    return total
@@ -0,0 +1,182 @@
+"""
+Request scoped batch loaders for entity fields.
+
+List resolvers register the entities of the page they return with
+prime_entity_loaders(). The first time a field is resolved for one of those
+entities the value is loaded for the whole page in one query.
+Entities that were not primed are loaded one at a time.
+"""
+from django.db.models import IntegerField, Sum
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast
+
+from core.constances import ACCESS_TYPE
+from core.models import Annotation, EntityCommentCount, EntityViewCount, Group
+from core.models.tags import prefetch_tags
+from user.models import User
+
+
+def graphql_context(request):
+    return {
+        "request": request,
+        "loaders": {},
+    }
+
+
+def get_loader(info, loader_class):
+    loaders = info.context.setdefault("loaders", {})
+    if loader_class not in loaders:
+        loaders[loader_class] = loader_class(info.context["request"].user)
+    return loaders[loader_class]
+
+
+def prime_entity_loaders(info, entities):
+    for loader_class in ENTITY_LOADERS:
+        get_loader(info, loader_class).prime(entities)
+
+
+class EntityBatchLoader:
+    default = None
+
+    def __init__(self, user):
+        self.user = user
+        self._pending = {}
+        self._values = {}
+
+    def prime(self, entities):
+        for entity in entities:
+            if entity.pk not in self._values:
+                self._pending[entity.pk] = entity
+
+    def load(self, entity):
+        if entity.pk not in self._values:
+            self._pending[entity.pk] = entity
+            entities = list(self._pending.values())
+            self._pending = {}
+
+            self._values.update({e.pk: self.default for e in entities})
+            self._values.update(self.batch_load(entities))
+
+        return self._values[entity.pk]
+
+    def batch_load(self, entities):
+        """ Return a dict with entity.pk: value for the given entities """
+        raise NotImplementedError()
+
+
+class VotesLoader(EntityBatchLoader):
+    default = 0
+
+    def batch_load(self, entities):
+        qs = Annotation.objects.filter(key='voted', object_id__in=[e.pk for e in entities]) \
+            .annotate(score=Cast(KeyTextTransform('score', 'data'), IntegerField())) \
+            .order_by() \
+            .values('object_id') \
+            .annotate(total=Sum('score'))
+        return {row['object_id']: row['total'] or 0 for row in qs}
+
+
+class UserAnnotationLoader(EntityBatchLoader):
+    default = False
+    key = None
+
+    def batch_load(self, entities):
+        if not self.user.is_authenticated:
+            return {}
+
+        qs = Annotation.objects.filter(key=self.key,
+                                       user=self.user,
+                                       object_id__in=[e.pk for e in entities])
+        return {object_id: True for object_id in qs.values_list('object_id', flat=True)}
+
+
+class HasVotedLoader(UserAnnotationLoader):
+    key = 'voted'
+
+
+class IsBookmarkedLoader(UserAnnotationLoader):
+    key = 'bookmarked'
+
+
+class IsFollowingLoader(UserAnnotationLoader):
+    key = 'followed'
+
+
+class ViewsLoader(EntityBatchLoader):
+    default = 0
+
+    def batch_load(self, entities):
+        qs = EntityViewCount.objects.filter(entity_id__in=[e.pk for e in entities])
+        return {entity_id: views for entity_id, views in qs.values_list('entity_id', 'views')}
+
+
+class CommentCountLoader(EntityBatchLoader):
+    default = 0
+
+    def batch_load(self, entities):
+        qs = EntityCommentCount.objects.filter(entity_id__in=[e.pk for e in entities])
+        return {entity_id: comments for entity_id, comments in qs.values_list('entity_id', 'comments')}
+
+
+class TagsLoader(EntityBatchLoader):
+    default = []
+
+    def batch_load(self, entities):
+        prefetch_tags(entities)
+        return {e.pk: e.tags for e in entities}
+
+
+class OwnerLoader(EntityBatchLoader):
+
+    def batch_load(self, entities):
+        owners = User.objects.in_bulk({e.owner_id for e in entities})
+        result = {}
+        for entity in entities:
+            owner = owners.get(entity.owner_id)
+            if owner:
+                entity.__class__.owner.field.set_cached_value(entity, owner)
+            result[entity.pk] = owner
+        return result
+
+
+class WriteAccessIdLoader(EntityBatchLoader):
+    default = 0
+
+    def batch_load(self, entities):
+        groups = Group.objects.prefetch_related('subgroups') \
+            .in_bulk({e.group_id for e in entities if e.group_id})
+
+        result = {}
+        for entity in entities:
+            group = groups.get(entity.group_id)
+            if group:
+                entity.__class__.group.field.set_cached_value(entity, group)
+            result[entity.pk] = self.write_access_id(entity, group)
+        return result
+
+    @staticmethod
+    def write_access_id(entity, group):
+        if group:
+            for subgroup in group.subgroups.all():
+                if ACCESS_TYPE.subgroup.format(subgroup.access_id) in entity.write_access:
+                    return subgroup.access_id
+            if ACCESS_TYPE.group.format(group.id) in entity.write_access:
+                return 4
+        if ACCESS_TYPE.public in entity.write_access:
+            return 2
+        if ACCESS_TYPE.logged_in in entity.write_access:
+            return 1
+        return 0
+
+
+ENTITY_LOADERS = [
+    VotesLoader,
+    HasVotedLoader,
+    IsBookmarkedLoader,
+    IsFollowingLoader,
+    ViewsLoader,
+    CommentCountLoader,
+    TagsLoader,
+    OwnerLoader,
+    WriteAccessIdLoader,
+]
@@ -23,4 +23,7 @@ def resolve_export_avatars(_, info):
     return {
         'guid': export.guid,
         'status': export.status,
+        'total': export.total,
+        'processed': export.processed,
+        'failed': export.failed,
     }
@@ -7,7 +7,7 @@ from django.utils.translation import ugettext_lazy
 from core import config
 from core.constances import NOT_LOGGED_IN, USER_NOT_SITE_ADMIN, USER_ROLES, INVALID_KEY
 from core.lib import clean_graphql_input, get_tmp_file_path, tenant_schema
-from core.models import ProfileField
+from core.models import ProfileField, UserImport
 
 def get_user_fields():
     # user fields
@@ -114,9 +114,12 @@ def resolve_import_users_step_2(_, info, input):
         if 'forceAccess' not in field:
             field['forceAccess'] = False
 
+    user_import = UserImport.objects.create(initiator=user)
+
     from core.tasks import import_users
-    import_users.delay(tenant_schema(), fields, csv_location, user.guid)
+    import_users.delay(tenant_schema(), fields, csv_location, user.guid, user_import.guid)
 
     return {
-        "success": True
+        "success": True,
+        "userImport": user_import
     }
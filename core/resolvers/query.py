@@ -1,11 +1,11 @@
 from ariadne import ObjectType
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.db.models import F
-from django.utils import timezone
+from django.core.cache import cache
+from django.db import connection
 from graphql import GraphQLError
 
 from core.constances import USER_NOT_MEMBER_OF_GROUP, USER_ROLES
-from core.models import Entity, EntityView, EntityViewCount, Group
+from core.models import Entity, EntityView, Group
 from user.models import User
 from .query_content_snapshots import resolve_content_snapshots
 from .query_meetings import resolve_query_appointment_data, resolve_query_appointment_times
@@ -25,10 +25,13 @@ from .query_site_users import resolve_site_users
 from .query_tags import resolve_list_tags
 from .query_top import resolve_top
 from .query_trending import resolve_trending
+from .query_user_import import resolve_user_import
 from .query_users import resolve_users
 from .query_users_by_birth_date import resolve_users_by_birth_date
 from .query_viewer import resolve_viewer
 
+VIEW_DEDUPE_TIMEOUT = 60 * 60
+
 query = ObjectType("Query")
 
 query.set_field("bookmarks", resolve_bookmarks)
@@ -50,6 +53,7 @@ query.set_field("top", resolve_top)
 query.set_field("trending", resolve_trending)
 query.set_field("users", resolve_users)
 query.set_field("usersByBirthDate", resolve_users_by_birth_date)
+query.set_field("userImport", resolve_user_import)
 query.set_field("trending", resolve_trending)
 query.set_field("recommended", resolve_recommended)
 query.set_field("top", resolve_top)
@@ -126,21 +130,18 @@ def resolve_entity(
 
 
 def increment_view_count(entity, request):
-    # Increase view count of entities
+    # Register the viewer; the counters are updated in bulk by the flush_view_counts task
     user = request.user
 
     if user.is_authenticated:
-        EntityView.objects.create(entity=entity, viewer=user)
-        views = EntityView.objects.filter(entity=entity, viewer=user).count()
+        viewer = {'viewer_id': user.id}
     else:
         sessionid = request.COOKIES.get('sessionid', None)
-        EntityView.objects.create(entity=entity, session=sessionid)
-        views = EntityView.objects.filter(entity=entity, session=sessionid).count()
-
-    if views == 1:
-        if EntityViewCount.objects.filter(entity_id=entity.guid).exists():
-            EntityViewCount.objects.filter(entity_id=entity.guid).update(views=F('views') + 1, updated_at=timezone.now())
-        else:
-            EntityViewCount.objects.create(entity_id=entity.guid, views=1)
-
-    entity.save()
+        if not sessionid:
+            return
+        viewer = {'session': sessionid}
+
+    # Repeated views by the same viewer are filtered out before they reach the database
+    key = "%sentity_view_%s_%s" % (connection.schema_name, entity.guid, viewer.get('viewer_id') or viewer.get('session'))
+    if cache.add(key, True, VIEW_DEDUPE_TIMEOUT):
+        EntityView.objects.register(entity.guid, **viewer)
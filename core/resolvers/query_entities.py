@@ -12,12 +12,14 @@ from graphql import GraphQLError
 
 from core.models.tags import Tag, flat_category_tags
 from core.resolvers import query_entity_filters as filters
-from event.lib import complement_expected_range
+from core.resolvers.cursor_pagination import EntityCursor, cached_count
+from core.resolvers.loaders import prime_entity_loaders
+from event.lib import schedule_expected_range
 
 logger = logging.getLogger(__name__)
 
 
-def conditional_subtypes_filter(subtypes):
+def conditional_subtypes_filter(subtypes, use_subtype=False):
     """
     Filter multiple subtypes
     """
@@ -37,7 +39,7 @@ def conditional_subtypes_filter(subtypes):
                           filters.PadEntityFilter,
                           filters.TaskEntityFilter,
                           filters.ExternalcontentEntityFilter]:
-        entity_filter().add_if_applicable(query, subtypes)
+        entity_filter(use_subtype).add_if_applicable(query, subtypes)
 
     return query
 
@@ -124,7 +126,8 @@ def resolve_entities(
         isFeatured=None,
         sortPinned=False,
         statusPublished=None,
-        userGuid=None
+        userGuid=None,
+        after=None
 ):
     # pylint: disable=unused-argument
     # pylint: disable=too-many-arguments
@@ -143,7 +146,11 @@ def resolve_entities(
     if not Model:
         raise GraphQLError(INVALID_SUBTYPE)
 
-    if orderBy == ORDER_BY.timeUpdated:
+    cursor = EntityCursor(after, orderBy, orderDirection, sortPinned) if after is not None else None
+
+    if cursor:
+        order_by = None
+    elif orderBy == ORDER_BY.timeUpdated:
         order_by = 'updated_at'
     elif orderBy == ORDER_BY.timeCreated:
         order_by = 'created_at'
@@ -159,7 +166,7 @@ def resolve_entities(
     else:
         order_by = 'published'
 
-    if orderDirection == ORDER_DIRECTION.desc:
+    if order_by and orderDirection == ORDER_DIRECTION.desc:
         order_by = '-%s' % (order_by)
 
     if statusPublished and len(statusPublished) > 0:
@@ -169,14 +176,14 @@ def resolve_entities(
 
     entities = entities.filter(conditional_is_featured_filter(isFeatured) &
                                conditional_group_filter(containerGuid) &
-                               conditional_subtypes_filter(subtypes) &
+                               conditional_subtypes_filter(subtypes, use_subtype=bool(cursor)) &
                                conditional_tags_filter(tags, matchStrategy == 'any') &
                                conditional_tag_lists_filter(tagCategories, matchStrategy != 'all') &
                                conditional_owner_filter(userGuid))
 
     if subtypes == ['event'] and eventFilter != 'previous':
         qs2 = deepcopy(entities).annotate(start_date=F('event__start_date'))
-        complement_expected_range(qs2, offset, limit)
+        schedule_expected_range(qs2, 0 if cursor else offset, limit)
 
     if eventFilter:
         if subtypes == ['event']:
@@ -184,6 +191,21 @@ def resolve_entities(
         else:
             raise GraphQLError(COULD_NOT_USE_EVENT_FILTER)
 
+    if cursor:
+        if subtype == 'page':
+            entities = entities.filter(page__parent=None)
+        elif subtype == 'wiki':
+            entities = entities.filter(wiki__parent=None)
+
+        edges, next_cursor = cursor.page(cursor.filter(entities), limit)
+        prime_entity_loaders(info, edges)
+
+        return {
+            'total': cached_count(entities),
+            'edges': edges,
+            'cursor': next_cursor,
+        }
+
     # when page is selected change sorting and only return pages without parent
     if subtype and subtype == 'page':
         entities = entities.filter(page__parent=None)
@@ -215,7 +237,8 @@ def resolve_entities(
 
     entities = entities.order_by(*order).select_subclasses()
 
-    edges = entities[offset:offset + limit]
+    edges = list(entities[offset:offset + limit])
+    prime_entity_loaders(info, edges)
 
     return {
         'total': entities.count(),
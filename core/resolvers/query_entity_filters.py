@@ -6,13 +6,23 @@ from external_content.utils import is_external_content_source
 class EntityFilterBase:
     key = None
 
+    def __init__(self, use_subtype=False):
+        self.use_subtype = use_subtype
+
     def add_if_applicable(self, query, subtypes):
         if not subtypes or self.key in subtypes:
-            self.add(query)
+            if self.use_subtype:
+                self.add_subtype(query)
+            else:
+                self.add(query)
 
     def add(self, query):
         raise NotImplementedError()
 
+    def add_subtype(self, query):
+        """ Same selection as add(), using Entity.subtype instead of joining the subclass table """
+        query.add(Q(subtype=self.key), Q.OR)
+
 
 class NewsEntityFilter(EntityFilterBase):
     key = 'news'
@@ -37,16 +47,23 @@ class EventEntityFilter(EntityFilterBase):
         else:
             super().add_if_applicable(query, subtypes)
 
-    @staticmethod
-    def add_all_events(query):
-        query.add(~Q(event__isnull=True)
-                  & ~Q(event__parent__isnull=False), Q.OR)
+    def add_all_events(self, query):
+        if self.use_subtype:
+            query.add(Q(subtype=self.key) & Q(event__parent__isnull=True), Q.OR)
+        else:
+            query.add(~Q(event__isnull=True)
+                      & ~Q(event__parent__isnull=False), Q.OR)
 
     def add(self, query):
         query.add(~Q(event__isnull=True)
                   & ~Q(event__parent__isnull=False)
                   & Q(event__index_item=True), Q.OR)
 
+    def add_subtype(self, query):
+        query.add(Q(subtype=self.key)
+                  & Q(event__parent__isnull=True)
+                  & Q(event__index_item=True), Q.OR)
+
 
 class DiscussionEntityFilter(EntityFilterBase):
     key = "discussion"
@@ -126,11 +143,13 @@ class ExternalcontentEntityFilter(EntityFilterBase):
         else:
             self.add(query)
 
-    @staticmethod
-    def add_matching(query, subtypes):
+    def add_matching(self, query, subtypes):
         for object_type in subtypes:
             if is_external_content_source(object_type):
-                query.add(~Q(externalcontent__isnull=True) & Q(externalcontent__source_id=object_type), Q.OR)
+                if self.use_subtype:
+                    query.add(Q(subtype=object_type), Q.OR)
+                else:
+                    query.add(~Q(externalcontent__isnull=True) & Q(externalcontent__source_id=object_type), Q.OR)
 
     def add(self, query):
         query.add(~Q(externalcontent__isnull=True), Q.OR)
@@ -1,4 +1,5 @@
 from core.models import Group, GroupMembership, UserProfileField
+from user.models import User
 from core.constances import NOT_LOGGED_IN, COULD_NOT_FIND
 from django.db.models import Q
 from graphql import GraphQLError
@@ -20,30 +21,20 @@ def resolve_members(_, info, groupGuid, q="", filters=None, offset=0, limit=20):
                                                user__is_superadmin=False).exclude(type='pending')
 
         if q:
-            user_matches = Q(user__name__icontains=q) | Q(user__email__icontains=q)
+            # Separate subqueries, so each can use the trigram index of its own column
+            user_matches = User.objects.filter(Q(name__icontains=q) | Q(email__icontains=q)).values_list('id', flat=True)
 
             fields_in_overview = list_fields_in_overview(group)
             query_profile = UserProfileField.objects.visible(user).filter(
                 profile_field__key__in=[f['key'] for f in fields_in_overview],
                 value__icontains=q).values_list('user_profile__user_id', flat=True)
-            profile_field_matches = Q(user_id__in=query_profile)
 
-            # pylint: disable=unsupported-binary-operation
-            query = query.filter(user_matches | profile_field_matches)
+            query = query.filter(Q(user_id__in=user_matches) | Q(user_id__in=query_profile))
 
         if filters:
             for f in filters:
-                values_match: Q = None
-                for value in f['values']:
-                    value_match = Q(value=value)
-                    value_match |= Q(value__startswith=value + ',')
-                    value_match |= Q(value__contains=',' + value + ',')
-                    value_match |= Q(value__endswith=',' + value)
-                    if values_match:
-                        values_match |= value_match
-                    else:
-                        values_match = value_match
-                query = query.filter(user_id__in=UserProfileField.objects.filter(Q(profile_field__key=f['name']) & values_match).values_list('user_profile__user_id', flat=True))
+                query = query.filter(user_id__in=UserProfileField.objects.with_any_value(f['name'], f['values'])
+                                     .values_list('user_profile__user_id', flat=True))
 
         total = query.count()
 
@@ -1,10 +1,15 @@
+import hashlib
+import json
+
 from core.constances import INVALID_SUBTYPE, INVALID_DATE, ORDER_DIRECTION, NOT_LOGGED_IN, USER_ROLES, USER_NOT_SITE_ADMIN
-from core.lib import get_search_filters
+from core.elasticsearch import search_cache_version
+from core.lib import get_search_filters, get_acl, tenant_schema, TypeModels, get_model_by_subtype
 from core.models import Entity, Group, SearchQueryJournal
 from core.utils.elasticsearch import QueryBuilder
 from user.models import User
 from graphql import GraphQLError
-from itertools import chain
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import dateparse, timezone
 
 
@@ -30,9 +35,6 @@ def resolve_search(_, info,
     # pylint: disable=redefined-builtin
     # pylint: disable=too-many-locals
     # pylint: disable=too-many-branches
-    total = 0
-    totals = []
-
     request = info.context["request"]
 
     user = request.user
@@ -44,7 +46,7 @@ def resolve_search(_, info,
             session=sessionid,
         )
 
-    q = q or '*'
+    q = ' '.join((q or '').split()) or '*'
 
     if type in ['group', 'user']:
         subtype = type
@@ -66,48 +68,78 @@ def resolve_search(_, info,
     except ValueError:
         raise GraphQLError(INVALID_DATE)
 
-    query = QueryBuilder(q, user, date_from, date_to)
-    query.maybe_filter_owners(ownerGuids)
-    query.maybe_filter_subtypes(subtypes)
-    query.maybe_filter_container(containerGuid)
-    query.maybe_filter_tags(tags, matchStrategy)
-    query.maybe_filter_categories(tagCategories, matchStrategy)
-    query.filter_archived(filterArchived)
-    query.order_by(orderBy, orderDirection)
-    query.add_aggregation()
-
-    s = query.s[offset:offset + limit]
+    cache_key = search_cache_key(user, q=q, subtype=subtype, subtypes=subtypes,
+                                 containerGuid=containerGuid, dateFrom=dateFrom, dateTo=dateTo,
+                                 offset=offset, limit=limit, tags=tags, tagCategories=tagCategories,
+                                 matchStrategy=matchStrategy, filterArchived=filterArchived,
+                                 orderBy=orderBy, orderDirection=orderDirection, ownerGuids=ownerGuids)
+    result = cache.get(cache_key)
+
+    if result is None:
+        query = QueryBuilder(q, user, date_from, date_to)
+        query.maybe_filter_owners(ownerGuids)
+        query.maybe_filter_subtypes(subtypes)
+        query.maybe_filter_container(containerGuid)
+        query.maybe_filter_tags(tags, matchStrategy)
+        query.maybe_filter_categories(tagCategories, matchStrategy)
+        query.filter_archived(filterArchived)
+        query.maybe_post_filter_subtype(subtype)
+        query.order_by(orderBy, orderDirection)
+        query.add_aggregation()
+
+        s = query.s[offset:offset + limit].source(['id', 'type'])
+        response = s.execute()
 
-    response = s.execute()
+        totals = []
+        for t in response.aggregations.type_terms.buckets:
+            totals.append({"subtype": t.key,
+                           "total": t.doc_count,
+                           "title": subtypes_available[t.key]['plural']})
 
-    for t in response.aggregations.type_terms.buckets:
-        totals.append({"subtype": t.key,
-                    "total": t.doc_count,
-                    "title": subtypes_available[t.key]['plural']})
-        total = total + t.doc_count
+        result = {
+            'total': sum(t['total'] for t in totals),
+            'totals': totals,
+            'hits': [(hit['id'], hit['type']) for hit in response],
+        }
+        cache.set(cache_key, result, settings.SEARCH_RESULT_CACHE_TIMEOUT)
 
-    if subtype:
-        s = s.filter('term', type=subtype)
-        response = s.execute()
+    return {
+        'total': result['total'],
+        'totals': result['totals'],
+        'edges': load_search_hits(result['hits'])
+    }
 
-    ids = []
-    for hit in response:
-        ids.append(hit['id'])
 
-    entities = Entity.objects.filter(id__in=ids).select_subclasses()
-    users = User.objects.filter(id__in=ids)
-    groups = Group.objects.filter(id__in=ids)
-    objects = chain(entities, users, groups)
+def search_cache_key(user, **filters):
+    acl = hashlib.md5(','.join(sorted(get_acl(user))).encode()).hexdigest()
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()
+    return "%ssearch_%s_%s_%s" % (tenant_schema(), search_cache_version(), acl, digest)
+
+
+def load_search_hits(hits):
+    """
+    Load the objects of the hits in the order of the hits.
+    Only the tables of the types that were found are queried.
+    """
+    ids_per_type = {}
+    for object_id, subtype in hits:
+        ids_per_type.setdefault(subtype, []).append(object_id)
+
+    objects = {}
+    if 'user' in ids_per_type:
+        objects.update((str(u.id), u) for u in User.objects.filter(id__in=ids_per_type.pop('user')))
+    if 'group' in ids_per_type:
+        objects.update((str(g.id), g) for g in Group.objects.filter(id__in=ids_per_type.pop('group')))
+    if ids_per_type:
+        entities = Entity.objects.filter(id__in=[object_id for ids in ids_per_type.values() for object_id in ids])
+        if all(subtype in TypeModels.__members__ for subtype in ids_per_type):
+            entities = entities.select_subclasses(*{get_model_by_subtype(subtype) for subtype in ids_per_type})
+        else:
+            entities = entities.select_subclasses()
+        objects.update((str(e.id), e) for e in entities)
 
     # use elasticsearch ordering on objects
-    id_dict = {str(d.id): d for d in objects}
-    sorted_objects = [id_dict[id] for id in ids]
-
-    return {
-        'total': total,
-        'totals': totals,
-        'edges': sorted_objects
-    }
+    return [objects[object_id] for object_id, _ in hits if object_id in objects]
 
 
 def resolve_search_journal(_, info, dateTimeFrom=None, dateTimeTo=None, limit=None, offset=None):
@@ -1,38 +1,12 @@
-from collections import Counter
-from core.models import Entity, Annotation
+from core.utils.leaderboard import trending_tags
 
 
 def resolve_trending(_, info):
     """ Return trending tags
 
-    - Get the last 250 content items voted on
-    - Add the tags of these items to a list 
+    - Count the votes within the leaderboard window on the content the user can read
+    - Add the votes of each item to each of its tags
 
-    Return tags with 3 most occurences
+    Return the 3 tags with the most votes
     """
-    # TODO: filter entity objects
-    # pylint: disable=unused-argument
-    entity_tags = {}
-    total_tags = []
-    trending_tags = []
-
-    voted_object_ids = Annotation.objects.filter(key='voted')[0:250].values_list('object_id', flat=True)
-
-    entities = Entity.objects.filter(id__in=voted_object_ids).values('id', '_tag_summary')
-
-    # Create list with dictionaries: [{'id': [tags]}]
-    for entity in entities:
-        entity_tags[entity['id']] = entity['_tag_summary']
-
-    # Add all tag lists to a list
-    for object_id in voted_object_ids:
-        if object_id in entity_tags:
-            total_tags.append(entity_tags[object_id])
-
-    # Count all occurences in total_tags of a tag and get 3 most ocurring tags with count
-    most_ocurring_tags = Counter(x for xs in total_tags for x in set(xs)).most_common(3)
-
-    for tag, likes in most_ocurring_tags:
-        trending_tags.append({'tag': tag, 'likes': likes})
-
-    return trending_tags
+    return trending_tags(info.context["request"].user)
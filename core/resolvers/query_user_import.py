@@ -0,0 +1,20 @@
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from graphql import GraphQLError
+
+from core.constances import COULD_NOT_FIND, NOT_LOGGED_IN, USER_NOT_SITE_ADMIN, USER_ROLES
+from core.models import UserImport
+
+
+def resolve_user_import(_, info, guid):
+    user = info.context["request"].user
+
+    if not user.is_authenticated:
+        raise GraphQLError(NOT_LOGGED_IN)
+
+    if not user.has_role(USER_ROLES.ADMIN):
+        raise GraphQLError(USER_NOT_SITE_ADMIN)
+
+    try:
+        return UserImport.objects.get(id=guid)
+    except (ObjectDoesNotExist, ValidationError):
+        raise GraphQLError(COULD_NOT_FIND)
@@ -4,7 +4,6 @@ import os
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from django.utils.translation import gettext
-from elasticsearch_dsl import Search
 from graphql import GraphQLError
 from online_planner.meetings_api import MeetingsApi
 
@@ -15,8 +14,10 @@ from core import constances
 from core.exceptions import AttachmentVirusScanError
 from core.lib import (access_id_to_acl, html_to_text,
                       tenant_schema, get_access_id, strip_exif)
-from core.models import EntityViewCount, Group, VideoCallGuest
+from core.models import Entity, Group, VideoCallGuest
 from core.models.revision import Revision
+from core.resolvers import loaders
+from core.resolvers.loaders import get_loader
 from core.tasks.cleanup_tasks import cleanup_featured_image_files
 from core.utils.convert import tiptap_to_text, truncate_rich_description
 from core.utils.entity import load_entity_by_id
@@ -33,18 +34,7 @@ def resolve_entity_access_id(obj, info):
 
 
 def resolve_entity_write_access_id(obj, info):
-    # pylint: disable=unused-argument
-    if obj.group and obj.group.subgroups:
-        for subgroup in obj.group.subgroups.all():
-            if ACCESS_TYPE.subgroup.format(subgroup.access_id) in obj.write_access:
-                return subgroup.access_id
-    if obj.group and ACCESS_TYPE.group.format(obj.group.id) in obj.write_access:
-        return 4
-    if ACCESS_TYPE.public in obj.write_access:
-        return 2
-    if ACCESS_TYPE.logged_in in obj.write_access:
-        return 1
-    return 0
+    return get_loader(info, loaders.WriteAccessIdLoader).load(obj)
 
 
 def resolve_entity_can_edit(obj, info):
@@ -119,8 +109,7 @@ def resolve_entity_excerpt(obj, info):
 
 
 def resolve_entity_tags(obj, info):
-    # pylint: disable=unused-argument
-    return obj.tags
+    return get_loader(info, loaders.TagsLoader).load(obj)
 
 
 def resolve_entity_time_created(obj, info):
@@ -168,29 +157,21 @@ def resolve_entity_can_bookmark(obj, info):
 
 
 def resolve_entity_has_voted(obj, info):
-    # pylint: disable=unused-argument
-    user = info.context["request"].user
-    try:
-        return obj.has_voted(user)
-    except AttributeError:
+    if not hasattr(obj, 'has_voted'):
         return False
+    return get_loader(info, loaders.HasVotedLoader).load(obj)
 
 
 def resolve_entity_votes(obj, info):
-    # pylint: disable=unused-argument
-    try:
-        return obj.vote_count()
-    except AttributeError:
+    if not hasattr(obj, 'vote_count'):
         return 0
+    return get_loader(info, loaders.VotesLoader).load(obj)
 
 
 def resolve_entity_is_bookmarked(obj, info):
-    # pylint: disable=unused-argument
-    user = info.context["request"].user
-    try:
-        return obj.is_bookmarked(user)
-    except AttributeError:
+    if not hasattr(obj, 'is_bookmarked'):
         return False
+    return get_loader(info, loaders.IsBookmarkedLoader).load(obj)
 
 
 def resolve_entity_can_comment(obj, info):
@@ -204,17 +185,15 @@ def resolve_entity_can_comment(obj, info):
 def resolve_entity_comments(obj, info):
     # pylint: disable=unused-argument
     try:
-        return obj.comments.all()
+        return obj.get_comment_thread()
     except AttributeError:
         return []
 
 
 def resolve_entity_comment_count(obj, info):
-    # pylint: disable=unused-argument
-    count = _comment_count_from_index(obj)
-    if count is None:
-        return _comment_count_from_object(obj)
-    return count
+    if isinstance(obj, Entity):
+        return get_loader(info, loaders.CommentCountLoader).load(obj)
+    return _comment_count_from_object(obj)
 
 
 def resolve_entity_last_seen(obj, info):
@@ -222,19 +201,6 @@ def resolve_entity_last_seen(obj, info):
     return obj.last_seen
 
 
-def _comment_count_from_index(obj):
-    try:
-        query = Search(index='_all') \
-            .query('match', id=obj.guid) \
-            .source(['id', 'comments'])
-        for match in query.execute():
-            if match.id == obj.guid:
-                return len(match.comments)
-    except Exception as e:
-        LOGGER.error(e)
-    return None
-
-
 def _comment_count_from_object(obj):
     try:
         return len([c.id for c in obj.get_flat_comment_list()])
@@ -244,24 +210,19 @@ def _comment_count_from_object(obj):
 
 
 def resolve_entity_is_following(obj, info):
-    # pylint: disable=unused-argument
-    try:
-        return obj.is_following(info.context["request"].user)
-    except AttributeError:
+    if not hasattr(obj, 'is_following'):
         return False
+    return get_loader(info, loaders.IsFollowingLoader).load(obj)
 
 
 def resolve_entity_views(obj, info):
-    # pylint: disable=unused-argument
-    try:
-        return EntityViewCount.objects.get(entity=obj).views
-    except ObjectDoesNotExist:
-        return 0
+    return get_loader(info, loaders.ViewsLoader).load(obj)
 
 
 def resolve_entity_owner(obj, info):
-    # pylint: disable=unused-argument
-    return obj.owner
+    if obj.__class__.owner.is_cached(obj):
+        return obj.owner
+    return get_loader(info, loaders.OwnerLoader).load(obj)
 
 
 def resolve_entity_is_pinned(obj, info):
@@ -0,0 +1,21 @@
+from ariadne import ObjectType
+
+user_import = ObjectType("UserImport")
+
+
+@user_import.field("errorMessage")
+def resolve_error_message(obj, info):
+    # pylint: disable=unused-argument
+    return obj.error_message
+
+
+@user_import.field("timeCreated")
+def resolve_time_created(obj, info):
+    # pylint: disable=unused-argument
+    return obj.created_at
+
+
+@user_import.field("timeUpdated")
+def resolve_time_updated(obj, info):
+    # pylint: disable=unused-argument
+    return obj.updated_at
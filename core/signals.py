@@ -1,6 +1,11 @@
 import logging
-from django.db.models.signals import post_delete
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from core import config
+from core.models import Annotation, Comment, Entity, EntityCommentCount, EntityVoteCount, GroupMembership, Setting, Subgroup
 from core.models.mixin import ModelWithFile
+from core.models.tags import Tag, TagSynonym, invalidate_synonym_map
+from core.utils.access import invalidate_access_context
 
 logger = logging.getLogger(__name__)
 
@@ -14,3 +19,100 @@ def file_delete_handler(sender, instance, using, **kwargs):
 # https://github.com/django/django/blob/5e0aa362d91d000984995ce374c2d7547d8d107f/django/contrib/contenttypes/fields.py#L701
 for subclass in ModelWithFile.__subclasses__():
     post_delete.connect(file_delete_handler, subclass)
+
+
+def setting_save_handler(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    config.invalidate(instance.key, instance.value)
+
+
+def setting_delete_handler(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    config.invalidate(instance.key)
+
+
+post_save.connect(setting_save_handler, sender=Setting)
+post_delete.connect(setting_delete_handler, sender=Setting)
+
+
+def comment_save_handler(sender, instance, created, raw=False, **kwargs):
+    # pylint: disable=unused-argument
+    if created and not raw:
+        container_id = instance.get_root_entity_id()
+        if container_id:
+            EntityCommentCount.objects.increment(container_id)
+
+
+def comment_pre_delete_handler(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    # Resolve before anything is deleted; parent comments may be removed in the same cascade.
+    instance._root_container_id = instance.get_root_entity_id()
+
+
+def comment_delete_handler(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    container_id = getattr(instance, '_root_container_id', None)
+    if container_id:
+        EntityCommentCount.objects.decrement(container_id)
+
+
+post_save.connect(comment_save_handler, sender=Comment)
+pre_delete.connect(comment_pre_delete_handler, sender=Comment)
+post_delete.connect(comment_delete_handler, sender=Comment)
+
+
+def is_entity_vote(annotation):
+    if annotation.key != 'voted':
+        return False
+    model = ContentType.objects.get_for_id(annotation.content_type_id).model_class()
+    return model is not None and issubclass(model, Entity)
+
+
+def vote_save_handler(sender, instance, created, raw=False, **kwargs):
+    # pylint: disable=unused-argument
+    if created and not raw and is_entity_vote(instance):
+        EntityVoteCount.objects.increment(instance.object_id, instance.created_at)
+
+
+def vote_delete_handler(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    if is_entity_vote(instance):
+        EntityVoteCount.objects.decrement(instance.object_id, instance.created_at)
+
+
+post_save.connect(vote_save_handler, sender=Annotation)
+post_delete.connect(vote_delete_handler, sender=Annotation)
+
+
+def membership_change_handler(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    invalidate_access_context(instance.user_id)
+
+
+def subgroup_members_change_handler(sender, instance, action, reverse, pk_set, **kwargs):
+    # pylint: disable=unused-argument
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        user_ids = [instance.pk]
+    elif action == 'pre_clear':
+        user_ids = instance.members.values_list('id', flat=True)
+    else:
+        user_ids = pk_set
+    for user_id in user_ids:
+        invalidate_access_context(user_id)
+
+
+post_save.connect(membership_change_handler, sender=GroupMembership)
+post_delete.connect(membership_change_handler, sender=GroupMembership)
+m2m_changed.connect(subgroup_members_change_handler, sender=Subgroup.members.through)
+
+
+def tag_change_handler(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    invalidate_synonym_map()
+
+
+for model in [Tag, TagSynonym]:
+    post_save.connect(tag_change_handler, sender=model)
+    post_delete.connect(tag_change_handler, sender=model)
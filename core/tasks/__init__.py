@@ -3,17 +3,22 @@ from .cronjobs import (dispatch_hourly_cron, dispatch_daily_cron, dispatch_weekl
                        save_db_disk_usage, save_file_disk_usage,
                        ban_users_that_bounce, ban_users_with_no_account,
                        resize_pending_images,
-                       cleanup_auditlog, depublicate_content)
+                       cleanup_auditlog, depublicate_content,
+                       flush_view_counts, cleanup_entity_views, refresh_vote_counts,
+                       run_tenant_job)
 from .elasticsearch_tasks import (elasticsearch_recreate_indices,
                                   elasticsearch_rebuild_all,
                                   elasticsearch_rebuild_all_per_index,
                                   elasticsearch_rebuild_for_tenant,
+                                  elasticsearch_resume_rebuild,
+                                  elasticsearch_cancel_rebuild,
                                   elasticsearch_index_data_for_all, elasticsearch_index_data_for_tenant,
                                   elasticsearch_delete_data_for_tenant,
-                                  elasticsearch_index_document)
-from .mail_tasks import send_mail_by_instance
+                                  elasticsearch_index_document,
+                                  elasticsearch_flush_index_queue)
+from .mail_tasks import send_mail_by_instance, send_mail_by_instances
 from .misc import import_users, replace_domain_links, image_resize, strip_exif_from_file
-from .notification_tasks import create_notifications_for_scheduled_content, create_notification
+from .notification_tasks import create_notifications_for_scheduled_content, create_notification, send_push_notifications
 from .cleanup_tasks import do_cleanup_featured_image_files
 from .migrate_tags import migrate_tags, revert_tags
 from .exports import export_avatars
@@ -1,3 +1,7 @@
+import time
+import uuid
+import zlib
+
 import requests
 
 import celery
@@ -8,12 +12,12 @@ from django.utils.timezone import localtime
 from django.utils.translation import gettext
 
 from core import config
-from core.mail_builders.frequent_overview import schedule_frequent_overview_mail
-from core.models import SiteStat, ResizedImage, Entity
+from core.mail_builders.frequent_overview import schedule_frequent_overview_mails
+from core.models import SiteStat, ResizedImage, Entity, EntityView, EntityViewCount, EntityVoteCount
 from core.tasks.notification_tasks import create_notifications_for_scheduled_content
 from core.resolvers import shared
 from django.conf import settings
-from django.core import management
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import connection
 from django.db.models import Sum
@@ -28,61 +32,162 @@ from user.models import User
 logger = get_task_logger(__name__)
 
 
+# Tenants are started spread over (a part of) the period of their job, each tenant at a fixed offset.
+TENANT_JOB_SPREAD = {
+    'hourly': 40 * 60,
+    'daily': 3 * 60 * 60,
+    'weekly': 3 * 60 * 60,
+    'monthly': 3 * 60 * 60,
+}
+
+# Tasks that may be skipped for a while on tenants where they recently found nothing to do.
+# Not for flush_view_counts: a quiet past says nothing about views registered since.
+IDLE_TASK_BACKOFF = {
+    'core.tasks.cronjobs.ban_users_that_bounce': timedelta(days=3),
+    'core.tasks.cronjobs.cleanup_orphaned_files': timedelta(days=7),
+    'core.tasks.cronjobs.cleanup_entity_views': timedelta(days=7),
+}
+
+TENANT_JOB_SLOT_TIMEOUT = 60 * 60
+TENANT_JOB_RETRY_DELAY = 60
+
+
+def tenant_job_offset(schema_name, job, spread):
+    """ Deterministic delay for the tenant within the spread of the job """
+    if not spread:
+        return 0
+    return zlib.crc32(("%s:%s" % (job, schema_name)).encode()) % spread
+
+
+def schedule_tenant_job(job, tasks, spread=None):
+    """
+    Run the tasks, as (task name, args) pairs, for every active tenant.
+    """
+    from control.models import TenantJobRun
+
+    spread = TENANT_JOB_SPREAD.get(job, 0) if spread is None else spread
+    idle = {task: TenantJobRun.objects.idle_clients(task, timezone.now() - IDLE_TASK_BACKOFF[task])
+            for task, _ in tasks if task in IDLE_TASK_BACKOFF}
+
+    for client in Client.objects.filter(is_active=True).exclude(schema_name='public'):
+        client_tasks = [(task, args) for task, args in tasks if client.id not in idle.get(task, ())]
+        if not client_tasks:
+            continue
+
+        countdown = tenant_job_offset(client.schema_name, job, spread)
+        logger.info('Schedule %s cron for %s in %ds', job, client.schema_name, countdown)
+        run_tenant_job.apply_async((job, client.schema_name, client_tasks), countdown=countdown)
+
+
+def acquire_tenant_job_slot(job, schema_name):
+    """
+    Returns the (key, token) of a free slot. The token tells whether the slot is
+    still ours, another tenant may have taken it after the timeout expired.
+    """
+    token = "%s:%s" % (schema_name, uuid.uuid4().hex)
+    for slot in range(settings.CRON_MAX_CONCURRENT_TENANTS):
+        key = "tenant_job_slot_%s_%s" % (job, slot)
+        if cache.add(key, token, TENANT_JOB_SLOT_TIMEOUT):
+            return key, token
+    return None
+
+
+def refresh_tenant_job_slot(slot):
+    key, token = slot
+    if cache.get(key) == token:
+        cache.touch(key, TENANT_JOB_SLOT_TIMEOUT)
+
+
+def release_tenant_job_slot(slot):
+    key, token = slot
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=None)
+def run_tenant_job(self, job, schema_name, tasks):
+    """
+    Run the tasks of a job for one tenant, one after the other,
+    while at most CRON_MAX_CONCURRENT_TENANTS tenants run the same job.
+    """
+    from control.models import TenantJobRun
+
+    slot = acquire_tenant_job_slot(job, schema_name)
+    if not slot:
+        raise self.retry(countdown=TENANT_JOB_RETRY_DELAY + tenant_job_offset(schema_name, job, TENANT_JOB_RETRY_DELAY))
+
+    try:
+        for task_name, args in tasks:
+            started_at = timezone.now()
+            started = time.monotonic()
+            rows, error = None, ''
+            try:
+                result = self.app.tasks[task_name](schema_name, *args)
+                if isinstance(result, int) and not isinstance(result, bool):
+                    rows = result
+            except Exception as e:
+                logger.exception('%s failed for %s', task_name, schema_name)
+                error = "%s: %s" % (e.__class__.__name__, e)
+
+            TenantJobRun.objects.record(schema_name, job, task_name, started_at,
+                                        time.monotonic() - started, rows, error)
+            refresh_tenant_job_slot(slot)
+    finally:
+        release_tenant_job_slot(slot)
+
+
 @shared_task
 def dispatch_hourly_cron():
-    for client in Client.objects.exclude(schema_name='public'):
-        logger.info('Schedule hourly cron for %s', client.schema_name)
-
-        create_notifications_for_scheduled_content.delay(client.schema_name)
-        send_notifications.delay(client.schema_name)
-        depublicate_content.delay(client.schema_name)
-        make_publication_revisions.delay(client.schema_name)
+    from core.lib import get_hourly_cron_jobs
 
-        from core.lib import get_hourly_cron_jobs
-        for task in get_hourly_cron_jobs():
-            task.delay(client.schema_name)
+    schedule_tenant_job('hourly', [
+        ('core.tasks.notification_tasks.create_notifications_for_scheduled_content', []),
+        ('core.tasks.cronjobs.send_notifications', []),
+        ('core.tasks.cronjobs.depublicate_content', []),
+        ('core.tasks.cronjobs.make_publication_revisions', []),
+        *[(task.name, []) for task in get_hourly_cron_jobs()],
+    ])
 
 
 @shared_task
 def dispatch_daily_cron():
-    for client in Client.objects.exclude(schema_name='public'):
-        logger.info('Schedule daily cron for %s', client.schema_name)
-
-        save_db_disk_usage.delay(client.schema_name)
-        save_file_disk_usage.delay(client.schema_name)
-        ban_users_that_bounce.delay(client.schema_name)
-        ban_users_with_no_account.delay(client.schema_name)
-        resize_pending_images.delay(client.schema_name)
-        cleanup_auditlog.delay(client.schema_name)
-        send_overview.delay(client.schema_name, 'daily')
-        cleanup_orphaned_files.delay(client.schema_name)
+    from control.models import TenantJobRun
+    TenantJobRun.objects.filter(started_at__lt=timezone.now() - timedelta(days=31)).delete()
+
+    schedule_tenant_job('daily', [
+        ('core.tasks.cronjobs.save_db_disk_usage', []),
+        ('core.tasks.cronjobs.save_file_disk_usage', []),
+        ('core.tasks.cronjobs.ban_users_that_bounce', []),
+        ('core.tasks.cronjobs.ban_users_with_no_account', []),
+        ('core.tasks.cronjobs.resize_pending_images', []),
+        ('core.tasks.cronjobs.cleanup_auditlog', []),
+        ('core.tasks.cronjobs.cleanup_entity_views', []),
+        ('core.tasks.cronjobs.refresh_vote_counts', []),
+        ('core.tasks.cronjobs.send_overview', ['daily']),
+        ('core.tasks.cronjobs.cleanup_orphaned_files', []),
+    ])
 
 
 @shared_task
 def dispatch_weekly_cron():
-    # pylint: disable=unused-argument
-    for client in Client.objects.exclude(schema_name='public'):
-        logger.info('Schedule weekly cron for %s', client.schema_name)
-
-        send_overview.delay(client.schema_name, 'weekly')
+    schedule_tenant_job('weekly', [
+        ('core.tasks.cronjobs.send_overview', ['weekly']),
+    ])
 
 
 @shared_task
 def dispatch_monthly_cron():
-    for client in Client.objects.exclude(schema_name='public'):
-        logger.info('Schedule weekly cron for %s', client.schema_name)
-
-        send_overview.delay(client.schema_name, "monthly")
+    schedule_tenant_job('monthly', [
+        ('core.tasks.cronjobs.send_overview', ['monthly']),
+    ])
 
 
-@shared_task(bind=True)
-def dispatch_task(self, task, *kwargs):
+@shared_task
+def dispatch_task(task, *kwargs, spread=0):
     '''
     Dispatch task for all tenants
     '''
-    for client in Client.objects.exclude(schema_name='public'):
-        logger.info('Dispatch task %s for %s', task, client.schema_name)
-        self.app.tasks[task].delay(client.schema_name, *kwargs)
+    schedule_tenant_job(task, [(task, list(kwargs))], spread=spread)
 
 
 @shared_task
@@ -90,8 +195,18 @@ def send_notifications(schema_name):
     '''
     Send notification mails for tenant
     '''
-    logger.info('Schedule send notifications for %s', schema_name)
-    management.execute_from_command_line(['manage.py', 'tenant_command', 'send_notification_emails', '--schema', schema_name])
+    from core.mail_builders.notifications import schedule_collected_notification_mails
+
+    with schema_context(schema_name):
+        started = time.monotonic()
+        try:
+            users, notifications = schedule_collected_notification_mails()
+        except Exception as e:
+            logger.error("send_notifications error %s %s %s", schema_name, e.__class__, e)
+            raise
+        logger.info('Scheduled %d notifications to %d users for %s in %.2fs',
+                    notifications, users, schema_name, time.monotonic() - started)
+        return notifications
 
 
 @shared_task
@@ -102,18 +217,24 @@ def send_overview(schema_name, period):
     logger.info('Send %s overview for %s', period, schema_name)
 
     with schema_context(schema_name):
+        started = time.monotonic()
         users = User.objects.filter(is_active=True,
-                                    _profile__overview_email_interval=period)
-        for user in users:
-            schedule_frequent_overview_mail(user, period)
+                                    _profile__overview_email_interval=period).select_related('_profile')
+        scheduled = schedule_frequent_overview_mails(users, period)
+        logger.info('Scheduled %d %s overview mails for %s in %.2fs',
+                    scheduled, period, schema_name, time.monotonic() - started)
+        return scheduled
 
 
 @shared_task
 def cleanup_orphaned_files(schema_name):
     with schema_context(schema_name):
         due_datetime = localtime() - timedelta(days=30)
+        count = 0
         for file in FileFolder.objects.filter_orphaned_files().filter(created_at__lte=due_datetime):
             file.delete()
+            count += 1
+        return count
 
 
 @shared_task
@@ -194,6 +315,7 @@ def ban_users_that_bounce(schema_name):
         if count:
             logger.info("Accounts blocked beacause of boucning email: %s", count)
         config.LAST_RECEIVED_BOUNCING_EMAIL = last_received
+        return count
 
 
 @shared_task
@@ -255,6 +377,39 @@ def cleanup_auditlog(schema_name):
     with schema_context(schema_name):
         deletedLogs = LogEntry.objects.filter(timestamp__lt=minimum_timestamp).delete()
         logger.info("%s: %d log entries were deleted", schema_name, deletedLogs[0])
+        return deletedLogs[0]
+
+
+@shared_task
+def flush_view_counts(schema_name):
+    with schema_context(schema_name):
+        flushed = EntityViewCount.objects.flush()
+        if flushed:
+            logger.info("%s: %d entity views were counted", schema_name, flushed)
+        return flushed
+
+
+@shared_task
+def cleanup_entity_views(schema_name):
+    # Anonymous views are only needed as long as the session can come back
+    minimum_timestamp = timezone.now() - timedelta(seconds=settings.SESSION_COOKIE_AGE)
+    with schema_context(schema_name):
+        flush_view_counts(schema_name)
+        deleted = EntityView.objects.cleanup(minimum_timestamp)
+        logger.info("%s: %d anonymous entity views were deleted", schema_name, deleted)
+        return deleted
+
+
+@shared_task
+def refresh_vote_counts(schema_name):
+    # Votes that left the leaderboard window stop counting for trending tags and top users
+    from core.utils.leaderboard import invalidate_leaderboards
+
+    with schema_context(schema_name):
+        counted = EntityVoteCount.objects.refresh()
+        invalidate_leaderboards()
+        logger.info("%s: votes on %d entities are counted for the leaderboards", schema_name, counted)
+        return counted
 
 
 @shared_task
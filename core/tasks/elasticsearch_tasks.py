@@ -1,8 +1,9 @@
-from time import sleep
 from traceback import format_exc
 
-from celery import chain
 from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 from elasticsearch import (
     ConnectionError as ElasticsearchConnectionError
 )
@@ -11,6 +12,9 @@ from django_elasticsearch_dsl.registries import registry
 from django_tenants.utils import schema_context
 from elasticsearch_dsl import Search, connections
 
+from core.elasticsearch import (create_rebuild_indexes, delete_index, index_changed_since,
+                                index_tenant_into, invalidate_search_cache, replay_rebuild_changes,
+                                swap_index_aliases)
 from core.models import Group, Entity
 from core.utils.elasticsearch import delete_document_if_found
 from core.utils.entity import load_entity_by_id
@@ -36,7 +40,7 @@ def elasticsearch_recreate_indices(index_name=None):
     # delete indexes
     for index in registry.get_indices(models):
         try:
-            index.delete()
+            delete_index(index)
             logger.info('deleted index %s', index._name)
         except Exception:
             logger.info('index %s does not exist', index._name)
@@ -49,45 +53,150 @@ def elasticsearch_recreate_indices(index_name=None):
 
 
 @app.task(ignore_result=True)
-def elasticsearch_rebuild_all(index_name=None):
+def elasticsearch_rebuild_all(index_name=None, concurrency=None):
     '''
-    Delete indexes, creates indexes and populate tenants.
-    Sites in random order, indexes in sequential order.
+    Build a new version of the indexes and populate tenants, in parallel.
+    Search keeps using the current indexes until the aliases are swapped to the new ones.
 
     No option passed then all indices are rebuild
     Options: ['news', 'file', 'question' 'wiki', 'discussion', 'page', 'event', 'blog', 'user', 'group']
     '''
+    # pylint: disable=protected-access
+    from control.models import ElasticsearchRebuild
 
-    elasticsearch_recreate_indices(index_name)
+    if ElasticsearchRebuild.objects.active():
+        logger.error('elasticsearch_rebuild_all: a rebuild is already in progress, resume or cancel it first')
+        return
 
-    for client in Client.objects.exclude(schema_name='public'):
-        elasticsearch_index_data_for_tenant.delay(client.schema_name, index_name)
+    index_names = [index._name for index in all_indexes()
+                   if not index_name or index._name in index_name.split(',')]
+    rebuild = ElasticsearchRebuild.objects.start(index_names, Client.objects.exclude(schema_name='public'))
+    create_rebuild_indexes(rebuild)
 
+    logger.info('elasticsearch_rebuild_all: started rebuild %s of %s', rebuild.version, index_names)
+    _start_rebuild_workers(rebuild, concurrency)
 
-@app.task
+
+@app.task(ignore_result=True)
 def elasticsearch_rebuild_all_per_index():
     """
-    Delete indexes, create indexes and populate tenants.
-
-    Indexes in parallel, sites in serial.
+    Rebuild all indexes; kept for existing callers, every index is rebuild in the same run.
     """
-
-    signatures = []
-    for index in all_indexes():
-        # pylint: disable=protected-access
-        signatures.append(elasticsearch_rebuild_all_at_index.si(index._name))
-    chain(*signatures).apply_async()
+    elasticsearch_rebuild_all()
 
 
-@app.task
+@app.task(ignore_result=True)
 def elasticsearch_rebuild_all_at_index(index_name):
-    elasticsearch_recreate_indices(index_name)
+    elasticsearch_rebuild_all(index_name)
+
+
+@app.task(ignore_result=True)
+def elasticsearch_resume_rebuild(concurrency=None):
+    '''
+    Continue an interrupted rebuild; steps that were running or failed are done again.
+    '''
+    from control.models import ElasticsearchRebuild, ElasticsearchRebuildStep
+
+    rebuild = ElasticsearchRebuild.objects.active()
+    if not rebuild:
+        logger.info('elasticsearch_resume_rebuild: no rebuild in progress')
+        return
+
+    ElasticsearchRebuildStep.objects.reset(rebuild)
+    _start_rebuild_workers(rebuild, concurrency)
+
+
+@app.task(ignore_result=True)
+def elasticsearch_cancel_rebuild():
+    '''
+    Stop the active rebuild and remove the indexes it was building
+    '''
+    from control.models import ElasticsearchRebuild
+
+    rebuild = ElasticsearchRebuild.objects.active()
+    if not rebuild:
+        return
+
+    rebuild.cancelled_at = timezone.now()
+    rebuild.save(update_fields=['cancelled_at'])
+
+    es_client = connections.get_connection()
+    for alias in rebuild.indexes:
+        es_client.indices.delete(index=rebuild.index_name(alias), ignore=[404])
+
+
+def _start_rebuild_workers(rebuild, concurrency=None):
+    for _ in range(concurrency or settings.ELASTICSEARCH_REBUILD_CONCURRENCY):
+        elasticsearch_rebuild_worker.delay(rebuild.id)
 
-    signatures = []
-    for client in Client.objects.exclude(schema_name='public'):
-        args = (client.schema_name, index_name)
-        signatures.append(elasticsearch_index_data_for_tenant.si(*args))
-    chain(*signatures).apply_async()
+
+@app.task(ignore_result=True)
+def elasticsearch_rebuild_worker(rebuild_id):
+    '''
+    Index one (index, tenant) step of a rebuild and continue with the next one.
+    The number of workers started for a rebuild is the number of tenants indexed at the same time.
+    '''
+    from control.models import ElasticsearchRebuild, ElasticsearchRebuildStep
+
+    rebuild = ElasticsearchRebuild.objects.get(id=rebuild_id)
+    if rebuild.cancelled_at or rebuild.swapped_at:
+        return
+
+    step = ElasticsearchRebuildStep.objects.claim(rebuild)
+    if not step:
+        _maybe_finish_rebuild(rebuild)
+        return
+
+    documents, errors, error = 0, 0, ''
+    try:
+        with schema_context(step.client.schema_name):
+            documents, errors = index_tenant_into(step.index, rebuild.index_name(step.index))
+    except Exception as e:
+        logger.error("exception at elasticsearch_rebuild_worker %s %s %s: %s",
+                     step.client.schema_name, step.index, e.__class__, e)
+        error = format_exc()
+
+    step.finish(documents, errors, error)
+    elasticsearch_rebuild_worker.delay(rebuild_id)
+
+
+def _maybe_finish_rebuild(rebuild):
+    from control.models import ElasticsearchRebuild
+
+    steps = rebuild.steps.exclude(state='done')
+    if steps.filter(state='running').exists():
+        # Another worker finishes the rebuild after its last step.
+        return
+    if steps.filter(state='failed').exists():
+        logger.error('elasticsearch rebuild %s has failed steps, use elasticsearch_resume_rebuild to retry them',
+                     rebuild.version)
+        return
+
+    # Only one worker does the swap. Changes are recorded for replay until swapped_at is set,
+    # that is after the aliases point to the new indexes.
+    with transaction.atomic():
+        rebuild = ElasticsearchRebuild.objects.select_for_update() \
+            .filter(id=rebuild.id, swapped_at__isnull=True) \
+            .first()
+        if not rebuild:
+            return
+        swap_index_aliases(rebuild)
+        rebuild.swapped_at = timezone.now()
+        rebuild.save(update_fields=['swapped_at'])
+
+    logger.info('elasticsearch rebuild %s is live', rebuild.version)
+    for step in rebuild.steps.select_related('client'):
+        elasticsearch_index_changed_since.delay(step.client.schema_name, step.index, step.started_at.isoformat())
+
+
+@app.task(ignore_result=True)
+def elasticsearch_index_changed_since(schema_name, index_name, since):
+    '''
+    Index what changed on a tenant while its part of the new index was built
+    '''
+    with schema_context(schema_name):
+        index_changed_since(index_name, since)
+        replay_rebuild_changes()
 
 
 @app.task(ignore_result=True)
@@ -142,6 +251,7 @@ def elasticsearch_index_data_for_tenant(schema_name, index_name=None):
                         schema_name, e.__class__, e))
                     logger.error(format_exc())
 
+            invalidate_search_cache()
         except Exception as e:
             # pylint: disable=logging-not-lazy
             logger.error("exception at elasticsearch_index_data_for_tenant %s %s: %s" % (
@@ -176,6 +286,8 @@ def elasticsearch_delete_data_for_tenant(schema_name, index_name=None):
         )
         es_client.indices.refresh(index=index._name)
 
+    invalidate_search_cache(schema_name)
+
 
 @app.task(autoretry_for=(ElasticsearchConnectionError,), retry_backoff=10, max_retries=10)
 def elasticsearch_index_document(schema_name, document_guid, document_classname):
@@ -187,6 +299,7 @@ def elasticsearch_index_document(schema_name, document_guid, document_classname)
                 registry.update_related(instance)
             else:
                 delete_document_if_found(document_guid)
+            invalidate_search_cache()
             return f"{schema_name}.{document_classname}.{document_guid}"
         except ElasticsearchConnectionError as known_error:
             # Fall through for known errors.
@@ -202,6 +315,22 @@ def elasticsearch_index_document(schema_name, document_guid, document_classname)
             )
 
 
+@app.task(ignore_result=True)
+def elasticsearch_flush_index_queue(schema_name):
+    # pylint: disable=import-outside-toplevel
+    from core.elasticsearch import flush_index_queue, release_index_queue_flush, schedule_index_queue_flush
+
+    # Changes from now on are picked up by the next flush
+    release_index_queue_flush(schema_name)
+
+    with schema_context(schema_name):
+        stats = flush_index_queue()
+
+    if stats and stats['batch_size'] >= settings.ELASTICSEARCH_INDEX_QUEUE_BATCH_SIZE:
+        # There is more waiting; continue right away.
+        schedule_index_queue_flush(schema_name, force=True)
+
+
 def _all_models():
     def model_weight(model):
         name = model._meta.object_name
@@ -1,5 +1,5 @@
 from celery import shared_task
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.utils.timezone import localtime
 from django_tenants.utils import schema_context
 
@@ -17,15 +17,18 @@ def export_avatars(schema, avatar_export_id):
         AvatarExport.objects.filter(id=avatar_export_id).update(status='in_progress')
         avatar_export = AvatarExport.objects.get(id=avatar_export_id)
 
-        zip_file_contents = build_avatar_export(avatar_export.initiator)
+        def report_progress(total, processed, failed):
+            AvatarExport.objects.filter(id=avatar_export_id).update(total=total, processed=processed, failed=failed)
 
-        avatar_export.file = FileFolder.objects.create(
-            type=FileFolder.Types.FILE,
-            owner=avatar_export.initiator,
-            upload=ContentFile(zip_file_contents, 'avatar_export.zip'),
-            read_access=[ACCESS_TYPE.user.format(avatar_export.initiator.guid)],
-            write_access=[ACCESS_TYPE.user.format(avatar_export.initiator.guid)],
-        )
+        with build_avatar_export(avatar_export.initiator, report_progress) as zip_file:
+            avatar_export.file = FileFolder.objects.create(
+                type=FileFolder.Types.FILE,
+                owner=avatar_export.initiator,
+                upload=File(zip_file, 'avatar_export.zip'),
+                read_access=[ACCESS_TYPE.user.format(avatar_export.initiator.guid)],
+                write_access=[ACCESS_TYPE.user.format(avatar_export.initiator.guid)],
+            )
+        avatar_export.refresh_from_db(fields=['total', 'processed', 'failed'])
         avatar_export.status = 'ready'
         avatar_export.save()
 
@@ -21,3 +21,19 @@ def send_mail_by_instance(schema_name, instance_id):
                              instance_id, schema_name, instance.error.__class__, str(instance.error))
         except MailerBase.FailSilentlyError:
             pass
+
+
+@shared_task(ignore_result=True)
+def send_mail_by_instances(schema_name, instance_ids):
+    from core.models.mail import deliver_mail_instances
+
+    with schema_context(schema_name):
+        stats = deliver_mail_instances(instance_ids)
+
+    for instance in stats['errors']:
+        logger.error("background_email_error: id=%s schema=%s error=%s message=%s",
+                     instance.id, schema_name, instance.error.__class__, str(instance.error))
+
+    logger.info("mail_delivery: schema=%s sent=%d failed=%d skipped=%d seconds=%.2f rate=%.1f/s",
+                schema_name, stats['sent'], stats['failed'], stats['skipped'], stats['seconds'],
+                stats['sent'] / stats['seconds'] if stats['seconds'] else 0)
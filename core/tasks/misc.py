@@ -1,4 +1,3 @@
-import csv
 import os
 
 from PIL import Image
@@ -7,11 +6,11 @@ from django.core.files.base import ContentFile
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from core import config
-from core.lib import access_id_to_acl, strip_exif, get_file_checksum
+from core.lib import strip_exif, get_file_checksum
 from core.mail_builders.user_import_failed_mailer import schedule_user_import_failed
 from core.mail_builders.user_import_success_mailer import schedule_user_import_success
-from core.models import Group, Entity, Comment, ProfileField, UserProfileField, ResizedImage
-from django.utils import translation
+from core.models import Group, Entity, Comment, ResizedImage, UserImport
+from django.utils import timezone, translation
 from django_tenants.utils import schema_context
 
 from file.models import FileFolder
@@ -22,43 +21,30 @@ logger = get_task_logger(__name__)
 
 
 @shared_task(bind=True, ignore_result=True)
-def import_users(self, schema_name, fields, csv_location, performing_user_guid):
+def import_users(self, schema_name, fields, csv_location, performing_user_guid, user_import_guid=None):
     # pylint: disable=unused-argument
-    # pylint: disable=too-many-locals
+    # pylint: disable=too-many-arguments
     '''
     Import users
     '''
+    from core.utils.user_import import UserCsvImporter
 
     with schema_context(schema_name):
         if config.LANGUAGE:
             translation.activate(config.LANGUAGE)
 
         performing_user = User.objects.get(id=performing_user_guid)
-
-        stats = {
-            'created': 0,
-            'updated': 0,
-            'error': 0,
-            'processed': 0,
-        }
+        user_import = UserImport.objects.filter(id=user_import_guid).first() if user_import_guid else None
 
         logger.info("Start import on tenant %s by user", performing_user.email)
 
+        importer = UserCsvImporter(fields, user_import)
+        stats = importer.stats
         success = False
         error_message = ''
 
         try:
-            with open(csv_location) as csvfile:
-                reader = csv.DictReader(csvfile, delimiter=';')
-                for row in reader:
-
-                    result = UserCsvRowImporter(row, fields).apply()
-                    stats[result] += 1
-
-                    stats['processed'] += 1
-
-                    if stats['processed'] % 100 == 0:
-                        logger.info('Batch users imported: %s', stats)
+            importer.run(csv_location)
 
             success = True
 
@@ -69,77 +55,18 @@ def import_users(self, schema_name, fields, csv_location, performing_user_guid):
             error_message = "Import failed with message %s" % e
             logger.error(error_message)
 
+        if user_import:
+            UserImport.objects.filter(id=user_import.id).update(**stats,
+                                                                status='ready' if success else 'failed',
+                                                                error_message=error_message,
+                                                                updated_at=timezone.now())
+
         if success:
             schedule_user_import_success(performing_user, stats)
         else:
             schedule_user_import_failed(performing_user, stats, error_message)
 
 
-class UserCsvRowImporter():
-    def __init__(self, record, fields):
-        self.record = record
-        self.fields = fields
-
-    def apply(self):
-        data = self.get_import_users_data()
-        user: User = self.get_import_users_user(data)
-
-        if not user:
-            if 'name' in data and 'email' in data:
-                try:
-                    user = User.objects.create(email=data['email']['value'], name=data['name']['value'])
-                    status = 'created'
-                except Exception:
-                    status = 'error'
-            else:
-                status = 'error'
-        else:
-            status = 'updated'
-
-        if user:
-            # create profile fields
-            for field, values in {d: data[d] for d in data if d not in ['id', 'email', 'name']}.items():
-
-                profile_field = ProfileField.objects.get(id=field)
-
-                if profile_field:
-                    user_profile_field, created = UserProfileField.objects.get_or_create(
-                        profile_field=profile_field,
-                        user_profile=user.profile
-                    )
-
-                    user_profile_field.value = values['value']
-
-                    if created:
-                        user_profile_field.read_access = access_id_to_acl(user, values['accessId'])
-                    elif values['forceAccess']:
-                        user_profile_field.read_access = access_id_to_acl(user, values['accessId'])
-
-                    user_profile_field.save()
-
-        return status
-
-    def get_import_users_data(self):
-        data = {}
-        for field in self.fields:
-            field['value'] = self.record[field['csvColumn']]
-            data[field['userField']] = field
-        return data
-
-    @staticmethod
-    def get_import_users_user(data):
-        if 'id' in data:
-            try:
-                return User.objects.get(id=data['id']['value'])
-            except Exception:
-                pass
-        if 'email' in data:
-            try:
-                return User.objects.get(email=data['email']['value'])
-            except Exception:
-                pass
-
-
 @shared_task(bind=True, ignore_result=True)
 def replace_domain_links(self, schema_name, replace_domain=None):
     # pylint: disable=unused-argument
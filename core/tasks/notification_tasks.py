@@ -2,14 +2,17 @@ import logging
 from celery import shared_task
 from core import config
 from core.models.entity import Entity
-from core.models.group import GroupMembership
+from core.constances import ACCESS_TYPE, USER_ROLES
+from core.models.group import GroupMembership, Subgroup
 from core.models.push_notification import WebPushSubscription
+from core.models.user import UserProfile
 from core.lib import get_model_name, tenant_schema
 from core.utils.push_notification import get_notification_payload, send_web_push_notification
 from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Exists, OuterRef, Q
 from django.utils import timezone, translation
 from django_tenants.utils import schema_context
-from notifications.signals import notify
 
 from user.models import User
 from core.models.mixin import NotificationMixin
@@ -44,22 +47,89 @@ def create_notifications_for_scheduled_content(schema_name):
             create_notification.delay(tenant_schema(), 'created', get_model_name(instance), instance.id, instance.owner.id)
 
 
-def send_push(recipient, sender, verb, instance):
-    translation.activate(recipient.get_language())
-    payload = get_notification_payload(sender, verb, instance)
-    if payload:
-        for subscription in WebPushSubscription.objects.filter(user=recipient):
-            send_web_push_notification(subscription, payload)
+PUSH_BATCH_SIZE = 100
+
+
+@shared_task(ignore_result=True)
+def send_push_notifications(schema_name, verb, model_name, entity_id, sender_id, user_ids):
+    with schema_context(schema_name):
+        instance = apps.get_model(model_name).objects.filter(id=entity_id).first()
+        sender = User.objects.filter(id=sender_id).first()
+        if not instance or not sender:
+            return
+
+        payloads = {}
+        for subscription in WebPushSubscription.objects.filter(user_id__in=user_ids).select_related('user__profile'):
+            language = subscription.user.get_language()
+            if language not in payloads:
+                translation.activate(language)
+                payloads[language] = get_notification_payload(sender, verb, instance)
+            if payloads[language]:
+                send_web_push_notification(subscription, payloads[language])
+
+
+def schedule_push_notifications(recipients, sender, verb, instance):
+    user_ids = [str(recipient.id) for recipient in recipients]
+    for offset in range(0, len(user_ids), PUSH_BATCH_SIZE):
+        send_push_notifications.delay(tenant_schema(), verb, get_model_name(instance), str(instance.id),
+                                      str(sender.id), user_ids[offset:offset + PUSH_BATCH_SIZE])
+
+
+def readable_group_memberships(instance):
+    """
+    Full members of the group of the instance that can read the instance,
+    based on the read access of the instance instead of the acl of every member
+    """
+    memberships = instance.group.members.filter(type__in=['admin', 'owner', 'member'])
+    read_access = set(instance.read_access)
+    if ACCESS_TYPE.public in read_access or ACCESS_TYPE.logged_in in read_access:
+        return memberships
+
+    user_ids, group_ids, subgroup_ids = [], [], []
+    for access in read_access:
+        kind, _, value = access.partition(':')
+        if kind == 'user':
+            user_ids.append(value)
+        elif kind == 'group':
+            group_ids.append(value)
+        elif kind == 'subgroup' and value.isdigit():
+            subgroup_ids.append(int(value) - 10000)
+
+    member_of = GroupMembership.objects.filter(user=OuterRef('user'),
+                                               group_id__in=group_ids,
+                                               type__in=['admin', 'owner', 'member'])
+    subgroup_member_of = Subgroup.members.through.objects.filter(user=OuterRef('user'),
+                                                                 subgroup_id__in=subgroup_ids)
+    return memberships.filter(Q(user__is_superadmin=True) |
+                              Q(user__roles__contains=[USER_ROLES.ADMIN]) |
+                              Q(user_id__in=user_ids) |
+                              Exists(member_of) |
+                              Exists(subgroup_member_of))
+
+
+def bulk_notify(sender, recipients, verb, instance):
+    """ Create the notifications like notify.send does, in one query """
+    actor_content_type = ContentType.objects.get_for_model(sender)
+    action_object_content_type = ContentType.objects.get_for_model(instance)
+    now = timezone.now()
+    notifications = Notification.objects.bulk_create([
+        Notification(recipient=recipient,
+                     actor_content_type=actor_content_type,
+                     actor_object_id=sender.pk,
+                     verb=verb,
+                     public=True,
+                     timestamp=now,
+                     action_object_content_type=action_object_content_type,
+                     action_object_object_id=instance.pk) for recipient in recipients
+    ])
+    return notifications
 
 
 @shared_task(bind=True, ignore_result=True)
 def create_notification(self, schema_name, verb, model_name, entity_id, sender_id):
     # pylint: disable=unused-argument
     # pylint: disable=too-many-arguments
-    # pylint: disable=too-many-locals
     # pylint: disable=too-many-branches
-    # pylint: disable=too-many-statements
-    # pylint: disable=too-many-nested-blocks
     '''
     task for creating a notification. If the content of the notification is in a group and the recipient has configured direct notifications
     for this group. An email task wil be triggered with this notification
@@ -80,12 +150,11 @@ def create_notification(self, schema_name, verb, model_name, entity_id, sender_i
         if verb == "created":
             recipients = []
             if instance.group:
-                for member in instance.group.members.filter(type__in=['admin', 'owner', 'member']).exclude(is_notifications_enabled=False):
-                    if sender == member.user:
-                        continue
-                    if not instance.can_read(member.user):
-                        continue
-                    recipients.append(member.user)
+                memberships = readable_group_memberships(instance) \
+                    .exclude(is_notifications_enabled=False) \
+                    .exclude(user=sender) \
+                    .select_related('user')
+                recipients = [membership.user for membership in memberships]
 
             if not instance.notifications_created:
                 instance.notifications_created = True
@@ -113,50 +182,50 @@ def create_notification(self, schema_name, verb, model_name, entity_id, sender_i
         else:
             return
 
-        # tuple with list is returned, get the notification created
-        notifications = notify.send(sender, recipient=recipients, verb=verb, action_object=instance)[0][1]
+        notifications = bulk_notify(sender, recipients, verb, instance)
+
+        direct_mail = []
+        push = []
 
         # send direct mail and push notification for content in groups
         if getattr(instance, 'group', None):
-            from core.mail_builders.notifications import schedule_notification_mail, MailTypeEnum
+            memberships = {m.user_id: m for m in GroupMembership.objects.filter(group=instance.group,
+                                                                                user_id__in=[n.recipient_id for n in notifications])}
             for notification in notifications:
-                try:
-                    recipient = User.objects.get(id=notification.recipient_id)
-                    membership = GroupMembership.objects.get(user=recipient, group=instance.group)
-                except Exception:
+                membership = memberships.get(notification.recipient_id)
+                if not membership:
                     continue
 
-                # send email direct and mark emailed as True
                 if membership.is_notification_direct_mail_enabled:
-                    schedule_notification_mail(recipient, [notification], MailTypeEnum.DIRECT)
+                    direct_mail.append((notification.recipient, [notification]))
 
-                # send push notification
-                if membership.is_notification_push_enabled and config.PUSH_NOTIFICATIONS_ENABLED:
-                    send_push(recipient, sender, verb, instance)
+                if membership.is_notification_push_enabled:
+                    push.append(notification.recipient)
 
         # send direct mail and push notification for content outside groups
-        else:
-            from core.mail_builders.notifications import schedule_notification_mail, MailTypeEnum
+        elif verb in ("commented", "mentioned"):
+            profiles = {p.user_id: p for p in UserProfile.objects.filter(user_id__in=[n.recipient_id for n in notifications])}
             for notification in notifications:
-                try:
-                    recipient = User.objects.get(id=notification.recipient_id)
-                except Exception:
+                profile = profiles.get(notification.recipient_id)
+                if not profile:
                     continue
 
-                if (verb == "commented"):
-                    # send email direct and mark emailed as True
-                    if recipient.profile.is_comment_notification_direct_mail_enabled:
-                        schedule_notification_mail(recipient, [notification], MailTypeEnum.DIRECT)
-
-                    # send push notification
-                    if recipient.profile.is_comment_notification_push_enabled and config.PUSH_NOTIFICATIONS_ENABLED:
-                        send_push(recipient, sender, verb, instance)
-                
-                elif (verb == "mentioned"):
-                    # send email direct and mark emailed as True
-                    if recipient.profile.is_mention_notification_direct_mail_enabled:
-                        schedule_notification_mail(recipient, [notification], MailTypeEnum.DIRECT)
-
-                    # send push notification
-                    if recipient.profile.is_mention_notification_push_enabled and config.PUSH_NOTIFICATIONS_ENABLED:
-                        send_push(recipient, sender, verb, instance)         
\ No newline at end of file
+                if verb == "commented":
+                    mail_enabled = profile.is_comment_notification_direct_mail_enabled
+                    push_enabled = profile.is_comment_notification_push_enabled
+                else:
+                    mail_enabled = profile.is_mention_notification_direct_mail_enabled
+                    push_enabled = profile.is_mention_notification_push_enabled
+
+                if mail_enabled:
+                    direct_mail.append((notification.recipient, [notification]))
+
+                if push_enabled:
+                    push.append(notification.recipient)
+
+        if direct_mail:
+            from core.mail_builders.notifications import schedule_notification_mails, MailTypeEnum
+            schedule_notification_mails(direct_mail, MailTypeEnum.DIRECT)
+
+        if push and config.PUSH_NOTIFICATIONS_ENABLED:
+            schedule_push_notifications(push, sender, verb, instance)
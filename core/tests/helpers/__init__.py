@@ -21,7 +21,7 @@ from mixer.backend.django import mixer
 
 from backend2.schema import schema
 
-from core.base_config import DEFAULT_SITE_CONFIG
+from core.base_config import DEFAULT_SITE_CONFIG, CONFIG_VERSION_KEY
 from tenants.helpers import FastTenantTestCase
 
 
@@ -88,6 +88,7 @@ class PleioTenantTestCase(FastTenantTestCase):
         for key, value in kwargs.items():
             assert key in DEFAULT_SITE_CONFIG, "%s is not a valid key" % key
             cache.set("%s%s" % (self.tenant.schema_name, key), value)
+        cache.delete("%s%s" % (self.tenant.schema_name, CONFIG_VERSION_KEY))
 
     def override_setting(self, **kwargs):
         for key, value in kwargs.items():
@@ -275,13 +276,18 @@ def override_config(**kwargs):
     for config, value in kwargs.items():
         assert config in DEFAULT_SITE_CONFIG, "%s is not a valid key" % config
 
-    with mock.patch('core.base_config.cache.get') as mocked_cache:
+    with mock.patch('core.base_config.cache.get') as mocked_cache, \
+            mock.patch('core.base_config.cache.get_many') as mocked_cache_many:
         def mock_cache_get(key, default=None):
             for config, value in kwargs.items():
                 if key.endswith(config):
                     return value
             return default
 
+        def mock_cache_get_many(keys):
+            return {key: mock_cache_get(key) for key in keys}
+
         mocked_cache.side_effect = mock_cache_get
+        mocked_cache_many.side_effect = mock_cache_get_many
 
         yield
\ No newline at end of file
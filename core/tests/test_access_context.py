@@ -0,0 +1,91 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+
+from blog.factories import BlogFactory
+from core.constances import ACCESS_TYPE
+from core.lib import get_acl
+from core.models import Group, Subgroup
+from core.tests.helpers import PleioTenantTestCase
+from core.utils.access import begin_access_scope, end_access_scope
+from user.factories import UserFactory
+
+
+class TestAccessContextTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.owner = UserFactory()
+        self.user = UserFactory()
+        self.group = mixer.blend(Group, owner=self.owner, is_closed=True)
+        self.group.join(self.owner, 'owner')
+        self.group.join(self.user, 'member')
+        self.subgroup = Subgroup.objects.create(name="Subgroup", group=self.group)
+        self.subgroup.members.add(self.user)
+
+        self.blogs = [BlogFactory(owner=self.owner,
+                                  group=self.group,
+                                  read_access=[ACCESS_TYPE.group.format(self.group.id)],
+                                  write_access=[ACCESS_TYPE.user.format(self.owner.id)])
+                      for _ in range(5)]
+
+        begin_access_scope()
+
+    def tearDown(self):
+        end_access_scope()
+        super().tearDown()
+
+    def test_access_checks_query_once_per_request(self):
+        with CaptureQueriesContext(connection) as context:
+            for blog in self.blogs:
+                self.assertTrue(blog.can_read(self.user))
+                self.assertFalse(blog.can_write(self.user))
+            self.assertTrue(self.group.is_full_member(self.user))
+            self.assertFalse(self.group.can_write(self.user))
+
+        self.assertEqual(len(context.captured_queries), 2)
+
+    def test_acl(self):
+        self.assertEqual(get_acl(self.user), {
+            ACCESS_TYPE.public,
+            ACCESS_TYPE.logged_in,
+            ACCESS_TYPE.user.format(self.user.id),
+            ACCESS_TYPE.group.format(self.group.id),
+            ACCESS_TYPE.subgroup.format(self.subgroup.access_id),
+        })
+
+    def test_acl_outside_request(self):
+        acl = get_acl(self.user)
+        end_access_scope()
+
+        self.assertEqual(get_acl(self.user), acl)
+
+    def test_leave_group(self):
+        self.assertTrue(self.blogs[0].can_read(self.user))
+
+        self.group.leave(self.user)
+
+        self.assertFalse(self.blogs[0].can_read(self.user))
+        self.assertNotIn(ACCESS_TYPE.subgroup.format(self.subgroup.access_id), get_acl(self.user))
+
+    def test_change_membership_type(self):
+        self.assertFalse(self.blogs[0].can_write(self.user))
+
+        self.group.join(self.user, 'admin')
+
+        self.assertTrue(self.blogs[0].can_write(self.user))
+        self.assertTrue(self.group.can_write(self.user))
+
+    def test_subgroup_members_change(self):
+        subgroup_acl = ACCESS_TYPE.subgroup.format(self.subgroup.access_id)
+        self.assertIn(subgroup_acl, get_acl(self.user))
+
+        self.subgroup.members.remove(self.user)
+        self.assertNotIn(subgroup_acl, get_acl(self.user))
+
+        self.user.subgroups.add(self.subgroup)
+        self.assertIn(subgroup_acl, get_acl(self.user))
+
+        self.subgroup.members.clear()
+        self.assertNotIn(subgroup_acl, get_acl(self.user))
@@ -0,0 +1,70 @@
+import zipfile
+from unittest import mock
+
+from core.models import AvatarExport
+from core.tests.helpers import PleioTenantTestCase
+from core.utils.export.avatar import build_avatar_export
+from user.factories import AdminFactory, UserFactory
+from user.models import User
+
+
+class TestAvatarExportTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.initiator = AdminFactory()
+        self.users = [UserFactory() for _ in range(3)]
+        self.failing_user = self.users[1]
+
+        self.response = mock.MagicMock()
+        self.response.ok = True
+        self.response.content = b"image data"
+        self.response.headers = {"content-type": "image/png"}
+
+        self.session = mock.MagicMock()
+        self.session.__enter__.return_value = self.session
+        self.session.get.return_value = self.response
+        mock.patch("core.utils.export.avatar.avatar_session", return_value=self.session).start()
+
+        self.fetch_avatar = mock.patch("core.utils.export.avatar.fetch_avatar").start()
+        self.fetch_avatar.side_effect = self.avatar_data
+
+    def tearDown(self):
+        mock.patch.stopall()
+        super().tearDown()
+
+    def avatar_data(self, user, session=None):
+        if user == self.failing_user:
+            return {'error': 'not found'}
+        return {'originalAvatarUrl': 'https://avatar/%s' % user.guid}
+
+    def test_build_avatar_export(self):
+        report_progress = mock.MagicMock()
+        active_users = User.objects.filter(is_active=True).count()
+
+        with build_avatar_export(self.initiator, report_progress) as fh:
+            with zipfile.ZipFile(fh) as zip_file:
+                names = set(zip_file.namelist())
+                summary = zip_file.read("summary.csv").decode()
+
+        self.assertIn("summary.csv", names)
+        self.assertIn("%s.png" % self.users[0].guid, names)
+        self.assertNotIn("%s.png" % self.failing_user.guid, names)
+        self.assertEqual(len(summary.splitlines()), active_users + 1)
+        self.assertEqual(report_progress.call_args.args, (active_users, active_users, 1))
+        self.assertTrue(all(c.kwargs['timeout'] for c in self.session.get.call_args_list))
+
+    @mock.patch('core.mail_builders.avatar_export_ready.schedule_avatar_export_ready_mail')
+    def test_export_avatars_records_progress(self, mocked_send_mail):
+        from core.tasks.exports import export_avatars
+        avatar_export = AvatarExport.objects.create(initiator=self.initiator)
+        active_users = User.objects.filter(is_active=True).count()
+
+        export_avatars(self.tenant.schema_name, avatar_export.guid)
+
+        avatar_export.refresh_from_db()
+        self.assertEqual(avatar_export.status, 'ready')
+        self.assertEqual((avatar_export.total, avatar_export.processed, avatar_export.failed),
+                         (active_users, active_users, 1))
+        self.assertTrue(avatar_export.file.upload.name.endswith('.zip'))
@@ -1,4 +1,5 @@
 import os
+from io import BytesIO
 from unittest import mock
 
 from django.utils.translation import gettext
@@ -41,7 +42,7 @@ class TestAvatarExportNotificationTestCase(PleioTenantTestCase):
     @mock.patch('core.mail_builders.avatar_export_ready.schedule_avatar_export_ready_mail')
     def test_called_at_the_end_of_building_the_export(self, mocked_send_mail, mocked_build_export):
         from core.tasks.exports import export_avatars
-        mocked_build_export.return_value = "nothing to report"
+        mocked_build_export.return_value.__enter__.return_value = BytesIO(b"nothing to report")
 
         export_avatars(self.tenant.schema_name, self.avatar_export.guid)
 
@@ -1,6 +1,11 @@
 from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import RequestFactory
+
 from core import config
 from core.base_config import DEFAULT_SITE_CONFIG
+from core.middleware import ConfigSnapshotMiddleware
 from tenants.helpers import FastTenantTestCase
 
 
@@ -59,5 +64,65 @@ class BaseConfigCacheCase(FastTenantTestCase):
         self.assertEqual(self.mock_cache.get.call_count, 2)
 
         config.MENU = []
-        self.assertEqual(self.mock_cache.set.call_count, 1)
+        # the value itself, and the new config version
+        self.assertEqual(self.mock_cache.set.call_count, 2)
         self.assertEqual(self.mock_cache.get.call_count, 2)
+
+
+class ConfigSnapshotCase(FastTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        patcher_cache = patch('core.base_config.cache', wraps=cache)
+        self.mock_cache = patcher_cache.start()
+        self.addCleanup(patcher_cache.stop)
+
+        self.request = RequestFactory().get('/')
+        self.middleware = ConfigSnapshotMiddleware(self.read_all_settings)
+
+    def tearDown(self):
+        cache.clear()
+        super().tearDown()
+
+    @staticmethod
+    def read_all_settings(request):
+        return {key: getattr(config, key) for key in DEFAULT_SITE_CONFIG}
+
+    def cache_calls(self):
+        return self.mock_cache.get.call_count + self.mock_cache.get_many.call_count
+
+    def test_cache_calls_per_request(self):
+        # first request stores the defaults, second one builds the snapshot
+        self.middleware(self.request)
+        self.middleware(self.request)
+        self.mock_cache.reset_mock()
+
+        self.read_all_settings(self.request)
+        without_snapshot = self.cache_calls()
+        self.mock_cache.reset_mock()
+
+        self.middleware(self.request)
+        with_snapshot = self.cache_calls()
+
+        self.assertEqual(without_snapshot, len(DEFAULT_SITE_CONFIG))
+        self.assertEqual(with_snapshot, 1)
+
+    def test_snapshot_reloads_after_change(self):
+        self.middleware(self.request)
+        self.mock_cache.reset_mock()
+
+        config.NAME = "Updated name"
+        response = self.middleware(self.request)
+
+        self.assertEqual(response['NAME'], "Updated name")
+        self.assertEqual(self.mock_cache.get_many.call_count, 1)
+
+    def test_change_within_request(self):
+        def update_and_read(request):
+            config.NAME = "Changed during request"
+            return config.NAME
+
+        middleware = ConfigSnapshotMiddleware(update_and_read)
+
+        self.assertEqual(middleware(self.request), "Changed during request")
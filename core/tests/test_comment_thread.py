@@ -0,0 +1,97 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.factories import BlogFactory
+from core.constances import ACCESS_TYPE
+from core.models import Comment
+from core.tests.helpers import PleioTenantTestCase
+from user.factories import UserFactory
+
+
+class TestCommentThreadTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.owner = UserFactory()
+        self.blog = BlogFactory(owner=self.owner, read_access=[ACCESS_TYPE.public])
+        self.comment = Comment.objects.create(owner=self.owner, container=self.blog)
+        self.reply = Comment.objects.create(owner=self.owner, container=self.comment)
+        self.reply_on_reply = Comment.objects.create(owner=self.owner, container=self.reply)
+
+        self.query = """
+            query BlogItem($guid: String!) {
+                entity(guid: $guid) {
+                    ... on Blog {
+                        commentCount
+                        comments {
+                            guid
+                            commentCount
+                            comments {
+                                guid
+                                commentCount
+                                comments {
+                                    guid
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        """
+
+    def add_thread(self, replies):
+        comment = Comment.objects.create(owner=self.owner, container=self.blog)
+        for _ in range(replies):
+            Comment.objects.create(owner=self.owner, container=comment)
+
+    def fetch_thread(self):
+        self.graphql_client.force_login(self.owner)
+        with CaptureQueriesContext(connection) as context:
+            result = self.graphql_client.post(self.query, {"guid": self.blog.guid})
+        return result["data"]["entity"], len(context.captured_queries)
+
+    def test_thread_position(self):
+        self.assertEqual((self.comment.root_id, self.comment.depth), (self.blog.id, 0))
+        self.assertEqual((self.reply.root_id, self.reply.depth), (self.blog.id, 1))
+        self.assertEqual((self.reply_on_reply.root_id, self.reply_on_reply.depth), (self.blog.id, 2))
+        self.assertEqual(self.reply_on_reply.get_root_container(), self.blog)
+
+    def test_flat_comment_list(self):
+        self.assertEqual(list(self.blog.get_flat_comment_list()),
+                         [self.comment, self.reply, self.reply_on_reply])
+        self.assertEqual(list(self.comment.get_flat_comment_list()),
+                         [self.reply, self.reply_on_reply])
+
+    def test_flat_comment_list_in_one_query(self):
+        with CaptureQueriesContext(connection) as context:
+            comments = list(self.blog.get_flat_comment_list())
+            for comment in comments:
+                self.assertEqual(comment.get_root_container(), self.blog)
+
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_query_thread(self):
+        entity, _ = self.fetch_thread()
+
+        self.assertEqual(entity["commentCount"], 3)
+        self.assertEqual(entity["comments"][0]["guid"], self.comment.guid)
+        self.assertEqual(entity["comments"][0]["commentCount"], 2)
+        self.assertEqual(entity["comments"][0]["comments"][0]["guid"], self.reply.guid)
+        self.assertEqual(entity["comments"][0]["comments"][0]["comments"][0]["guid"], self.reply_on_reply.guid)
+
+    def test_query_count_does_not_grow_with_replies(self):
+        self.add_thread(2)
+        _, few_replies = self.fetch_thread()
+
+        self.add_thread(20)
+        _, many_replies = self.fetch_thread()
+
+        self.assertEqual(few_replies, many_replies)
+
+    def test_move_comment(self):
+        other_blog = BlogFactory(owner=self.owner)
+        self.reply.container = other_blog
+        self.reply.save()
+
+        self.assertEqual((self.reply.root_id, self.reply.depth), (other_blog.id, 0))
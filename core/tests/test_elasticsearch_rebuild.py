@@ -0,0 +1,141 @@
+import uuid
+from unittest import mock
+
+from django.test import override_settings
+
+from blog.factories import BlogFactory
+from control.models import ElasticsearchRebuild, ElasticsearchRebuildStep
+from core.elasticsearch import flush_index_queue
+from core.models import SearchIndexQueueItem, SearchIndexRebuildItem
+from core.tasks.elasticsearch_tasks import (elasticsearch_index_changed_since, elasticsearch_rebuild_all,
+                                            elasticsearch_rebuild_worker, elasticsearch_resume_rebuild)
+from core.tests.helpers import PleioTenantTestCase
+from tenants.models import Client
+from user.factories import UserFactory
+
+
+class TestElasticsearchRebuildTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.create_rebuild_indexes = mock.patch("core.tasks.elasticsearch_tasks.create_rebuild_indexes").start()
+        self.index_tenant_into = mock.patch("core.tasks.elasticsearch_tasks.index_tenant_into").start()
+        self.index_tenant_into.return_value = (10, 0)
+        self.swap_index_aliases = mock.patch("core.tasks.elasticsearch_tasks.swap_index_aliases").start()
+        self.worker_delay = mock.patch("core.tasks.elasticsearch_tasks.elasticsearch_rebuild_worker.delay").start()
+        self.changed_since_delay = mock.patch("core.tasks.elasticsearch_tasks.elasticsearch_index_changed_since.delay").start()
+
+        self.clients = Client.objects.exclude(schema_name='public').count()
+
+    def tearDown(self):
+        mock.patch.stopall()
+        super().tearDown()
+
+    def run_all_steps(self, rebuild):
+        for _ in range(rebuild.steps.count() + 1):
+            elasticsearch_rebuild_worker(rebuild.id)
+
+    @override_settings(ELASTICSEARCH_REBUILD_CONCURRENCY=3)
+    def test_start_rebuild(self):
+        elasticsearch_rebuild_all('blog,news')
+
+        rebuild = ElasticsearchRebuild.objects.active()
+        self.assertEqual(sorted(rebuild.indexes), ['blog', 'news'])
+        self.assertEqual(rebuild.index_name('blog'), 'blog_%s' % rebuild.version)
+        self.assertEqual(rebuild.steps.filter(state='pending').count(), 2 * self.clients)
+        self.assertTrue(self.create_rebuild_indexes.called)
+        self.assertEqual(self.worker_delay.call_count, 3)
+        self.assertFalse(self.swap_index_aliases.called)
+
+    def test_one_rebuild_at_a_time(self):
+        elasticsearch_rebuild_all('blog')
+        elasticsearch_rebuild_all('blog')
+
+        self.assertEqual(ElasticsearchRebuild.objects.count(), 1)
+
+    def test_worker_indexes_one_step_and_continues(self):
+        elasticsearch_rebuild_all('blog')
+        rebuild = ElasticsearchRebuild.objects.active()
+        self.worker_delay.reset_mock()
+
+        elasticsearch_rebuild_worker(rebuild.id)
+
+        step = rebuild.steps.get(state='done')
+        self.assertEqual(step.documents, 10)
+        self.index_tenant_into.assert_called_once_with('blog', rebuild.index_name('blog'))
+        self.worker_delay.assert_called_once_with(rebuild.id)
+
+    def test_swap_after_last_step(self):
+        elasticsearch_rebuild_all('blog')
+        rebuild = ElasticsearchRebuild.objects.active()
+
+        self.run_all_steps(rebuild)
+        elasticsearch_rebuild_worker(rebuild.id)
+
+        rebuild.refresh_from_db()
+        self.assertIsNotNone(rebuild.swapped_at)
+        self.assertIsNone(ElasticsearchRebuild.objects.active())
+        self.swap_index_aliases.assert_called_once()
+        self.assertEqual(self.changed_since_delay.call_count, self.clients)
+        self.assertEqual(rebuild.progress()['documents'], 10 * self.clients)
+
+    def test_failed_steps_are_resumed(self):
+        self.index_tenant_into.side_effect = Exception("Connection lost")
+        elasticsearch_rebuild_all('blog')
+        rebuild = ElasticsearchRebuild.objects.active()
+
+        self.run_all_steps(rebuild)
+
+        self.assertEqual(rebuild.steps.filter(state='failed').count(), self.clients)
+        self.assertIn("Connection lost", rebuild.steps.first().error)
+        self.assertFalse(self.swap_index_aliases.called)
+
+        self.index_tenant_into.side_effect = None
+        elasticsearch_resume_rebuild()
+        self.assertEqual(rebuild.steps.filter(state='pending').count(), self.clients)
+
+        self.run_all_steps(rebuild)
+        self.swap_index_aliases.assert_called_once()
+
+    def test_claim_skips_running_steps(self):
+        elasticsearch_rebuild_all('blog,news')
+        rebuild = ElasticsearchRebuild.objects.active()
+
+        first = ElasticsearchRebuildStep.objects.claim(rebuild)
+        second = ElasticsearchRebuildStep.objects.claim(rebuild)
+
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual(rebuild.steps.filter(state='running').count(), 2)
+
+    @mock.patch('core.utils.elasticsearch.delete_document_if_found')
+    @mock.patch('core.elasticsearch._collect_index_updates')
+    def test_flushed_changes_are_recorded_during_rebuild(self, collect_index_updates, delete_document):
+        blog = BlogFactory(owner=UserFactory())
+        deleted_id = str(uuid.uuid4())
+        SearchIndexQueueItem.objects.enqueue([('blog.Blog', blog.pk)])
+        flush_index_queue()
+        self.assertFalse(SearchIndexRebuildItem.objects.exists())
+
+        elasticsearch_rebuild_all('blog')
+        SearchIndexQueueItem.objects.enqueue([('blog.Blog', blog.pk), ('blog.Blog', deleted_id)])
+        flush_index_queue()
+
+        self.assertEqual({(i.model, i.object_id) for i in SearchIndexRebuildItem.objects.all()},
+                         {('blog.Blog', str(blog.pk)), ('blog.Blog', deleted_id)})
+        delete_document.assert_called_with(deleted_id)
+
+    @mock.patch('core.elasticsearch.schedule_index_queue_flush')
+    @mock.patch('core.tasks.elasticsearch_tasks.index_changed_since')
+    def test_recorded_changes_are_replayed_after_swap(self, index_changed_since, schedule_flush):
+        elasticsearch_rebuild_all('blog')
+        rebuild = ElasticsearchRebuild.objects.active()
+        SearchIndexRebuildItem.objects.enqueue([('blog.Blog', 'changed-blog'), ('blog.Blog', 'deleted-blog')])
+
+        self.run_all_steps(rebuild)
+        elasticsearch_index_changed_since(self.tenant.schema_name, 'blog', rebuild.created_at.isoformat())
+
+        self.assertFalse(SearchIndexRebuildItem.objects.exists())
+        self.assertEqual({(i.model, i.object_id) for i in SearchIndexQueueItem.objects.all()},
+                         {('blog.Blog', 'changed-blog'), ('blog.Blog', 'deleted-blog')})
+        schedule_flush.assert_called_with(self.tenant.schema_name, force=True)
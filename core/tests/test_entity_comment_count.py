@@ -0,0 +1,53 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from blog.factories import BlogFactory
+from core.models import Comment, EntityCommentCount
+from core.tests.helpers import PleioTenantTestCase
+from user.factories import UserFactory
+
+
+class TestEntityCommentCountTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.owner = UserFactory()
+        self.blog = BlogFactory(owner=self.owner)
+        self.comment = Comment.objects.create(owner=self.owner, container=self.blog)
+        self.reply = Comment.objects.create(owner=self.owner, container=self.comment)
+        self.reply_on_reply = Comment.objects.create(owner=self.owner, container=self.reply)
+
+    def stored_count(self):
+        return EntityCommentCount.objects.get(entity_id=self.blog.id).comments
+
+    def test_count_on_add(self):
+        self.assertEqual(self.stored_count(), 3)
+
+    def test_count_on_delete(self):
+        self.reply_on_reply.delete()
+
+        self.assertEqual(self.stored_count(), 2)
+
+    def test_count_on_delete_thread(self):
+        self.comment.delete()
+
+        self.assertEqual(self.stored_count(), 0)
+
+    def test_delete_entity_with_comments(self):
+        self.blog.delete()
+
+        self.assertFalse(EntityCommentCount.objects.filter(entity_id=self.blog.id).exists())
+
+    def test_rebuild_comment_counts(self):
+        other_blog = BlogFactory(owner=self.owner)
+        Comment.objects.create(owner=self.owner, container=other_blog)
+        EntityCommentCount.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_comment_counts', stdout=out)
+
+        self.assertEqual(self.stored_count(), 3)
+        self.assertEqual(EntityCommentCount.objects.get(entity_id=other_blog.id).comments, 1)
+        self.assertIn("Rebuilt comment count for 2 entities", out.getvalue())
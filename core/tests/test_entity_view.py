@@ -1,3 +1,6 @@
+from django.db import connection
+
+from core.tasks.cronjobs import flush_view_counts
 from core.tests.helpers import PleioTenantTestCase
 from user.models import User
 from blog.models import Blog
@@ -60,7 +63,14 @@ class EntityViewTestCase(PleioTenantTestCase):
 
         self.graphql_client.post(self.query, self.variables)
         self.graphql_client.post(self.query, self.variables)
-        self.graphql_client.post(self.query, self.variables)
+        result = self.graphql_client.post(self.query, self.variables)
+
+        # Views are counted when the buffered views are flushed
+        data = result["data"]["entity"]
+        self.assertIsNone(data["lastSeen"])
+        self.assertEqual(data["views"], 0)
+
+        flush_view_counts(connection.schema_name)
         result = self.graphql_client.post(self.query, self.variables)
 
         data = result["data"]["entity"]
@@ -72,6 +82,7 @@ class EntityViewTestCase(PleioTenantTestCase):
         self.graphql_client.post(self.query, self.variables)
         self.graphql_client.post(self.query, self.variables)
         self.graphql_client.post(self.query, self.variables)
+        flush_view_counts(connection.schema_name)
         result = self.graphql_client.post(self.query, self.variables)
 
         data = result["data"]["entity"]
@@ -87,6 +98,7 @@ class EntityViewTestCase(PleioTenantTestCase):
         self.graphql_client.reset()
         self.graphql_client.post(self.query, self.variables)
         self.graphql_client.post(self.query, self.variables)
+        flush_view_counts(connection.schema_name)
         result = self.graphql_client.post(self.query, self.variables)
 
         data = result["data"]["entity"]
@@ -102,6 +114,7 @@ class EntityViewTestCase(PleioTenantTestCase):
         self.graphql_client.force_login(self.owner)
         self.graphql_client.post(self.query, self.variables)
         self.graphql_client.post(self.query, self.variables)
+        flush_view_counts(connection.schema_name)
         result = self.graphql_client.post(self.query, self.variables)
 
         data = result["data"]["entity"]
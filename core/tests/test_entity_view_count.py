@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.timezone import timedelta
+
+from blog.factories import BlogFactory
+from core.constances import ACCESS_TYPE
+from core.models import EntityView, EntityViewCount
+from core.tasks.cronjobs import cleanup_entity_views, flush_view_counts
+from core.tests.helpers import PleioTenantTestCase
+from user.factories import UserFactory
+
+
+class TestEntityViewCountTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.owner = UserFactory()
+        self.visitor = UserFactory()
+        self.blog = BlogFactory(owner=self.owner,
+                                read_access=[ACCESS_TYPE.public])
+
+        self.query = """
+            query Entity($guid: String) {
+                entity(guid: $guid, incrementViewCount: true) {
+                    guid
+                }
+            }
+        """
+
+    def view(self, user):
+        self.graphql_client.force_login(user)
+        self.graphql_client.post(self.query, {"guid": self.blog.guid})
+
+    def test_view_does_not_save_entity(self):
+        with mock.patch("blog.models.Blog.save") as save:
+            self.view(self.visitor)
+
+        self.assertFalse(save.called)
+        self.assertEqual(EntityView.objects.filter(entity=self.blog, viewer=self.visitor).count(), 1)
+
+    def test_repeated_views_are_stored_once(self):
+        self.view(self.visitor)
+        self.view(self.visitor)
+        EntityView.objects.register(self.blog.guid, viewer_id=self.visitor.id)
+
+        self.assertEqual(EntityView.objects.filter(entity=self.blog).count(), 1)
+
+    def test_flush_view_counts(self):
+        self.view(self.visitor)
+        self.view(self.owner)
+        self.assertFalse(EntityViewCount.objects.filter(entity=self.blog).exists())
+
+        flush_view_counts(connection.schema_name)
+        self.assertEqual(EntityViewCount.objects.get(entity=self.blog).views, 2)
+
+        EntityView.objects.register(self.blog.guid, session="session-id")
+        flush_view_counts(connection.schema_name)
+        flush_view_counts(connection.schema_name)
+
+        self.assertEqual(EntityViewCount.objects.get(entity=self.blog).views, 3)
+        self.assertFalse(EntityView.objects.filter(counted=False).exists())
+
+    def test_cleanup_anonymous_views(self):
+        EntityView.objects.register(self.blog.guid, session="session-id")
+        EntityView.objects.register(self.blog.guid, viewer_id=self.visitor.id)
+        EntityView.objects.update(created_at=timezone.now() - timedelta(seconds=settings.SESSION_COOKIE_AGE + 1))
+
+        cleanup_entity_views(connection.schema_name)
+
+        self.assertEqual(EntityViewCount.objects.get(entity=self.blog).views, 2)
+        self.assertEqual([*EntityView.objects.values_list('viewer_id', flat=True)], [self.visitor.id])
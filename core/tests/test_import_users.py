@@ -2,8 +2,9 @@ from django.db import connection
 from core.lib import get_tmp_file_path, access_id_to_acl
 from core.tasks import import_users
 from django.contrib.auth.models import AnonymousUser
-from core.models import ProfileField, UserProfileField
+from core.models import Group, ProfileField, SearchIndexQueueItem, UserImport, UserProfileField
 from core.tests.helpers import PleioTenantTestCase, override_config
+from core.utils.user_import import UserCsvImporter
 from user.models import User
 from mixer.backend.django import mixer
 from unittest.mock import patch
@@ -204,3 +205,137 @@ class ImportUsersTestCase(PleioTenantTestCase):
         import_users.s(connection.schema_name, fields, '/tmp/does/not/exist.csv', self.admin.guid).apply()
 
         self.assertEqual(mocked_mail.call_count, 1)
+
+    @override_config(IS_CLOSED=False)
+    @patch('core.tasks.import_users.delay')
+    def test_import_users_step2_creates_user_import(self, mocked_import_users):
+        mutation = """
+            mutation ($input: importUsersStep2Input!) {
+                importUsersStep2(input: $input) {
+                    userImport {
+                        guid
+                        status
+                    }
+                }
+            }
+        """
+        variables = {
+            "input": {
+                "importId": os.path.basename(self.usersCsv),
+                "fields": [{"csvColumn": "column2", "userField": 'email'}]
+            }
+        }
+
+        self.graphql_client.force_login(self.admin)
+        result = self.graphql_client.post(mutation, variables)
+        data = result["data"]["importUsersStep2"]["userImport"]
+
+        self.assertEqual(data["status"], 'pending')
+        self.assertEqual(mocked_import_users.call_args.args[-1], data["guid"])
+
+    @override_config(IS_CLOSED=False)
+    @patch('core.utils.user_import.schedule_index_queue_flush')
+    @patch('core.tasks.misc.schedule_user_import_success')
+    def test_import_users_progress(self, mocked_mail, mocked_flush):
+        user_import = UserImport.objects.create(initiator=self.admin)
+        created_at = user_import.updated_at
+        fields = [
+            {"csvColumn": "column2", "userField": 'email'},
+            {"csvColumn": "column3", "userField": 'name'},
+            {"csvColumn": "column4", "userField": str(self.profileField1.id), "accessId": 2},
+        ]
+
+        import_users.s(connection.schema_name, fields, self.usersCsv, self.admin.guid, user_import.guid).apply()
+
+        self.graphql_client.force_login(self.admin)
+        result = self.graphql_client.post("""
+            query UserImport($guid: String!) {
+                userImport(guid: $guid) {
+                    status
+                    total
+                    processed
+                    created
+                    updated
+                    error
+                }
+            }
+        """, {"guid": user_import.guid})
+
+        self.assertEqual(result["data"]["userImport"], {
+            "status": "ready",
+            "total": 3,
+            "processed": 3,
+            "created": 2,
+            "updated": 1,
+            "error": 0,
+        })
+        self.assertEqual(mocked_mail.call_args.args[1], {'created': 2, 'updated': 1, 'error': 0, 'processed': 3})
+        user_import.refresh_from_db()
+        self.assertGreater(user_import.updated_at, created_at)
+
+    def test_user_import_query_requires_admin(self):
+        user_import = UserImport.objects.create(initiator=self.admin)
+
+        with self.assertGraphQlError("user_not_site_admin"):
+            self.graphql_client.force_login(self.user)
+            self.graphql_client.post("""
+                query UserImport($guid: String!) {
+                    userImport(guid: $guid) {
+                        status
+                    }
+                }
+            """, {"guid": user_import.guid})
+
+    @patch('core.utils.user_import.schedule_index_queue_flush')
+    def test_import_in_batches(self, mocked_flush):
+        fields = [
+            {"csvColumn": "column2", "userField": 'email'},
+            {"csvColumn": "column3", "userField": 'name'},
+            {"csvColumn": "column5", "userField": str(self.profileField2.id), "accessId": 1, "forceAccess": True},
+        ]
+
+        stats = UserCsvImporter(fields, batch_size=2).run(self.usersCsv)
+
+        self.assertEqual(stats, {'created': 2, 'updated': 1, 'error': 0, 'processed': 3})
+        self.assertEqual(UserProfileField.objects.filter(profile_field=self.profileField2).count(), 3)
+        self.existing_user_profile_field2.refresh_from_db()
+        self.assertEqual(self.existing_user_profile_field2.value, 'row-2-5')
+        self.assertEqual(self.existing_user_profile_field2.value_list, ['row-2-5'])
+        self.assertEqual(self.existing_user_profile_field2.read_access,
+                         ['user:' + self.existing_user.guid, 'logged_in'])
+
+        self.assertTrue(mocked_flush.called)
+        queued = set(SearchIndexQueueItem.objects.filter(model='user.User').values_list('object_id', flat=True))
+        self.assertEqual(queued, {str(u.id) for u in User.objects.filter(email__startswith='row-')})
+
+    @patch('core.utils.user_import.schedule_index_queue_flush')
+    def test_import_same_new_user_twice(self, mocked_flush):
+        with open(self.usersCsv, 'w') as csvfile:
+            csvfile.write('name;email\n'
+                          'first;new@example.com\n'
+                          'second;new@example.com\n')
+        fields = [
+            {"csvColumn": "email", "userField": 'email'},
+            {"csvColumn": "name", "userField": 'name'},
+        ]
+
+        stats = UserCsvImporter(fields).run(self.usersCsv)
+
+        self.assertEqual(User.objects.filter(email='new@example.com').count(), 1)
+        self.assertEqual(stats, {'created': 1, 'updated': 1, 'error': 0, 'processed': 2})
+
+    @patch('core.utils.user_import.schedule_index_queue_flush')
+    def test_import_new_users_join_auto_membership_groups(self, mocked_flush):
+        group = mixer.blend(Group, owner=self.admin, is_auto_membership_enabled=True)
+        fields = [
+            {"csvColumn": "column2", "userField": 'email'},
+            {"csvColumn": "column3", "userField": 'name'},
+        ]
+
+        UserCsvImporter(fields).run(self.usersCsv)
+
+        for email in ['row-1-2@example.com', 'row-3-2@example.com']:
+            user = User.objects.get(email=email)
+            self.assertTrue(group.is_full_member(user))
+            self.assertTrue(user.notifications.filter(verb='welcome').exists())
+        self.assertFalse(group.is_full_member(self.existing_user))
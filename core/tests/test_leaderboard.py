@@ -0,0 +1,82 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.factories import BlogFactory
+from core.constances import ACCESS_TYPE
+from core.models import Annotation, EntityVoteCount
+from core.tasks.cronjobs import refresh_vote_counts
+from core.tests.helpers import PleioTenantTestCase
+from core.utils.leaderboard import top_users, trending_tags
+from user.factories import UserFactory
+
+
+class TestLeaderboardTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.author1 = UserFactory()
+        self.author2 = UserFactory()
+        self.voter = UserFactory()
+        self.visitor = UserFactory()
+
+        self.blog1 = self.create_blog(self.author1, ["one", "two"])
+        self.blog2 = self.create_blog(self.author2, ["two"])
+        self.private_blog = self.create_blog(self.author2, ["secret"],
+                                             read_access=[ACCESS_TYPE.user.format(self.voter.id)])
+
+        self.blog1.add_vote(user=self.voter, score=1)
+        self.blog1.add_vote(user=self.author2, score=1)
+        self.blog2.add_vote(user=self.voter, score=1)
+        for user in [self.author1, self.visitor]:
+            self.private_blog.add_vote(user=user, score=1)
+
+    @staticmethod
+    def create_blog(owner, tags, **kwargs):
+        blog = BlogFactory(owner=owner, **kwargs)
+        blog.tags = tags
+        blog.save()
+        return blog
+
+    def test_votes_are_counted(self):
+        self.assertEqual(EntityVoteCount.objects.get(entity=self.blog1).votes, 2)
+        self.assertEqual(EntityVoteCount.objects.get(entity=self.private_blog).votes, 2)
+
+    def test_remove_vote(self):
+        self.blog1.remove_vote(self.voter)
+
+        self.assertEqual(EntityVoteCount.objects.get(entity=self.blog1).votes, 1)
+
+    def test_trending_respects_access(self):
+        self.assertEqual(trending_tags(self.visitor), [
+            {'tag': 'two', 'likes': 3},
+            {'tag': 'one', 'likes': 2},
+        ])
+        self.assertEqual(trending_tags(self.voter)[0], {'tag': 'two', 'likes': 3})
+        self.assertIn({'tag': 'secret', 'likes': 2}, trending_tags(self.voter))
+
+    def test_top_respects_access(self):
+        self.assertEqual(top_users(self.visitor), [
+            {'user': self.author1, 'likes': 2},
+            {'user': self.author2, 'likes': 1},
+        ])
+        self.assertEqual(top_users(self.voter)[0], {'user': self.author2, 'likes': 3})
+
+    def test_result_is_cached(self):
+        trending_tags(self.visitor)
+
+        with CaptureQueriesContext(connection) as context:
+            trending_tags(self.visitor)
+
+        self.assertFalse([q for q in context.captured_queries if 'core_entityvotecount' in q['sql']])
+
+    def test_refresh_drops_votes_outside_window(self):
+        self.override_setting(LEADERBOARD_WINDOW_DAYS=30)
+        Annotation.objects.filter(object_id=self.blog1.id).update(created_at=timezone.now() - timezone.timedelta(days=31))
+
+        refresh_vote_counts(self.tenant.schema_name)
+
+        self.assertFalse(EntityVoteCount.objects.filter(entity=self.blog1).exists())
+        self.assertEqual(EntityVoteCount.objects.get(entity=self.blog2).votes, 1)
+        self.assertEqual(trending_tags(self.visitor), [{'tag': 'two', 'likes': 1}])
@@ -0,0 +1,138 @@
+import socketserver
+import threading
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.core.mail.backends.smtp import EmailBackend
+from django.template.loader import get_template
+
+from core.mail_builders.site_access_request_denied import SiteAccessRequestDeniedMailer
+from core.models import MailInstance, MailLog
+from core.models.mail import deliver_mail_instances
+from core.tests.helpers import PleioTenantTestCase
+from user.factories import UserFactory
+
+
+class SmtpStandIn(socketserver.ThreadingTCPServer):
+    """ Just enough of an SMTP server to accept mail from the smtp backend """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SmtpHandler)
+        self.connections = 0
+        self.messages = []
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost ESMTP")
+        while True:
+            command = self.rfile.readline().decode().strip().upper()
+            if not command or command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            if command.startswith("DATA"):
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                for line in iter(self.rfile.readline, b".\r\n"):
+                    lines.append(line)
+                self.server.messages.append(b"".join(lines))
+            self.reply("250 localhost" if command.startswith(("EHLO", "HELO")) else "250 OK")
+
+
+class TestMailDeliveryTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.smtp = SmtpStandIn()
+        threading.Thread(target=self.smtp.serve_forever, daemon=True).start()
+        self.override_setting(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+                              EMAIL_HOST='127.0.0.1',
+                              EMAIL_PORT=self.smtp.port,
+                              EMAIL_HOST_USER='',
+                              EMAIL_HOST_PASSWORD='',
+                              EMAIL_USE_TLS=False,
+                              EMAIL_USE_SSL=False)
+
+        self.sender = UserFactory()
+
+    def tearDown(self):
+        self.smtp.shutdown()
+        self.smtp.server_close()
+        super().tearDown()
+
+    def create_instances(self, emails):
+        return MailInstance.objects.bulk_create([
+            MailInstance(mailer=SiteAccessRequestDeniedMailer.class_id(),
+                         mailer_kwargs={'email': email,
+                                        'name': 'Requester',
+                                        'sender': self.sender.guid})
+            for email in emails])
+
+    def test_batch_uses_one_connection(self):
+        instances = self.create_instances(["mail%s@example.com" % n for n in range(5)])
+
+        stats = deliver_mail_instances([i.id for i in instances])
+
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(len(self.smtp.messages), 5)
+        self.assertEqual(stats['sent'], 5)
+        self.assertEqual(MailLog.objects.filter(mail_instance__in=instances).count(), 5)
+
+    def test_skip_inactive_users(self):
+        UserFactory(email="inactive@example.com", is_active=False)
+        instances = self.create_instances(["active@example.com", "inactive@example.com"])
+
+        stats = deliver_mail_instances([i.id for i in instances])
+
+        self.assertEqual(len(self.smtp.messages), 1)
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual([*MailLog.objects.values_list('receiver_email', flat=True)], ["active@example.com"])
+
+    def test_template_is_compiled_once(self):
+        instances = self.create_instances(["mail%s@example.com" % n for n in range(3)])
+
+        with mock.patch("core.mail_builders.base.get_template", wraps=get_template) as compile_template:
+            deliver_mail_instances([i.id for i in instances])
+
+        self.assertEqual(compile_template.call_count, 1)
+
+    def test_connection_failure_is_logged_for_every_mail(self):
+        instances = self.create_instances(["mail%s@example.com" % n for n in range(3)])
+
+        with mock.patch.object(EmailBackend, 'open', side_effect=ConnectionRefusedError("Connection refused")):
+            stats = deliver_mail_instances([i.id for i in instances])
+
+        self.assertEqual(stats['failed'], 3)
+        self.assertEqual(len(self.smtp.messages), 0)
+        results = MailLog.objects.filter(mail_instance__in=instances).values_list('result', flat=True)
+        self.assertEqual([result['error'] for result in results], ["Connection refused"] * 3)
+
+    def test_reconnect_after_disconnect(self):
+        instances = self.create_instances(["mail%s@example.com" % n for n in range(3)])
+        send = EmailBackend._send
+        calls = []
+
+        def disconnect_once(backend, message):
+            calls.append(message)
+            if len(calls) == 2:
+                raise SMTPServerDisconnected("Connection unexpectedly closed")
+            return send(backend, message)
+
+        with mock.patch.object(EmailBackend, '_send', autospec=True, side_effect=disconnect_once):
+            stats = deliver_mail_instances([i.id for i in instances])
+
+        self.assertEqual(stats['sent'], 3)
+        self.assertEqual(self.smtp.connections, 2)
+        self.assertEqual(len(self.smtp.messages), 3)
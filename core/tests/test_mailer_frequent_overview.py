@@ -4,16 +4,20 @@ from mixer.backend.django import mixer
 from unittest import mock
 
 from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import localtime, timedelta
 
 from core import override_local_config
 from core.constances import ACCESS_TYPE
 from core.factories import GroupFactory
 from core.lib import get_acl
-from core.mail_builders.frequent_overview import FrequentOverviewMailer, EntityCollection
+from core.mail_builders.frequent_overview import (FrequentOverviewMailer, EntityCollection, OverviewCandidates,
+                                                  schedule_frequent_overview_mails)
 from core.tasks import send_overview
 from tenants.helpers import FastTenantTestCase
 from user.factories import UserFactory, EditorFactory
+from user.models import User
 
 
 def create_user(interval='never', factory=UserFactory, **kwargs):
@@ -116,15 +120,17 @@ class TestFrequentOverviewMailerTestCase(FastTenantTestCase):
             self.assertNotIn("Overridden sitename", self.mailer.get_subject())
             self.assertEqual("Overridden overview subject", self.mailer.get_subject())
 
-    @mock.patch("core.tasks.cronjobs.schedule_frequent_overview_mail")
-    def test_executed_at_the_right_spot(self, mocked_schedule_mail):
+    @mock.patch("core.tasks.cronjobs.schedule_frequent_overview_mails")
+    def test_executed_at_the_right_spot(self, mocked_schedule_mails):
+        mocked_schedule_mails.return_value = 1
         for interval, expected_user in [('daily', self.daily_user),
                                         ('weekly', self.weekly_user),
                                         ('monthly', self.monthly_user)]:
             send_overview(self.tenant.schema_name, interval)
-            self.assertEqual(1, mocked_schedule_mail.call_count)
-            self.assertEqual((expected_user, interval), mocked_schedule_mail.call_args.args)
-            mocked_schedule_mail.reset_mock()
+            self.assertEqual(1, mocked_schedule_mails.call_count)
+            users, called_interval = mocked_schedule_mails.call_args.args
+            self.assertEqual(([expected_user], interval), ([*users], called_interval))
+            mocked_schedule_mails.reset_mock()
 
     def test_serialize_entities(self):
         subset = [self.content[0],
@@ -368,3 +374,84 @@ class TestFrequentOverviewMailerContentTestCase(FastTenantTestCase):
         self.assertNotIn(last_month, entities)
         self.assertNotIn(previous_month, entities)
         self.assertNotIn(not_published, entities)
+
+
+class TestFrequentOverviewBatchTestCase(FastTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.author = create_user(email="author@localhost",
+                                  factory=EditorFactory)
+        self.group = GroupFactory(owner=self.author)
+
+        self.LAST_WEEK = localtime() - timedelta(days=5)
+        self.content = [
+            create_article("blog.Blog", owner=self.author, title="Public"),
+            create_article("news.News", owner=self.author, title="Tagged", published=self.LAST_WEEK, tags=["Test"]),
+            create_article("blog.Blog", owner=self.author, title="Featured", is_featured=True),
+            create_article("blog.Blog", owner=self.author, title="Group",
+                           read_access=[ACCESS_TYPE.group.format(self.group.id)]),
+            create_article("wiki.Wiki", owner=self.author, title="Logged in",
+                           read_access=[ACCESS_TYPE.logged_in]),
+            create_article("discussion.Discussion", owner=self.author, title="Discussion"),
+        ]
+
+    def create_users(self, amount):
+        users = []
+        for n in range(amount):
+            user = create_user('weekly')
+            if n % 2:
+                self.group.join(user)
+            if n % 3:
+                user.profile.overview_email_tags = ['Test']
+                user.profile.save()
+            if n % 4:
+                user.viewed_entities.create(entity=self.content[0])
+            users.append(user)
+        return users
+
+    def weekly_users(self):
+        return User.objects.filter(_profile__overview_email_interval='weekly').select_related('_profile')
+
+    @override_local_config(EMAIL_OVERVIEW_ENABLE_FEATURED=True)
+    def test_same_content_as_per_user_selection(self):
+        self.create_users(8)
+        candidates = OverviewCandidates('weekly')
+
+        for user, collection in candidates.collections(list(self.weekly_users())):
+            expected = EntityCollection(user, 'weekly')
+            self.assertEqual(expected.get_entities(), collection.get_entities())
+            self.assertEqual(expected.get_featured(), collection.get_featured())
+
+    @override_local_config(EMAIL_OVERVIEW_ENABLE_FEATURED=True)
+    @mock.patch("core.models.mail.MailInstanceManager.submit_many")
+    def test_mailer_uses_selected_content(self, submit_many):
+        user, = self.create_users(1)
+        submit_many.side_effect = lambda mailer, kwargs_list: kwargs_list
+
+        schedule_frequent_overview_mails(self.weekly_users(), 'weekly')
+        kwargs, = submit_many.call_args.args[1]
+        context = FrequentOverviewMailer(**kwargs).get_context()
+
+        expected = EntityCollection(user, 'weekly')
+        self.assertEqual(FrequentOverviewMailer.serialize_entities(expected.get_entities()), context['entities'])
+        self.assertEqual(FrequentOverviewMailer.serialize_entities(expected.get_featured()), context['featured'])
+
+    @mock.patch("core.models.mail.MailInstanceManager.submit_many")
+    def test_query_count_does_not_grow_with_subscribers(self, submit_many):
+        submit_many.side_effect = lambda mailer, kwargs_list: kwargs_list
+
+        def schedule():
+            with CaptureQueriesContext(connection) as context:
+                schedule_frequent_overview_mails(self.weekly_users(), 'weekly')
+            return len(context.captured_queries)
+
+        self.create_users(3)
+        few_users = schedule()
+
+        self.create_users(30)
+        many_users = schedule()
+
+        self.assertEqual(few_users, many_users)
+        self.assertEqual(len(submit_many.call_args.args[1]), 33)
@@ -1,10 +1,14 @@
 import random
+from datetime import timedelta
+
 from django.core.management import call_command
 from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from core.mail_builders.notifications import MailTypeEnum
 from core.models import Group
-from core.tasks import create_notification
+from core.tasks import create_notification, send_notifications
 from core.tests.helpers import PleioTenantTestCase
 from user.models import User
 from blog.models import Blog
@@ -53,13 +57,13 @@ class SendNotificationEmailsTestCase(PleioTenantTestCase):
     def tearDown(self):
         super().tearDown()
 
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_command_do_not_send_welcome_notification(self, mocked_send_notifications):
         """ Welcome notification is created on user creation, this should not be send """
         call_command('send_notification_emails')
         self.assertEqual(mocked_send_notifications.call_count, 0)
 
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_command_send_5_notifications(self, mocked_send_notifications):
         i = 0
         while i < 5:
@@ -68,13 +72,14 @@ class SendNotificationEmailsTestCase(PleioTenantTestCase):
 
         call_command('send_notification_emails')
 
-        args, kwargs = mocked_send_notifications.call_args
-        self.assertEqual(args[0], self.user2)
-        self.assertEqual([notification.action_object for notification in args[1]],
+        (user_notifications, mail_type), kwargs = mocked_send_notifications.call_args
+        (user, notifications), = user_notifications
+        self.assertEqual(user, self.user2)
+        self.assertEqual([notification.action_object for notification in notifications],
                          [self.blog1, self.blog1, self.blog1, self.blog1, self.blog1])
-        self.assertEqual(args[2], MailTypeEnum.COLLECTED)
+        self.assertEqual(mail_type, MailTypeEnum.COLLECTED)
 
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notifications_marked_as_sent(self, mocked_send_notifications):
         i = 0
         while i < 10:
@@ -85,7 +90,7 @@ class SendNotificationEmailsTestCase(PleioTenantTestCase):
         self.assertEqual(mocked_send_notifications.call_count, 1)
         self.assertEqual(len(self.user2.notifications.filter(emailed=False, verb__in=['created', 'commented', 'mentioned'])), 0)
 
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notifications_not_sent_to_banned_users(self, mocked_send_notifications):
         create_notification.s(connection.schema_name, 'commented', 'blog.blog', self.blog1.id, self.user1.id).apply()
         self.user2.is_active = False
@@ -93,7 +98,7 @@ class SendNotificationEmailsTestCase(PleioTenantTestCase):
         call_command('send_notification_emails')
         self.assertEqual(mocked_send_notifications.call_count, 0)
 
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notifications_not_sent_notifications_off(self, mocked_send_notifications):
         create_notification.s(connection.schema_name, 'commented', 'blog.blog', self.blog1.id, self.user1.id).apply()
         self.user2.profile.receive_notification_email = False
@@ -103,7 +108,7 @@ class SendNotificationEmailsTestCase(PleioTenantTestCase):
         call_command('send_notification_emails')
         self.assertEqual(mocked_send_notifications.call_count, 0)
 
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_template_context_of_created_notification(self, mocked_send_notifications):
         blog2 = Blog.objects.create(
             title='Blog2',
@@ -118,14 +123,15 @@ class SendNotificationEmailsTestCase(PleioTenantTestCase):
 
         self.assertEqual(mocked_send_notifications.call_count, 1)
 
-        args, kwargs = mocked_send_notifications.call_args
-        self.assertEqual(args[0], self.user2)
-        self.assertEqual(args[1][0].action_object, blog2)
-        self.assertEqual(args[2], MailTypeEnum.COLLECTED)
+        (user_notifications, mail_type), kwargs = mocked_send_notifications.call_args
+        (user, notifications), = user_notifications
+        self.assertEqual(user, self.user2)
+        self.assertEqual(notifications[0].action_object, blog2)
+        self.assertEqual(mail_type, MailTypeEnum.COLLECTED)
 
         blog2.delete()
 
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_command_notifications_disabled(self, mocked_send_notifications):
         i = 0
         while i < 5:
@@ -135,3 +141,43 @@ class SendNotificationEmailsTestCase(PleioTenantTestCase):
         call_command('send_notification_emails')
 
         self.assertEqual(mocked_send_notifications.call_count, 0)
+
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
+    def test_task_sends_notifications(self, mocked_send_notifications):
+        notify.send(self.user1, recipient=[self.user2], verb="commented", action_object=self.blog1)
+
+        send_notifications(connection.schema_name)
+
+        (user_notifications, mail_type), kwargs = mocked_send_notifications.call_args
+        self.assertEqual([user for user, _ in user_notifications], [self.user2])
+        self.assertEqual(self.user2.notifications.filter(emailed=False, verb='commented').count(), 0)
+
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
+    def test_respect_notification_interval(self, mocked_send_notifications):
+        notify.send(self.user1, recipient=[self.user2], verb="commented", action_object=self.blog1)
+        call_command('send_notification_emails')
+        mocked_send_notifications.reset_mock()
+
+        notify.send(self.user1, recipient=[self.user2], verb="commented", action_object=self.blog2)
+        call_command('send_notification_emails')
+        self.assertEqual(mocked_send_notifications.call_count, 0)
+
+        self.user2.notifications.filter(emailed=True).update(timestamp=timezone.now() - timedelta(hours=25))
+        self.user2.profile.notification_email_interval_hours = 24
+        self.user2.profile.save()
+        call_command('send_notification_emails')
+        self.assertEqual(mocked_send_notifications.call_count, 1)
+
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
+    def test_query_count_does_not_grow_with_users(self, mocked_send_notifications):
+        def send_to(amount):
+            for _ in range(amount):
+                user = mixer.blend(User)
+                user.profile.receive_notification_email = True
+                user.profile.save()
+                notify.send(self.user1, recipient=[user], verb="commented", action_object=self.blog1)
+            with CaptureQueriesContext(connection) as context:
+                send_notifications(connection.schema_name)
+            return len(context.captured_queries)
+
+        self.assertEqual(send_to(2), send_to(20))
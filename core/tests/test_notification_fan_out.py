@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from notifications.models import Notification
+
+from blog.factories import BlogFactory
+from core.constances import ACCESS_TYPE
+from core.factories import GroupFactory
+from core.models import Subgroup
+from core.tasks import create_notification
+from core.tasks.notification_tasks import readable_group_memberships
+from core.tests.helpers import PleioTenantTestCase
+from user.factories import AdminFactory, UserFactory
+
+
+class TestNotificationFanOutTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        # let the test explicitly add notifications.
+        mock.patch('core.tasks.create_notification.delay').start()
+
+        self.owner = UserFactory()
+        self.group = GroupFactory(owner=self.owner)
+        self.member = UserFactory()
+        self.subgroup_member = UserFactory()
+        self.admin = AdminFactory()
+        self.pending = UserFactory()
+        for user in [self.member, self.subgroup_member, self.admin]:
+            self.group.join(user, 'member')
+        self.group.join(self.pending, 'pending')
+
+        self.subgroup = Subgroup.objects.create(name="Subgroup", group=self.group)
+        self.subgroup.members.add(self.subgroup_member)
+
+    def tearDown(self):
+        mock.patch.stopall()
+        super().tearDown()
+
+    def add_members(self, amount):
+        for _ in range(amount):
+            self.group.join(UserFactory(), 'member')
+
+    def create_blog(self, read_access):
+        return BlogFactory(owner=self.owner,
+                           group=self.group,
+                           read_access=read_access)
+
+    def readable_by(self, blog):
+        return {m.user for m in readable_group_memberships(blog)}
+
+    def test_group_access(self):
+        blog = self.create_blog([ACCESS_TYPE.group.format(self.group.id)])
+
+        self.assertEqual(self.readable_by(blog), {self.owner, self.member, self.subgroup_member, self.admin})
+
+    def test_subgroup_access(self):
+        blog = self.create_blog([ACCESS_TYPE.subgroup.format(self.subgroup.access_id),
+                                 ACCESS_TYPE.user.format(self.owner.id)])
+
+        self.assertEqual(self.readable_by(blog), {self.owner, self.subgroup_member, self.admin})
+
+    def test_matches_can_read(self):
+        for read_access in [[ACCESS_TYPE.public],
+                            [ACCESS_TYPE.user.format(self.member.id)],
+                            [ACCESS_TYPE.subgroup.format(self.subgroup.access_id)]]:
+            blog = self.create_blog(read_access)
+            expected = {m.user for m in self.group.members.filter(type__in=['admin', 'owner', 'member'])
+                        if blog.can_read(m.user)}
+
+            self.assertEqual(self.readable_by(blog), expected)
+
+    def test_notifications_created(self):
+        blog = self.create_blog([ACCESS_TYPE.subgroup.format(self.subgroup.access_id)])
+
+        create_notification(connection.schema_name, 'created', 'blog.blog', blog.id, self.owner.id)
+
+        self.assertEqual({n.recipient for n in Notification.objects.filter(verb='created')},
+                         {self.subgroup_member, self.admin})
+
+    def test_query_count_does_not_grow_with_group(self):
+        def fan_out():
+            blog = self.create_blog([ACCESS_TYPE.group.format(self.group.id)])
+            with CaptureQueriesContext(connection) as context:
+                create_notification(connection.schema_name, 'created', 'blog.blog', blog.id, self.owner.id)
+            return len(context.captured_queries)
+
+        small_group = fan_out()
+        self.add_members(50)
+        large_group = fan_out()
+
+        self.assertEqual(small_group, large_group)
+        self.assertEqual(Notification.objects.filter(verb='created').count(), 3 + 53)
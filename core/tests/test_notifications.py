@@ -282,7 +282,7 @@ class DirectNotificationsTestCase(PleioTenantTestCase):
 
     #test direct mail outside groups
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_comment_send(self, schedule_notification_mail):
         self.user2.profile.is_comment_notification_direct_mail_enabled = True
         self.user2.profile.save()
@@ -290,13 +290,13 @@ class DirectNotificationsTestCase(PleioTenantTestCase):
         schedule_notification_mail.assert_called_once()
 
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_comment_not_send(self, schedule_notification_mail):
         create_notification.s(connection.schema_name, 'commented', 'blog.blog', self.blog2.id, self.user1.id).apply()
         schedule_notification_mail.assert_not_called()
 
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     @mock.patch('user.models.UserManager.get_unmentioned_users')
     def test_notification_direct_mail_mention_send(self, mocked_get_unmentioned_users, mocked_schedule_notification_mail):
         mocked_get_unmentioned_users.return_value = [self.user2]
@@ -306,7 +306,7 @@ class DirectNotificationsTestCase(PleioTenantTestCase):
         mocked_schedule_notification_mail.assert_called_once()
 
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_mention_not_send(self, schedule_notification_mail):
         create_notification.s(connection.schema_name, 'mentioned', 'core.comment', self.comment2.id, self.user1.id).apply()
         schedule_notification_mail.assert_not_called()
@@ -315,7 +315,7 @@ class DirectNotificationsTestCase(PleioTenantTestCase):
 
     # test with general comment notifications disabled
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_comment_notifications_disabled_not_send(self, schedule_notification_mail):
         self.user2.profile.is_comment_notifications_enabled = False
         self.user2.profile.is_comment_notification_direct_mail_enabled = True
@@ -325,7 +325,7 @@ class DirectNotificationsTestCase(PleioTenantTestCase):
     
     # test with general mention notifications disabled
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_mention_notifications_disabled_not_send(self, schedule_notification_mail):
         self.user2.profile.is_mention_notifications_enabled = False
         self.user2.profile.is_mention_notification_direct_mail_enabled = True
@@ -335,21 +335,21 @@ class DirectNotificationsTestCase(PleioTenantTestCase):
 
     #test direct mail in groups
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_comment_in_group_send(self, schedule_notification_mail):
         self.group.set_member_is_notification_direct_mail_enabled(self.user2, True)
         create_notification.s(connection.schema_name, 'commented', 'blog.blog', self.blog1.id, self.user1.id).apply()
         schedule_notification_mail.assert_called_once()
 
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_comment_in_group_not_send(self, schedule_notification_mail):
         self.group.set_member_is_notification_direct_mail_enabled(self.user2, False)
         create_notification.s(connection.schema_name, 'commented', 'blog.blog', self.blog1.id, self.user1.id).apply()
         schedule_notification_mail.assert_not_called()
 
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     @mock.patch('user.models.UserManager.get_unmentioned_users')
     def test_notification_direct_mail_mention_in_group_send(self, mocked_get_unmentioned_users, schedule_notification_mail):
         mocked_get_unmentioned_users.return_value = [self.user2]
@@ -358,7 +358,7 @@ class DirectNotificationsTestCase(PleioTenantTestCase):
         schedule_notification_mail.assert_called_once()
 
     @override_config(PUSH_NOTIFICATIONS_ENABLED=True)
-    @mock.patch('core.mail_builders.notifications.schedule_notification_mail')
+    @mock.patch('core.mail_builders.notifications.schedule_notification_mails')
     def test_notification_direct_mail_mention_in_group_not_send(self, schedule_notification_mail):
         self.group.set_member_is_notification_direct_mail_enabled(self.user2, False)
         create_notification.s(connection.schema_name, 'mentioned', 'core.comment', self.comment1.id, self.user1.id).apply()
@@ -1,3 +1,4 @@
+from core.constances import ACCESS_TYPE
 from core.models import Group, GroupProfileFieldSetting, ProfileField, UserProfile, UserProfileField
 from core.tests.helpers import ElasticsearchTestCase
 from user.factories import UserFactory
@@ -194,3 +195,51 @@ class FilterUsersTestCase(ElasticsearchTestCase):
         self.assertEqual(data['members']['edges'][0]['role'], 'owner')
         self.assertEqual(data['members']['edges'][1]['role'], 'admin')
         self.assertEqual(len(data['members']['edges']), 2)
+
+    def test_value_list_follows_value(self):
+        self.user_profile_field1.value = 'select_value_1,select_value_3'
+        self.user_profile_field1.save()
+        self.user_profile_field1.refresh_from_db()
+
+        self.assertEqual(self.user_profile_field1.value_list, ['select_value_1', 'select_value_3'])
+
+    def test_query_should_find_one_of_multiple_values(self):
+        self.user_profile_field1.value = 'select_value_1,select_value_3'
+        self.user_profile_field1.save()
+
+        variables = {
+            "groupGuid": str(self.group.guid),
+            "filters": [{
+                "name": self.profile_field.key,
+                "values": ["select_value_3", "select_value_2"]
+            }]
+        }
+        data = self.graphql_sync_data(self.query, variables, self.owner)
+
+        self.assertEqual(data['members']['total'], 2)
+        self.assertEqual({e['user']['guid'] for e in data['members']['edges']}, {self.member1.guid, self.member2.guid})
+
+    def test_query_should_not_match_part_of_a_value(self):
+        variables = {
+            "groupGuid": str(self.group.guid),
+            "filters": [{
+                "name": self.profile_field.key,
+                "values": ["select_value"]
+            }]
+        }
+        data = self.graphql_sync_data(self.query, variables, self.owner)
+
+        self.assertEqual(data['members']['total'], 0)
+
+    def test_full_text_query_should_find_profile_field_value(self):
+        self.user_profile_field2.read_access = [ACCESS_TYPE.logged_in]
+        self.user_profile_field2.save()
+
+        variables = {
+            "groupGuid": str(self.group.guid),
+            "query": "value_2"
+        }
+        data = self.graphql_sync_data(self.query, variables, self.owner)
+
+        self.assertEqual(data['members']['total'], 1)
+        self.assertEqual(data['members']['edges'][0]['user']['guid'], self.member2.guid)
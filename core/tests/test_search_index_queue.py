@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.factories import BlogFactory
+from core.elasticsearch import flush_index_queue, index_queue_stats, queue_index_update
+from core.models import SearchIndexQueueItem
+from core.tests.helpers import ElasticsearchTestCase, PleioTenantTestCase
+from user.factories import UserFactory
+
+
+class TestSearchIndexQueueTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = UserFactory()
+        self.blog = BlogFactory(owner=self.owner)
+
+    @mock.patch('core.elasticsearch.schedule_index_queue_flush')
+    def test_updates_are_coalesced(self, schedule_flush):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_index_update(self.blog)
+            queue_index_update(self.blog)
+            queue_index_update(self.owner.profile)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_index_update(self.blog)
+
+        self.assertEqual({(i.model, i.object_id) for i in SearchIndexQueueItem.objects.all()},
+                         {('blog.Blog', str(self.blog.pk)),
+                          ('core.UserProfile', str(self.owner.profile.pk))})
+        schedule_flush.assert_called_with(self.tenant.schema_name)
+
+    @mock.patch('core.elasticsearch.schedule_index_queue_flush')
+    def test_rolled_back_updates_are_not_queued(self, schedule_flush):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    queue_index_update(self.blog)
+                    raise ValueError()
+            queue_index_update(self.owner.profile)
+
+        self.assertEqual({(i.model, i.object_id) for i in SearchIndexQueueItem.objects.all()},
+                         {('core.UserProfile', str(self.owner.profile.pk))})
+
+    @mock.patch('core.elasticsearch.schedule_index_queue_flush')
+    def test_models_without_document_are_ignored(self, schedule_flush):
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_index_update(mock.MagicMock())
+
+        self.assertFalse(SearchIndexQueueItem.objects.exists())
+        self.assertFalse(schedule_flush.called)
+
+    @mock.patch('core.elasticsearch.DEDConfig.autosync_enabled')
+    @mock.patch('core.elasticsearch.schedule_index_queue_flush')
+    def test_save_is_queued_instead_of_indexed(self, schedule_flush, autosync_enabled):
+        autosync_enabled.return_value = True
+
+        with mock.patch('django_elasticsearch_dsl.registries.registry.update') as registry_update:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.blog.title = "Updated"
+                self.blog.save()
+
+        self.assertFalse(registry_update.called)
+        self.assertTrue(SearchIndexQueueItem.objects.filter(model='blog.Blog',
+                                                            object_id=str(self.blog.pk)).exists())
+
+
+class TestSearchIndexQueueFlushTestCase(ElasticsearchTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.owner = UserFactory()
+        self.blog = BlogFactory(owner=self.owner, title="Queued blog")
+
+    @override_settings(ENV='test')
+    def test_flush(self):
+        SearchIndexQueueItem.objects.enqueue([('blog.Blog', self.blog.pk),
+                                              ('core.UserProfile', self.owner.profile.pk)])
+        SearchIndexQueueItem.objects.update(created_at=timezone.now() - timezone.timedelta(seconds=5))
+
+        stats = flush_index_queue()
+
+        self.assertEqual(stats['batch_size'], 2)
+        self.assertEqual(stats['documents'], 2)
+        self.assertGreaterEqual(stats['latency_max'], 5)
+        self.assertFalse(SearchIndexQueueItem.objects.exists())
+        self.assertEqual(index_queue_stats()['pending'], 0)
+        self.assertEqual(index_queue_stats()['last_flush'], stats)
+
+    def test_flush_empty_queue(self):
+        self.assertIsNone(flush_index_queue())
+
+    @mock.patch('core.utils.elasticsearch.delete_document_if_found')
+    def test_flush_deleted_object(self, delete_document):
+        SearchIndexQueueItem.objects.enqueue([('blog.Blog', self.blog.pk)])
+        self.blog.delete()
+
+        flush_index_queue()
+
+        delete_document.assert_called_once_with(str(self.blog.pk))
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from elasticsearch_dsl import Search
+
+from blog.factories import BlogFactory
+from core.constances import ACCESS_TYPE
+from core.elasticsearch import invalidate_search_cache
+from core.resolvers.query_search import load_search_hits
+from core.tests.helpers import ElasticsearchTestCase
+from news.factories import NewsFactory
+from user.factories import EditorFactory, UserFactory
+
+
+class TestSearchResultCacheTestCase(ElasticsearchTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.user = EditorFactory()
+        self.visitor = UserFactory()
+        self.blog = BlogFactory(owner=self.user, title="Cached blog", read_access=[ACCESS_TYPE.public])
+        self.news = NewsFactory(owner=self.user, title="Cached news", read_access=[ACCESS_TYPE.public])
+        self.private_blog = BlogFactory(owner=self.user, title="Cached private blog",
+                                        read_access=[ACCESS_TYPE.user.format(self.user.id)])
+        self.populate_index()
+
+        self.query = """
+            query Search($q: String!, $subtype: String) {
+                search(q: $q, subtype: $subtype) {
+                    total
+                    totals {
+                        subtype
+                        total
+                    }
+                    edges {
+                        guid
+                    }
+                }
+            }
+        """
+        self.execute = mock.patch.object(Search, 'execute', autospec=True, side_effect=Search.execute).start()
+        self.graphql_client.force_login(self.visitor)
+
+    def tearDown(self):
+        mock.patch.stopall()
+        super().tearDown()
+
+    def search(self, **variables):
+        return self.graphql_client.post(self.query, {"q": "Cached", **variables})['data']['search']
+
+    def test_subtype_in_one_request(self):
+        result = self.search(subtype='blog')
+
+        self.assertEqual(self.execute.call_count, 1)
+        self.assertEqual([e['guid'] for e in result['edges']], [self.blog.guid])
+        self.assertEqual(sorted((t['subtype'], t['total']) for t in result['totals']),
+                         [('blog', 1), ('news', 1)])
+        self.assertEqual(result['total'], 2)
+
+    def test_result_is_cached(self):
+        first = self.search()
+        second = self.search(q="  Cached ")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.execute.call_count, 1)
+
+    def test_cache_respects_access(self):
+        self.search()
+        self.graphql_client.force_login(self.user)
+        result = self.search()
+
+        self.assertEqual(self.execute.call_count, 2)
+        self.assertIn(self.private_blog.guid, [e['guid'] for e in result['edges']])
+
+    def test_index_update_invalidates(self):
+        self.search()
+        invalidate_search_cache()
+        self.search()
+
+        self.assertEqual(self.execute.call_count, 2)
+
+    def test_load_only_found_types(self):
+        with CaptureQueriesContext(connection) as context:
+            objects = load_search_hits([(str(self.news.id), 'news'), (str(self.blog.id), 'blog')])
+
+        self.assertEqual(objects, [self.news, self.blog])
+        self.assertEqual(len(context.captured_queries), 1)
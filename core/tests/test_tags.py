@@ -1,9 +1,11 @@
 from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from mixer.backend.django import mixer
 
 from core.constances import USER_ROLES
 from core.models import Entity
-from core.models.tags import Tag, TagSynonym, EntityTag
+from core.models.tags import Tag, TagSynonym, EntityTag, prefetch_tags
 from core.tests.helpers import PleioTenantTestCase
 from tenants.helpers import FastTenantTestCase
 from user.models import User
@@ -88,6 +90,47 @@ class TestTagsTestCase(FastTenantTestCase):
         self.entity.save()
         self.assertEqual(self.entity.tags, ['Tag2.1'])
 
+    def test_set_tags_query_count_does_not_grow(self):
+        with CaptureQueriesContext(connection) as few_tags:
+            self.entity.tags = ["Tag1", "New1"]
+            self.entity.save()
+
+        with CaptureQueriesContext(connection) as many_tags:
+            self.entity.tags = ["Tag2.1", "New2", "New3", "New4", "New5", "New6"]
+            self.entity.save()
+
+        self.assertLessEqual(len(many_tags.captured_queries), len(few_tags.captured_queries) + 1)
+        self.assertEqual(self.entity.tags, ["Tag2.1", "New2", "New3", "New4", "New5", "New6"])
+        # pylint: disable=protected-access
+        self.assertEqual(self.entity._tag_summary, ["tag2", "new2", "new3", "new4", "new5", "new6"])
+
+    def test_translate_tags_uses_synonym_map(self):
+        self.assertEqual([*Tag.translate_tags(["Tag2.1", "Other"])], ["tag2", "other"])
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual([*Tag.translate_tags(["TAG2.2"])], ["tag2"])
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_synonym_change_updates_map(self):
+        self.assertEqual([*Tag.translate_tags(["tag1.1"])], ["tag1.1"])
+
+        TagSynonym.objects.create(tag=Tag.objects.get(label='tag1'), label='tag1.1')
+        self.assertEqual([*Tag.translate_tags(["tag1.1"])], ["tag1"])
+
+        TagSynonym.objects.filter(label='tag1.1').delete()
+        self.assertEqual([*Tag.translate_tags(["tag1.1"])], ["tag1.1"])
+
+    def test_prefetch_tags(self):
+        other = Entity.objects.create(owner=self.owner, is_archived=False)
+        other.tags = ["Tag3"]
+        other.save()
+        entities = [Entity.objects.get(id=self.entity.id), Entity.objects.get(id=other.id)]
+
+        prefetch_tags(entities)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual([e.tags for e in entities], [["Tag1", "Tag2"], ["Tag3"]])
+        self.assertEqual(len(context.captured_queries), 0)
+
 
 class TestTagAdministrationTestCase(PleioTenantTestCase):
     def setUp(self):
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from control.models import TenantJobRun
+from core.tasks.cronjobs import (acquire_tenant_job_slot, release_tenant_job_slot, schedule_tenant_job, run_tenant_job,
+                                 tenant_job_offset, TENANT_JOB_SPREAD)
+from core.tests.helpers import PleioTenantTestCase
+from tenants.models import Client
+
+
+class TestTenantJobSchedulerTestCase(PleioTenantTestCase):
+    FLUSH = 'core.tasks.cronjobs.flush_view_counts'
+    OVERVIEW = 'core.tasks.cronjobs.send_overview'
+    BOUNCE = 'core.tasks.cronjobs.ban_users_that_bounce'
+
+    def setUp(self):
+        super().setUp()
+        self.apply_async = mock.patch("core.tasks.cronjobs.run_tenant_job.apply_async").start()
+        self.client_record = Client.objects.get(schema_name=self.tenant.schema_name)
+
+    def tearDown(self):
+        mock.patch.stopall()
+        cache.clear()
+        super().tearDown()
+
+    def scheduled_schemas(self):
+        return [c.args[0][1] for c in self.apply_async.call_args_list]
+
+    def test_offset_is_deterministic_and_within_spread(self):
+        offset = tenant_job_offset(self.tenant.schema_name, 'daily', TENANT_JOB_SPREAD['daily'])
+
+        self.assertEqual(offset, tenant_job_offset(self.tenant.schema_name, 'daily', TENANT_JOB_SPREAD['daily']))
+        self.assertTrue(0 <= offset < TENANT_JOB_SPREAD['daily'])
+        self.assertEqual(tenant_job_offset(self.tenant.schema_name, 'daily', 0), 0)
+
+    def test_schedule_with_offset(self):
+        schedule_tenant_job('daily', [(self.FLUSH, [])])
+
+        self.assertIn(self.tenant.schema_name, self.scheduled_schemas())
+        self.assertNotIn('public', self.scheduled_schemas())
+        for call in self.apply_async.call_args_list:
+            self.assertEqual(call.kwargs['countdown'],
+                             tenant_job_offset(call.args[0][1], 'daily', TENANT_JOB_SPREAD['daily']))
+
+    def test_skip_inactive_clients(self):
+        Client.objects.filter(id=self.client_record.id).update(is_active=False)
+
+        schedule_tenant_job('daily', [(self.FLUSH, [])])
+
+        self.assertNotIn(self.tenant.schema_name, self.scheduled_schemas())
+
+    def test_skip_idle_tasks(self):
+        TenantJobRun.objects.create(client=self.client_record, job='daily', task=self.BOUNCE, rows=0)
+
+        schedule_tenant_job('daily', [(self.BOUNCE, []), (self.OVERVIEW, ['daily'])])
+
+        args, = [c.args[0] for c in self.apply_async.call_args_list if c.args[0][1] == self.tenant.schema_name]
+        self.assertEqual(args[2], [(self.OVERVIEW, ['daily'])])
+
+    def test_busy_tasks_are_not_skipped(self):
+        TenantJobRun.objects.create(client=self.client_record, job='daily', task=self.BOUNCE, rows=0)
+        TenantJobRun.objects.create(client=self.client_record, job='daily', task=self.BOUNCE, rows=3)
+
+        schedule_tenant_job('daily', [(self.BOUNCE, [])])
+
+        self.assertIn(self.tenant.schema_name, self.scheduled_schemas())
+
+    def test_view_counts_are_always_flushed(self):
+        TenantJobRun.objects.create(client=self.client_record, job='hourly', task=self.FLUSH, rows=0)
+
+        schedule_tenant_job('hourly', [(self.FLUSH, [])])
+
+        self.assertIn(self.tenant.schema_name, self.scheduled_schemas())
+
+    def test_run_records_timing(self):
+        run_tenant_job('hourly', self.tenant.schema_name, [(self.FLUSH, [])])
+
+        run = TenantJobRun.objects.get(client=self.client_record)
+        self.assertEqual(run.job, 'hourly')
+        self.assertEqual(run.task, self.FLUSH)
+        self.assertEqual(run.rows, 0)
+        self.assertTrue(run.success)
+        self.assertLessEqual(run.started_at, timezone.now())
+
+    @mock.patch("core.tasks.cronjobs.flush_view_counts.run")
+    def test_run_records_failure(self, flush_view_counts):
+        flush_view_counts.side_effect = Exception("failed")
+
+        run_tenant_job('hourly', self.tenant.schema_name, [(self.FLUSH, [])])
+
+        run = TenantJobRun.objects.get(client=self.client_record)
+        self.assertFalse(run.success)
+        self.assertEqual(run.error, "Exception: failed")
+
+    def test_wait_for_a_free_slot(self):
+        self.override_setting(CRON_MAX_CONCURRENT_TENANTS=0)
+
+        with mock.patch("core.tasks.cronjobs.run_tenant_job.retry") as retry:
+            retry.return_value = Exception("retry")
+            with self.assertRaises(Exception):
+                run_tenant_job('hourly', self.tenant.schema_name, [(self.FLUSH, [])])
+
+        self.assertTrue(retry.called)
+        self.assertFalse(TenantJobRun.objects.exists())
+
+    def test_slot_is_released_after_run(self):
+        self.override_setting(CRON_MAX_CONCURRENT_TENANTS=1)
+
+        run_tenant_job('hourly', self.tenant.schema_name, [(self.FLUSH, [])])
+
+        self.assertIsNotNone(acquire_tenant_job_slot('hourly', self.tenant.schema_name))
+
+    def test_expired_slot_of_another_tenant_is_not_released(self):
+        self.override_setting(CRON_MAX_CONCURRENT_TENANTS=1)
+        expired = acquire_tenant_job_slot('hourly', self.tenant.schema_name)
+        cache.delete(expired[0])
+        taken = acquire_tenant_job_slot('hourly', 'other_tenant')
+
+        release_tenant_job_slot(expired)
+
+        self.assertEqual(cache.get(taken[0]), taken[1])
+        self.assertIsNone(acquire_tenant_job_slot('hourly', self.tenant.schema_name))
@@ -3,7 +3,9 @@ from unittest import mock
 import os.path
 
 from core.tests.helpers import PleioTenantTestCase
-from core.utils.convert import is_tiptap, tiptap_to_text, tiptap_to_html
+from django.core.cache import cache
+
+from core.utils.convert import is_tiptap, tiptap_to_text, tiptap_to_html, render_rich_text, RICH_TEXT_LARGE_LENGTH
 from core.utils.export.avatar import fetch_avatar_image, CouldNotLoadPictureError
 from user.factories import UserFactory
 
@@ -91,6 +93,22 @@ class TestUtilsTipTapIOTestCase(PleioTenantTestCase):
 
         self.assertIn("user X", result)
 
+    def test_mention_without_label(self):
+        tiptap = json.dumps({
+            'type': 'doc',
+            'content': [{
+                'type': 'paragraph',
+                'content': [
+                    {'type': 'text', 'text': 'Hello '},
+                    {'type': 'mention', 'attrs': {'id': '1234-1234-1234-12', 'label': None}},
+                    {'type': 'mention', 'attrs': {'id': '1234-1234-1234-13'}},
+                ]
+            }],
+        })
+
+        self.assertIn("Hello @@", tiptap_to_text(tiptap))
+        self.assertIn("Hello", tiptap_to_html(tiptap))
+
     def test_blockquote_to_html(self):
         spec = json.dumps({
             'type': 'doc',
@@ -325,6 +343,40 @@ class TestUtilsTipTapIOTestCase(PleioTenantTestCase):
                          '<tr><td><ol><li>Ordered list item</li></ol></td></tr>'
                          '</table>', tiptap_to_html(spec))
 
+    def test_render_rich_text(self):
+        result = render_rich_text(json.dumps(self.tiptap_json))
+
+        self.assertEqual(result.html, "<p>Dit is een <strong>paragraph</strong></p>")
+        self.assertIn("Dit is een paragraph", result.text)
+        self.assertEqual(result.excerpt, result.text)
+
+    def test_render_rich_text_is_remembered(self):
+        document = json.dumps(self.tiptap_json)
+        render_rich_text(document)
+
+        with mock.patch('core.utils.convert._render') as render:
+            tiptap_to_html(document)
+            tiptap_to_text(document)
+
+        self.assertFalse(render.called)
+
+    def test_render_large_rich_text_is_shared(self):
+        paragraph = self.tiptap_json['content'][0]
+        document = json.dumps({'type': 'doc',
+                               'content': [paragraph] * (RICH_TEXT_LARGE_LENGTH // len(json.dumps(paragraph)) + 1)})
+
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            render_rich_text(document)
+
+        key, value, _ = cache_set.call_args.args
+        self.assertTrue(key.startswith('rich_text_'))
+        self.assertEqual(value[0].count("<p>"), len(json.loads(document)['content']))
+
+    def test_render_rich_text_without_string(self):
+        result = render_rich_text(None)
+
+        self.assertEqual(result.text, None)
+
 
 class TestFetchAvatarTestCase(PleioTenantTestCase):
     PICTURE_URL = 'https://picture.jpg'
@@ -1,3 +1,11 @@
+import threading
+
+from django.apps import apps
+from django.db import connection
+
+from core.constances import ACCESS_TYPE
+
+
 def get_read_access_weight(instance):
     return get_access_weight(instance, 'read_access')
 
@@ -32,3 +40,91 @@ def test_read_access(instance, access_property, any_match):
         if any_match(access):
             return True
     return False
+
+
+_scope = threading.local()
+
+FULL_MEMBER_TYPES = ('admin', 'owner', 'member')
+GROUP_ADMIN_TYPES = ('admin', 'owner')
+
+
+class AccessContext:
+    """
+    Group memberships and subgroups of one user, read with two queries
+    """
+
+    def __init__(self, user):
+        GroupMembership = apps.get_model('core', 'GroupMembership')
+        Subgroup = apps.get_model('core', 'Subgroup')
+
+        self.user_id = user.id
+        self.group_roles = dict(GroupMembership.objects.filter(user_id=user.id).values_list('group_id', 'type'))
+        self.subgroup_ids = set(Subgroup.objects.filter(members__id=user.id).values_list('id', flat=True))
+
+    def role(self, group_id):
+        return self.group_roles.get(group_id)
+
+    def is_member(self, group_id):
+        return group_id in self.group_roles
+
+    def is_full_member(self, group_id):
+        return self.role(group_id) in FULL_MEMBER_TYPES
+
+    def is_group_admin(self, group_id):
+        return self.role(group_id) in GROUP_ADMIN_TYPES
+
+    def acl(self):
+        Subgroup = apps.get_model('core', 'Subgroup')
+
+        acl = {ACCESS_TYPE.group.format(group_id) for group_id, role in self.group_roles.items()
+               if role in FULL_MEMBER_TYPES}
+        acl.update(ACCESS_TYPE.subgroup.format(Subgroup(id=subgroup_id).access_id)
+                   for subgroup_id in self.subgroup_ids)
+        return acl
+
+
+def get_acls(users):
+    """
+    The acl of each of the given users, like get_acl(user), with two queries for all users together
+    """
+    GroupMembership = apps.get_model('core', 'GroupMembership')
+    Subgroup = apps.get_model('core', 'Subgroup')
+
+    acls = {user.id: {ACCESS_TYPE.public, ACCESS_TYPE.logged_in, ACCESS_TYPE.user.format(user.id)}
+            for user in users}
+    memberships = GroupMembership.objects.filter(user_id__in=acls, type__in=FULL_MEMBER_TYPES)
+    for user_id, group_id in memberships.values_list('user_id', 'group_id'):
+        acls[user_id].add(ACCESS_TYPE.group.format(group_id))
+    subgroups = Subgroup.members.through.objects.filter(user_id__in=acls)
+    for user_id, subgroup_id in subgroups.values_list('user_id', 'subgroup_id'):
+        acls[user_id].add(ACCESS_TYPE.subgroup.format(Subgroup(id=subgroup_id).access_id))
+    return acls
+
+
+def begin_access_scope():
+    _scope.contexts = {}
+
+
+def end_access_scope():
+    _scope.contexts = None
+
+
+def get_access_context(user):
+    """
+    The access context of the user for the current request.
+    Returns None outside a request, callers then query the database directly.
+    """
+    contexts = getattr(_scope, 'contexts', None)
+    if contexts is None or not user.is_authenticated:
+        return None
+
+    key = (connection.schema_name, user.id)
+    if key not in contexts:
+        contexts[key] = AccessContext(user)
+    return contexts[key]
+
+
+def invalidate_access_context(user_id):
+    contexts = getattr(_scope, 'contexts', None)
+    if contexts:
+        contexts.pop((connection.schema_name, user_id), None)
@@ -1,12 +1,15 @@
 import bleach
+import hashlib
 import json
 import logging
+from collections import namedtuple
+from functools import lru_cache
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.html import strip_tags
 from django.utils.safestring import mark_safe
 
-from core.lib import is_valid_json
 from core.utils import tiptap_schema
 from prosemirror.model import Node
 from prosemirror.model import DOMSerializer
@@ -14,68 +17,126 @@ from django.utils.text import Truncator
 
 logger = logging.getLogger(__name__)
 
+EXCERPT_WORDS = 26
+
+# Rendered documents are remembered in the process, the number of large documents is kept small.
+# Large documents are shared between processes as well.
+RICH_TEXT_LRU_SIZE = 1024
+RICH_TEXT_LARGE_LRU_SIZE = 64
+RICH_TEXT_LARGE_LENGTH = 4096
+RICH_TEXT_SHARED_TIMEOUT = 60 * 60 * 24
+
+RichText = namedtuple('RichText', ['html', 'text', 'excerpt'])
+
+
+def _parse_tiptap(json_string):
+    try:
+        data = json.loads(json_string)
+    except Exception:
+        return None
+
+    if isinstance(data, dict) and data.get("type", None) == "doc":
+        return data
+    return None
+
 
 def is_tiptap(json_string):
-    if not is_valid_json(json_string):
-        return False
+    return _parse_tiptap(json_string) is not None
 
-    data = json.loads(json_string)
 
-    return isinstance(data, dict) and data.get("type", None) == "doc"
+@lru_cache(maxsize=None)
+def _dom_serializer():
+    return DOMSerializer.from_schema(tiptap_schema)
 
 
-def tiptap_to_html(maybe_json):
-    """
-    Convert json to html.
-    The output of this method must be safe html.
-    """
+def _tiptap_text(doc):
+    parts = []
 
-    if not is_tiptap(maybe_json):
-        # The input may be unfiltered html.
-        return strip_tags(maybe_json)
+    def add_text(node):
+        node_type = node.get('type')
+        if node_type == 'text':
+            parts.append(node.get('text') or '')
+        elif node_type == 'hardBreak':
+            parts.append("\n")
+        elif node_type == 'mention':
+            parts.append('@' + ((node.get('attrs') or {}).get('label') or ''))
+        else:
+            for item in node.get('content', []):
+                add_text(item)
+            parts.append("\n")
+
+    for node in doc.get('content', []):
+        add_text(node)
+        parts.append("\n")
+
+    return "".join(parts)
 
-    doc = json.loads(maybe_json)
+
+def _render(rich):
+    doc = _parse_tiptap(rich)
+    if doc is None:
+        # The input may be unfiltered html.
+        return RichText(html=strip_tags(rich),
+                        text=rich,
+                        excerpt=Truncator(rich).words(EXCERPT_WORDS))
 
     try:
         doc_node = Node.from_json(tiptap_schema, doc)
-        html = DOMSerializer.from_schema(tiptap_schema).serialize_fragment(doc_node.content)
-        return str(html)
+        html = str(_dom_serializer().serialize_fragment(doc_node.content))
+    except Exception as e:
+        logger.error(e)
+        html = strip_tags(rich)
+
+    try:
+        text = _tiptap_text(doc)
     except Exception as e:
         logger.error(e)
-        return strip_tags(maybe_json)
+        text = strip_tags(html)
 
+    return RichText(html=html, text=text, excerpt=Truncator(text).words(EXCERPT_WORDS))
 
-def tiptap_to_text(json_string):
-    if not is_tiptap(json_string):
-        return json_string
-
-    doc = json.loads(json_string)
-
-    def get_text(node):
-        text = ""
-        if node['type'] == 'text':
-            text += node['text']
-        elif node['type'] == 'hardBreak':
-            text += "\n"
-        elif node['type'] == 'mention':
-            text += '@' + node['attrs']['label']
-        else:
-            for item in node.get('content', []):
-                text += get_text(item)
-            text += "\n"
-        return text
 
-    text = ""
+@lru_cache(maxsize=RICH_TEXT_LRU_SIZE)
+def _render_small(rich):
+    return _render(rich)
+
+
+@lru_cache(maxsize=RICH_TEXT_LARGE_LRU_SIZE)
+def _render_large(rich):
+    key = "rich_text_%s" % hashlib.sha1(rich.encode()).hexdigest()
+    result = cache.get(key)
+    if result is None:
+        result = _render(rich)
+        cache.set(key, tuple(result), RICH_TEXT_SHARED_TIMEOUT)
+    return RichText(*result)
 
-    for node in doc.get('content', []):
-        text += get_text(node)
-        text += "\n"
 
-    return text
+def render_rich_text(rich):
+    """
+    Html, plain text and excerpt of a rich text field, from one pass over the document.
+    Results are remembered by content, so rendering the same text again is free.
+    """
+    if not isinstance(rich, str):
+        return _render(rich)
+    if len(rich) < RICH_TEXT_LARGE_LENGTH:
+        return _render_small(rich)
+    return _render_large(rich)
+
+
+def tiptap_to_html(maybe_json):
+    """
+    Convert json to html.
+    The output of this method must be safe html.
+    """
+    return render_rich_text(maybe_json).html
+
+
+def tiptap_to_text(json_string):
+    return render_rich_text(json_string).text
 
 
 def truncate_rich_description(description):
-    return Truncator(tiptap_to_text(description)).words(26)
+    return render_rich_text(description).excerpt
 
 
 def filter_html_mail_input(insecure_html):
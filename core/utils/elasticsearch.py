@@ -18,7 +18,8 @@ def delete_document_if_found(uuid):
 class QueryBuilder():
 
     def __init__(self, q, user, date_from, date_to):
-        self.s = Search(index='_all').query(
+        # The aliases, not every index: during a rebuild the new versions exist next to them
+        self.s = Search(index=[index._name for index in registry.get_indices()]).query(  # pylint: disable=protected-access
             Q('simple_query_string', query=q, fields=[
                 'title^3',
                 'name^3',
@@ -56,6 +57,11 @@ class QueryBuilder():
         if subtypes:
             self.s = self.s.query('terms', type=subtypes)
 
+    def maybe_post_filter_subtype(self, subtype):
+        # Only the hits are filtered, the aggregation keeps counting all subtypes
+        if subtype:
+            self.s = self.s.post_filter('term', type=subtype)
+
     def maybe_filter_container(self, container_guid):
         # Filter on container_guid (group.guid)
         if container_guid:
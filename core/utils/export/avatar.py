@@ -1,58 +1,122 @@
 import csv
 import mimetypes
 import os
-import requests
 import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 
 from concierge.api import fetch_avatar
 from core.lib import get_tmp_file_path
 from user.models import User
 
+PROGRESS_INTERVAL = 100
+
 
 class CouldNotLoadPictureError(Exception):
     pass
 
 
-def build_avatar_export(user):
+def avatar_session():
+    """
+    One connection pool for all downloads. pool_block makes a thread wait for a
+    free connection, so no host gets more than AVATAR_EXPORT_CONNECTIONS_PER_HOST.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=settings.AVATAR_EXPORT_CONCURRENCY,
+                          pool_maxsize=settings.AVATAR_EXPORT_CONNECTIONS_PER_HOST,
+                          pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_avatars(users, session):
+    """
+    Yield (user, data, extension) in the order of `users`. Avatars are fetched by
+    a thread pool, with a limited number of downloads waiting to be consumed.
+    """
+    concurrency = settings.AVATAR_EXPORT_CONCURRENCY
+
+    def fetch(user):
+        try:
+            return fetch_avatar_image(user, session)
+        except CouldNotLoadPictureError:
+            return None, None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = deque()
+        for user in users:
+            pending.append((user, executor.submit(fetch, user)))
+            if len(pending) >= concurrency * 2:
+                user, future = pending.popleft()
+                yield (user, *future.result())
+        while pending:
+            user, future = pending.popleft()
+            yield (user, *future.result())
+
+
+@contextmanager
+def build_avatar_export(user, report_progress=None):
+    """
+    Write a zip with the avatars of all active users and a summary to disk and
+    yield it opened for reading. The files are removed afterwards.
+
+    report_progress(total, processed, failed) is called every PROGRESS_INTERVAL users.
+    """
     zip_path = get_tmp_file_path(user, "avatar_export.zip")
     csv_path = get_tmp_file_path(user, "avatar_export.csv")
 
     try:
-        zip_file = zipfile.ZipFile(zip_path, mode='w', compression=zipfile.ZIP_DEFLATED)
+        users = User.objects.filter(is_active=True)
+        total = users.count()
+        processed = failed = 0
 
-        with open(csv_path, 'w') as fh:
+        with zipfile.ZipFile(zip_path, mode='w', compression=zipfile.ZIP_DEFLATED) as zip_file, \
+                open(csv_path, 'w') as fh, \
+                avatar_session() as session:
             writer = csv.writer(fh, delimiter=';', quotechar='"')
             writer.writerow(['name', 'email', 'avatar'])
-            for record in User.objects.filter(is_active=True):
-                try:
-                    data, extension = fetch_avatar_image(record)
+            for record, data, extension in fetch_avatars(users.iterator(), session):
+                picture = None
+                if data is not None:
                     picture = f"{record.guid}{extension}"
-                    zip_file.writestr(picture, data)
-                except Exception:
-                    picture = None
+                    # Images are compressed already
+                    zip_file.writestr(picture, data, compress_type=zipfile.ZIP_STORED)
+                else:
+                    failed += 1
 
                 writer.writerow([record.name, record.email, picture])
 
-        with open(csv_path, 'r') as fh:
-            zip_file.writestr("summary.csv", fh.read())
+                processed += 1
+                if report_progress and processed % PROGRESS_INTERVAL == 0:
+                    report_progress(total, processed, failed)
+
+            fh.flush()
+            zip_file.write(csv_path, "summary.csv")
 
-        zip_file.close()
+        if report_progress:
+            report_progress(total, processed, failed)
 
         with open(zip_path, 'rb') as fh:
-            return fh.read()
+            yield fh
     finally:
         os.unlink(csv_path)
         os.unlink(zip_path)
 
 
-def fetch_avatar_image(user: User):
+def fetch_avatar_image(user: User, session=requests):
     try:
-        data = fetch_avatar(user) or {}
+        data = fetch_avatar(user, session=session) or {}
         url = data.get('originalAvatarUrl')
 
         assert url, "No url found"
 
-        response = requests.get(url, timeout=3600)
+        response = session.get(url, timeout=settings.AVATAR_EXPORT_TIMEOUT)
         assert response.ok, response.reason
 
         return (response.content,
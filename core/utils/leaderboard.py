@@ -0,0 +1,60 @@
+"""
+Trending tags and top users, calculated from the vote counters of the entities a user can read.
+
+Results are cached per tenant and set of access rights for LEADERBOARD_CACHE_TIMEOUT seconds.
+"""
+import hashlib
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+
+from core.lib import get_acl, tenant_schema
+from core.models import EntityVoteCount
+from user.models import User
+
+LEADERBOARD_VERSION_KEY = '__LEADERBOARD_VERSION__'
+
+
+def invalidate_leaderboards():
+    cache.set("%s%s" % (tenant_schema(), LEADERBOARD_VERSION_KEY), uuid.uuid4().hex, None)
+
+
+def _cached(name, user, build):
+    version = cache.get("%s%s" % (tenant_schema(), LEADERBOARD_VERSION_KEY)) or ''
+    acl = hashlib.md5(','.join(sorted(get_acl(user))).encode()).hexdigest()
+    key = "%sleaderboard_%s_%s_%s" % (tenant_schema(), name, version, acl)
+
+    result = cache.get(key)
+    if result is None:
+        result = build()
+        cache.set(key, result, settings.LEADERBOARD_CACHE_TIMEOUT)
+    return result
+
+
+def trending_tags(user, limit=3):
+    def build():
+        likes = Counter()
+        for tags, votes in EntityVoteCount.objects.visible(user).values_list('entity___tag_summary', 'votes'):
+            for tag in set(tags or []):
+                likes[tag] += votes
+        return [{'tag': tag, 'likes': count}
+                for tag, count in sorted(likes.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+
+    return _cached('trending', user, build)
+
+
+def top_users(user, limit=3):
+    def build():
+        return list(EntityVoteCount.objects.visible(user)
+                    .order_by()
+                    .values('entity__owner_id')
+                    .annotate(likes=Sum('votes'))
+                    .order_by('-likes', 'entity__owner_id')
+                    .values_list('entity__owner_id', 'likes')[:limit])
+
+    top = _cached('top', user, build)
+    users = User.objects.in_bulk([user_id for user_id, _ in top])
+    return [{'user': users[user_id], 'likes': likes} for user_id, likes in top if user_id in users]
@@ -0,0 +1,229 @@
+"""
+Import users from a csv file in batches.
+
+Each batch looks up existing users and profile fields in a few queries and
+writes new and changed rows with bulk_create / bulk_update. Bulk writes send
+no save signals, so the imported users are queued for the search index once
+per batch instead of once per saved row. What User.save() does for new users,
+joining the auto membership groups and the welcome notification, is done for
+the whole batch after the insert.
+"""
+import csv
+import logging
+import uuid
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from notifications.signals import notify
+
+from core.elasticsearch import schedule_index_queue_flush
+from core.lib import access_id_to_acl, tenant_schema
+from core.models import (Group, GroupMembership, ProfileField, SearchIndexQueueItem, UserImport, UserProfile,
+                         UserProfileField)
+from core.models.user import split_profile_field_value
+from core.utils.access import invalidate_access_context
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+USER_FIELDS = ['id', 'email', 'name']
+BATCH_SIZE = 500
+
+
+def parse_uuid(value):
+    try:
+        return str(uuid.UUID(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def read_batches(reader, size):
+    while True:
+        batch = list(islice(reader, size))
+        if not batch:
+            return
+        yield batch
+
+
+class UserCsvImporter:
+
+    def __init__(self, fields, user_import=None, batch_size=BATCH_SIZE):
+        self.fields = fields
+        self.user_import = user_import
+        self.batch_size = batch_size
+        self.profile_fields = {str(f.id): f for f in
+                               ProfileField.objects.filter(id__in=[f['userField'] for f in fields
+                                                                   if f['userField'] not in USER_FIELDS])}
+        self.stats = {
+            'created': 0,
+            'updated': 0,
+            'error': 0,
+            'processed': 0,
+        }
+
+    def run(self, csv_location):
+        with open(csv_location) as csvfile:
+            total = sum(1 for _ in csv.DictReader(csvfile, delimiter=';'))
+        self.report_progress(status='in_progress', total=total)
+
+        with open(csv_location) as csvfile:
+            reader = csv.DictReader(csvfile, delimiter=';')
+            for rows in read_batches(reader, self.batch_size):
+                with transaction.atomic():
+                    user_ids = self.import_batch([self.get_record(row) for row in rows])
+                    SearchIndexQueueItem.objects.enqueue([('user.User', user_id) for user_id in user_ids])
+
+                self.stats['processed'] += len(rows)
+                self.report_progress()
+                logger.info('Batch users imported: %s', self.stats)
+
+        schedule_index_queue_flush(tenant_schema())
+        return self.stats
+
+    def report_progress(self, **kwargs):
+        if self.user_import:
+            UserImport.objects.filter(id=self.user_import.id).update(**self.stats, **kwargs, updated_at=timezone.now())
+
+    def get_record(self, row):
+        return {field['userField']: {**field, 'value': row[field['csvColumn']]} for field in self.fields}
+
+    def import_batch(self, records):
+        """ Returns the ids of the users that were created or updated """
+        users = self.find_users(records)
+        self.create_users(records, users)
+
+        imported = [(record, users[n]) for n, record in enumerate(records) if users[n]]
+        profiles = self.get_profiles([user for _, user in imported])
+        self.save_profile_fields([(record, user, profiles[user.id]) for record, user in imported])
+
+        return {str(user.id) for _, user in imported}
+
+    @staticmethod
+    def find_users(records):
+        ids = [parse_uuid(r['id']['value']) for r in records if 'id' in r]
+        emails = [r['email']['value'] for r in records if 'email' in r]
+
+        by_id = {str(u.id): u for u in User.objects.filter(id__in=[i for i in ids if i])}
+        by_email = {u.email: u for u in User.objects.filter(email__in=emails)}
+
+        users = []
+        for record in records:
+            user = by_id.get(parse_uuid(record['id']['value'])) if 'id' in record else None
+            if not user and 'email' in record:
+                user = by_email.get(record['email']['value'])
+            users.append(user)
+        return users
+
+    def create_users(self, records, users):
+        new_users = {}
+        positions = {}
+        for n, record in enumerate(records):
+            if users[n]:
+                self.stats['updated'] += 1
+            elif 'name' in record and 'email' in record:
+                email = record['email']['value']
+                new_users.setdefault(email, User(email=email, name=record['name']['value']))
+                positions.setdefault(email, []).append(n)
+            else:
+                self.stats['error'] += 1
+
+        created = self.insert_users(list(new_users.values()))
+        for email, rows in positions.items():
+            if email not in created:
+                self.stats['error'] += len(rows)
+                continue
+            # more rows for the same new user update it
+            self.stats['created'] += 1
+            self.stats['updated'] += len(rows) - 1
+            for n in rows:
+                users[n] = new_users[email]
+
+    @classmethod
+    def insert_users(cls, users):
+        """ Returns the emails of the users that were created """
+        if not users:
+            return set()
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            cls.after_create(users)
+            return {user.email for user in users}
+        except IntegrityError:
+            pass
+
+        created = set()
+        for user in users:
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                created.add(user.email)
+            except Exception:
+                pass
+        return created
+
+    @staticmethod
+    def after_create(users):
+        """ What User.save() does for a new user, for a batch of users created with bulk_create """
+        groups = list(Group.objects.filter(is_auto_membership_enabled=True))
+        memberships = [GroupMembership(user=user,
+                                       group=group,
+                                       type='member',
+                                       is_notifications_enabled=group.auto_notification)
+                       for group in groups for user in users]
+        for membership in memberships:
+            membership.admin_weight = membership.get_admin_weight()
+        GroupMembership.objects.bulk_create(memberships, ignore_conflicts=True)
+
+        from core.mail_builders.group_welcome import schedule_group_welcome_mail
+        for user in users:
+            invalidate_access_context(user.id)
+            for group in groups:
+                if group.welcome_message:
+                    schedule_group_welcome_mail(group=group, user=user)
+            notify.send(user, recipient=user, verb='welcome', action_object=user)
+
+    @staticmethod
+    def get_profiles(users):
+        profiles = {p.user_id: p for p in UserProfile.objects.filter(user__in=users)}
+        missing = [UserProfile(user=user) for user in {u.id: u for u in users}.values() if user.id not in profiles]
+        for profile in UserProfile.objects.bulk_create(missing):
+            profiles[profile.user_id] = profile
+        return profiles
+
+    def save_profile_fields(self, items):
+        if not self.profile_fields:
+            return
+
+        existing = {(f.user_profile_id, f.profile_field_id): f for f in
+                    UserProfileField.objects.filter(user_profile__in=[profile for _, _, profile in items],
+                                                    profile_field__in=self.profile_fields.values())}
+        to_create = {}
+        to_update = {}
+        for record, user, profile in items:
+            for key, values in record.items():
+                profile_field = self.profile_fields.get(key)
+                if not profile_field:
+                    continue
+
+                item_key = (profile.id, profile_field.id)
+                user_profile_field = existing.get(item_key) or to_create.get(item_key)
+                if user_profile_field:
+                    user_profile_field.profile_field = profile_field
+                    if values.get('forceAccess'):
+                        user_profile_field.read_access = access_id_to_acl(user, values['accessId'])
+                    if item_key in existing:
+                        to_update[item_key] = user_profile_field
+                else:
+                    user_profile_field = UserProfileField(user_profile=profile,
+                                                          profile_field=profile_field,
+                                                          read_access=access_id_to_acl(user, values['accessId']))
+                    to_create[item_key] = user_profile_field
+
+                user_profile_field.value = values['value']
+                user_profile_field.value_list = split_profile_field_value(values['value'])
+                user_profile_field.set_date_field_value()
+
+        UserProfileField.objects.bulk_create(to_create.values())
+        UserProfileField.objects.bulk_update(to_update.values(), ['value', 'value_list', 'value_date', 'read_access'])
@@ -4,7 +4,6 @@ import logging
 from http import HTTPStatus
 
 import pypandoc
-import zipfile
 from datetime import datetime
 
 import qrcode
@@ -30,7 +29,7 @@ from core import config
 from core.auth import oidc_provider_logout_url
 from core.constances import OIDC_PROVIDER_OPTIONS, USER_ROLES
 from core.forms import EditEmailSettingsForm, OnboardingForm, RequestAccessForm
-from core.http import HttpErrorReactPage, NotFoundReact, UnauthorizedReact, ForbiddenReact, file_blocked_response
+from core.http import HttpErrorReactPage, NotFoundReact, UnauthorizedReact, ForbiddenReact, file_blocked_response, file_response
 from core.lib import (get_base_url, get_exportable_content_types, get_model_by_subtype,
                       get_tmp_file_path, is_schema_public, tenant_schema, replace_html_img_src, registration_url, access_id_to_acl)
 from core.mail_builders.site_access_request import schedule_site_access_request_mail
@@ -42,6 +41,7 @@ from core.utils.convert import tiptap_to_html
 from core.utils.export import stream
 from core.utils.mail import EmailSettingsTokenizer, UnsubscribeTokenizer
 from event.lib import get_url
+from file.helpers.compression import stream_zip
 from file.models import FileFolder
 from user.models import User
 
@@ -411,19 +411,14 @@ def export_selected_content(request):
 
     domain = request.tenant.get_primary_domain().domain
 
-    temp_file_path = get_tmp_file_path(user, ".zip")
-    zipf = zipfile.ZipFile(temp_file_path, 'w', zipfile.ZIP_DEFLATED)
-
+    entries = []
     for content_type in exportable_content_types:
         Model = get_model_by_subtype(content_type)
         entities = Model.objects.filter(id__in=content_ids)
-        if entities:
-            csv = stream(entities, Echo(), domain, Model)
-            zipf.writestr('{}-export.csv'.format(content_type), ''.join(csv))
-
-    zipf.close()
+        if entities.exists():
+            entries.append(('{}-export.csv'.format(content_type), stream(entities, Echo(), domain, Model)))
 
-    response = FileResponse(open(temp_file_path, 'rb'))
+    response = StreamingHttpResponse(streaming_content=stream_zip(entries), content_type='application/zip')
     response['Content-Disposition'] = "attachment; filename=content_export.zip"
 
     return response
@@ -521,10 +516,10 @@ def attachment(request, attachment_id, attachment_type=None):
 
         attachment_or_inline = "attachment" if not return_file.mime_type else "inline"
 
-        response = StreamingHttpResponse(streaming_content=return_file.upload.open(), content_type=return_file.mime_type)
-        response['Content-Length'] = return_file.upload.size
-        response['Content-Disposition'] = f"{attachment_or_inline}; filename=%s" % file.title
-        return response
+        return file_response(request, return_file.upload,
+                             content_type=return_file.mime_type,
+                             etag=getattr(return_file, 'checksum', None),
+                             content_disposition=f"{attachment_or_inline}; filename=%s" % file.title)
 
     except ObjectDoesNotExist:
         raise NotFoundReact("File not found")
@@ -1,8 +1,11 @@
+from django.core.cache import cache
 from django.utils import timezone
 from django.utils.text import slugify
 from graphql import GraphQLError
 from core.constances import INVALID_NAME
-from core.lib import get_base_url, early_this_morning
+from core.lib import get_base_url, early_this_morning, tenant_schema
+
+EXPECTED_RANGE_LOCK_TIMEOUT = 600
 
 
 def get_url(obj):
@@ -25,6 +28,10 @@ def validate_name(name):
 
 
 def complement_expected_range(events, offset, limit):
+    complete_ranges(expected_range_until(events, offset, limit), cycle=limit)
+
+
+def expected_range_until(events, offset, limit):
     least_starttime = None
     for start_date in events.values_list('start_date', flat=True)[:offset + limit]:
         if not start_date:
@@ -34,11 +41,29 @@ def complement_expected_range(events, offset, limit):
 
     if not least_starttime:
         least_starttime = early_this_morning(timezone.now() + timezone.timedelta(days=1))
+    return least_starttime
+
 
+def complete_ranges(until, cycle):
     from event.range.sync import complete_range
     from event.models import Event
     for event in Event.objects.filter_range_events():
-        complete_range(event, until=least_starttime, cycle=limit)
+        complete_range(event, until=until, cycle=cycle)
+
+
+def schedule_expected_range(events, offset, limit):
+    """
+    Like complement_expected_range, but leaves creating the missing range
+    events to a background task, so listing events only reads.
+    """
+    until = expected_range_until(events, offset, limit)
+    if cache.add(expected_range_lock_key(until, limit), True, EXPECTED_RANGE_LOCK_TIMEOUT):
+        from event.tasks import complete_expected_ranges
+        complete_expected_ranges.delay(tenant_schema(), until.isoformat(), limit)
+
+
+def expected_range_lock_key(until, cycle):
+    return "%sevent_range_%s_%s" % (tenant_schema(), until.isoformat(), cycle)
 
 
 def mark_events_for_indexing(number_of_events_ahead=None):
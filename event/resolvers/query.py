@@ -2,7 +2,7 @@ from copy import deepcopy
 
 from ariadne import ObjectType
 from core.lib import early_this_morning
-from event.lib import complement_expected_range
+from event.lib import schedule_expected_range
 from event.models import Event
 from django.db.models import Q
 
@@ -42,8 +42,8 @@ def resolve_events(obj, info, filter=None, containerGuid=None, offset=0, limit=2
     else:
         qs = qs.order_by('start_date', 'title')
 
-    complement_expected_range(deepcopy(qs),
-                              offset=offset, limit=limit)
+    schedule_expected_range(deepcopy(qs),
+                            offset=offset, limit=limit)
     edges = qs[offset:offset + limit]
 
     return {
@@ -1,7 +1,10 @@
 from celery import shared_task
+from django.core.cache import cache
+from django.utils import timezone
 from django_tenants.utils import schema_context
 
-from event.lib import complement_expected_range, mark_events_for_indexing
+from event.lib import (complement_expected_range, complete_ranges, expected_range_lock_key,
+                       mark_events_for_indexing)
 from event.models import Event
 
 
@@ -12,3 +15,13 @@ def process_range_events(schema_name):
         complement_expected_range(Event.objects.none(), offset=0, limit=2)
         # Add first two next events to index
         mark_events_for_indexing(number_of_events_ahead=2)
+
+
+@shared_task(ignore_result=True)
+def complete_expected_ranges(schema_name, until, cycle):
+    with schema_context(schema_name):
+        until = timezone.datetime.fromisoformat(until)
+        try:
+            complete_ranges(until, cycle)
+        finally:
+            cache.delete(expected_range_lock_key(until, cycle))
@@ -15,8 +15,8 @@ class TestEntityFilters(Template.TestEntityFiltersTestCase):
     def reference_factory(self, **kwargs):
         return BlogFactory(**kwargs)
 
-    @mock.patch('activity.resolvers.query.complement_expected_range')
-    def test_complement_extended_range_activities(self, complement_expected_range):
+    @mock.patch('activity.resolvers.query.schedule_expected_range')
+    def test_complement_extended_range_activities(self, schedule_expected_range):
         # given.
         query = """query SomeQuery($subtypes: [String]) {
             activities(subtypes: $subtypes) {
@@ -35,10 +35,10 @@ class TestEntityFilters(Template.TestEntityFiltersTestCase):
         self.graphql_client.post(query, variables)
 
         # Then.
-        self.assertTrue(complement_expected_range.called)
+        self.assertTrue(schedule_expected_range.called)
 
-    @mock.patch('activity.resolvers.query.complement_expected_range')
-    def test_complement_extended_range_activities_any(self, complement_expected_range):
+    @mock.patch('activity.resolvers.query.schedule_expected_range')
+    def test_complement_extended_range_activities_any(self, schedule_expected_range):
         # Given.
         query = """query SomeQuery {
             activities {
@@ -54,10 +54,10 @@ class TestEntityFilters(Template.TestEntityFiltersTestCase):
         self.graphql_client.force_login(self.get_owner())
         self.graphql_client.post(query, variables)
 
-        self.assertFalse(complement_expected_range.called)
+        self.assertFalse(schedule_expected_range.called)
 
-    @mock.patch("core.resolvers.query_entities.complement_expected_range")
-    def test_complement_extended_range_entities(self, complement_expected_range):
+    @mock.patch("core.resolvers.query_entities.schedule_expected_range")
+    def test_complement_extended_range_entities(self, schedule_expected_range):
         # given.
         query = """query SomeQuery($subtypes: [String]) {
             entities(subtypes: $subtypes) {
@@ -76,10 +76,10 @@ class TestEntityFilters(Template.TestEntityFiltersTestCase):
         self.graphql_client.post(query, variables)
 
         # Then.
-        self.assertTrue(complement_expected_range.called)
+        self.assertTrue(schedule_expected_range.called)
 
-    @mock.patch("core.resolvers.query_entities.complement_expected_range")
-    def test_complement_extended_range_entities_any(self, complement_expected_range):
+    @mock.patch("core.resolvers.query_entities.schedule_expected_range")
+    def test_complement_extended_range_entities_any(self, schedule_expected_range):
         # given.
         query = """query SomeQuery {
             entities {
@@ -96,10 +96,10 @@ class TestEntityFilters(Template.TestEntityFiltersTestCase):
         self.graphql_client.post(query, variables)
 
         # Then.
-        self.assertFalse(complement_expected_range.called)
+        self.assertFalse(schedule_expected_range.called)
 
-    @mock.patch("event.resolvers.query.complement_expected_range")
-    def test_complement_extended_range_events(self, complement_expected_range):
+    @mock.patch("event.resolvers.query.schedule_expected_range")
+    def test_complement_extended_range_events(self, schedule_expected_range):
         # given.
         query = """query SomeQuery {
             entities {
@@ -116,4 +116,4 @@ class TestEntityFilters(Template.TestEntityFiltersTestCase):
         self.graphql_client.post(query, variables)
 
         # Then.
-        self.assertFalse(complement_expected_range.called)
+        self.assertFalse(schedule_expected_range.called)
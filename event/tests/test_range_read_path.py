@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.timezone import timedelta
+
+from core.constances import ACCESS_TYPE
+from core.tests.helpers import PleioTenantTestCase
+from event.factories import EventFactory
+from event.models import Event
+from event.range.calculator import DailyRange
+from user.factories import UserFactory
+
+
+class TestRangeReadPathTestCase(PleioTenantTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.owner = UserFactory()
+        self.query = """
+            query Events($limit: Int) {
+                events(limit: $limit) {
+                    total
+                    edges {
+                        guid
+                    }
+                }
+            }
+        """
+        self.complete_expected_ranges = mock.patch("event.tasks.complete_expected_ranges.delay").start()
+
+    def tearDown(self):
+        mock.patch.stopall()
+        super().tearDown()
+
+    def create_series(self, amount):
+        start = timezone.now() + timedelta(hours=1)
+        for _ in range(amount):
+            EventFactory(owner=self.owner,
+                         read_access=[ACCESS_TYPE.public],
+                         start_date=start,
+                         end_date=start + timedelta(hours=1),
+                         range_starttime=start,
+                         range_settings={
+                             "type": DailyRange.key,
+                             "interval": 1,
+                         })
+
+    def list_events(self):
+        self.graphql_client.force_login(self.owner)
+        with CaptureQueriesContext(connection) as context:
+            self.graphql_client.post(self.query, {"limit": 20})
+        return len(context.captured_queries)
+
+    def test_listing_events_does_not_create_range_events(self):
+        self.create_series(10)
+        events_before = Event.objects.count()
+
+        self.list_events()
+
+        self.assertEqual(Event.objects.count(), events_before)
+        self.assertTrue(self.complete_expected_ranges.called)
+
+    def test_query_count_does_not_grow_with_series(self):
+        self.create_series(2)
+        few_series = self.list_events()
+
+        self.create_series(10)
+        many_series = self.list_events()
+
+        self.assertEqual(few_series, many_series)
+
+    def test_completion_is_scheduled_once(self):
+        self.create_series(1)
+
+        self.list_events()
+        self.list_events()
+
+        self.assertEqual(self.complete_expected_ranges.call_count, 1)
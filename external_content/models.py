@@ -32,6 +32,9 @@ class ExternalContent(Entity):
     def type_to_string(self):
         return self.source.guid
 
+    def get_subtype(self):
+        return str(self.source_id)
+
     def serialize(self):
         return {}
 
@@ -1,6 +1,11 @@
+import io
 import mimetypes
 import re
+import zipfile
 from os import path
+
+from django.db import connection
+
 from core.lib import get_mimetype
 from file.models import FileFolder
 
@@ -34,11 +39,107 @@ def get_download_filename(f):
     return filename
 
 
-def add_folders_to_zip(zip_file, folders, user, file_path):
+ZIP_READ_CHUNK_SIZE = 1024 * 1024
+
+
+class _ZipChunks(io.RawIOBase):
+    """ Unseekable output for ZipFile that hands out what was written so far """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries, compression=zipfile.ZIP_DEFLATED):
+    """
+    Generate a zip archive chunk by chunk.
+
+    entries is an iterable of (name, content) where content is a file field
+    or an iterable of str or bytes. Files are read in chunks, so memory use
+    does not depend on the size of the archive. Entries use zip64 so files
+    over 4GB are supported.
+    """
+    output = _ZipChunks()
+    with zipfile.ZipFile(output, 'w', compression=compression, allowZip64=True) as zip_file:
+        for name, content in entries:
+            with zip_file.open(name, 'w', force_zip64=True) as target:
+                for chunk in _read_chunks(content):
+                    target.write(chunk)
+                    data = output.drain()
+                    if data:
+                        yield data
+            yield output.drain()
+    yield output.drain()
+
+
+def _read_chunks(content):
+    if hasattr(content, 'open'):
+        with content.open('rb') as file:
+            while True:
+                chunk = file.read(ZIP_READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    else:
+        for chunk in content:
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+
+
+def get_folder_tree_ids(folder_ids):
+    """ Ids of everything below the given folders, in one recursive query """
+    table = FileFolder._meta.db_table
+    pk = FileFolder._meta.pk.column
+    parent = FileFolder._meta.get_field('parent').column
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            WITH RECURSIVE tree(id) AS (
+                SELECT {pk} FROM {table} WHERE {parent} = ANY(%s::uuid[])
+                UNION
+                SELECT child.{pk} FROM {table} child JOIN tree ON child.{parent} = tree.id
+            )
+            SELECT id FROM tree
+        """, [[str(folder_id) for folder_id in folder_ids]])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def folder_zip_entries(folders, user, file_path=''):
+    """
+    (name, upload) for every file in the folders the user can see, with one
+    query for the tree and one for access. Items below a folder the user can not
+    see are left out, just like the folder itself.
+    """
+    folders = list(folders)
+    descendants = FileFolder.objects.visible(user) \
+        .filter(id__in=get_folder_tree_ids([folder.id for folder in folders]),
+                type__in=[FileFolder.Types.FILE, FileFolder.Types.FOLDER]) \
+        .order_by('title')
+
+    children = {}
+    for item in descendants:
+        children.setdefault(item.parent_id, []).append(item)
+
+    def walk(folder, prefix_path):
+        prefix_path = path.join(prefix_path, folder.title)
+        items = children.get(folder.id, [])
+        for item in items:
+            if item.type == FileFolder.Types.FILE:
+                yield path.join(prefix_path, get_download_filename(item)), item.upload
+        for item in items:
+            if item.type == FileFolder.Types.FOLDER:
+                yield from walk(item, prefix_path)
+
     for folder in folders:
-        files = FileFolder.objects.visible(user).filter(parent=folder.id, type=FileFolder.Types.FILE)
-        prefix_path = path.join(file_path, folder.title)
-        for f in files:
-            zip_file.writestr(path.join(prefix_path, get_download_filename(f)), f.upload.read())
-        sub_folders = FileFolder.objects.visible(user).filter(parent=folder.id, type=FileFolder.Types.FOLDER)
-        add_folders_to_zip(zip_file, sub_folders, user, prefix_path)
+        yield from walk(folder, file_path)
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.18 on 2023-06-01 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file', '0016_filereference_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileDownloadCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('downloads', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('file', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='download_count', to='file.filefolder')),
+            ],
+        ),
+    ]
@@ -17,7 +17,7 @@ from core.models.entity import EntityManager
 from core.models.mixin import ModelWithFile, TitleMixin, HasMediaMixin
 from core.models.rich_fields import AttachmentMixin
 from core.models.image import ResizedImageMixin
-from django.db.models import ObjectDoesNotExist
+from django.db.models import F, ObjectDoesNotExist
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.core.files.base import ContentFile
@@ -262,6 +262,22 @@ class FileFolder(HasMediaMixin, TitleMixin, ModelWithFile, ResizedImageMixin, At
             return True
         return False
 
+    def register_download(self):
+        """
+        Record a download without saving the file, so auditlog, the search
+        index and notification cleanup stay off the download path.
+        """
+        self.last_download = timezone.now()
+        FileFolder.objects.filter(id=self.id).update(last_download=self.last_download)
+        FileDownloadCount.objects.increment(self.id)
+
+    @property
+    def downloads(self):
+        try:
+            return self.download_count.downloads
+        except ObjectDoesNotExist:
+            return 0
+
     @property
     def upload_field(self):
         return self.upload
@@ -470,6 +486,27 @@ class FileFolder(HasMediaMixin, TitleMixin, ModelWithFile, ResizedImageMixin, At
         return self.type == self.Types.PAD
 
 
+class FileDownloadCountManager(models.Manager):
+
+    def increment(self, file_id):
+        if self.filter(file_id=file_id).update(downloads=F('downloads') + 1, updated_at=timezone.now()):
+            return
+        _, created = self.get_or_create(file_id=file_id, defaults={'downloads': 1})
+        if not created:
+            self.filter(file_id=file_id).update(downloads=F('downloads') + 1, updated_at=timezone.now())
+
+
+class FileDownloadCount(models.Model):
+    """
+    Kept apart from FileFolder, so counting a download never competes with saving the file
+    """
+    objects = FileDownloadCountManager()
+
+    file = models.OneToOneField('file.FileFolder', on_delete=models.CASCADE, related_name="download_count")
+    downloads = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+
 class ScanIncidentManager(models.Manager):
     def create_from_attachment(self, e, attachment):
         self.create(message=e.feedback,
@@ -48,6 +48,11 @@ def resolve_last_download(obj, info):
     # pylint: disable=unused-argument
     return obj.last_download
 
+@file.field("downloads")
+def resolve_downloads(obj, info):
+    # pylint: disable=unused-argument
+    return obj.downloads
+
 @file.field("thumbnail")
 def resolve_thumbnail(obj, info):
     # pylint: disable=unused-argument
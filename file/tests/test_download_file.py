@@ -1,5 +1,7 @@
 from http import HTTPStatus
+from unittest import mock
 
+from django.db.models.signals import post_save
 from mixer.backend.django import mixer
 
 from core.constances import ACCESS_TYPE
@@ -45,4 +47,72 @@ class DownloadFileTestCase(PleioTenantTestCase):
         self.client.force_login(self.user)
         response = self.client.get("/file/download/{}".format(self.file.id))
         self.assertEqual(response.status_code, HTTPStatus.OK)
-        self.assertTrue(list(response.streaming_content), "Demo upload file.")
\ No newline at end of file
+        self.assertTrue(list(response.streaming_content), "Demo upload file.")
+
+    def test_download_file_registers_download(self):
+        saved = mock.Mock()
+        post_save.connect(saved, sender=FileFolder, weak=False)
+        self.addCleanup(post_save.disconnect, saved, sender=FileFolder)
+
+        self.client.force_login(self.user)
+        for _ in range(2):
+            response = self.client.get("/file/download/{}".format(self.file.id))
+            list(response.streaming_content)
+
+        self.file.refresh_from_db()
+        self.assertIsNotNone(self.file.last_download)
+        self.assertEqual(self.file.downloads, 2)
+        self.assertFalse(saved.called)
+
+    def get_download(self, **headers):
+        self.client.force_login(self.user)
+        return self.client.get("/file/download/{}".format(self.file.id), **headers)
+
+    def test_download_file_etag(self):
+        FileFolder.objects.filter(id=self.file.id).update(checksum='abc123')
+
+        response = self.get_download()
+        self.assertEqual(response['ETag'], '"abc123"')
+
+        response = self.get_download(HTTP_IF_NONE_MATCH='"abc123"')
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertFalse(response.content)
+
+    def test_download_file_range(self):
+        response = self.get_download(HTTP_RANGE='bytes=5-10')
+
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], 'bytes 5-10/17')
+        self.assertEqual(response['Content-Length'], '6')
+        self.assertEqual(b''.join(response.streaming_content), b'upload')
+
+    def test_download_file_suffix_range(self):
+        response = self.get_download(HTTP_RANGE='bytes=-5')
+
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), b'file.')
+
+    def test_download_file_outdated_if_range(self):
+        FileFolder.objects.filter(id=self.file.id).update(checksum='abc123')
+
+        response = self.get_download(HTTP_RANGE='bytes=5-10', HTTP_IF_RANGE='"outdated"')
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), b'Demo upload file.')
+
+    def test_download_file_range_not_satisfiable(self):
+        response = self.get_download(HTTP_RANGE='bytes=100-')
+
+        self.assertEqual(response.status_code, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */17')
+
+    def test_download_file_offload(self):
+        self.override_setting(FILE_OFFLOAD_HEADER='X-Accel-Redirect',
+                              FILE_OFFLOAD_PREFIX='/protected/')
+
+        response = self.get_download()
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response['X-Accel-Redirect'].startswith('/protected/'))
+        self.assertTrue(response['X-Accel-Redirect'].endswith(self.file.upload.name.split('/')[-1]))
+        self.assertFalse(response.content)
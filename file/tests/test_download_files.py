@@ -10,6 +10,7 @@ from core.models import Group
 from tenants.helpers import FastTenantTestCase
 from user.models import User
 
+from ..helpers.compression import stream_zip
 from ..models import FileFolder
 
 
@@ -92,3 +93,56 @@ class DownloadFiles(FastTenantTestCase):
         response = self.client.get(path)
 
         self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_bulk_download_nested_folders(self):
+        subfolder = FileFolder.objects.create(
+            owner=self.authenticatedUser,
+            type=FileFolder.Types.FOLDER,
+            group=self.group,
+            parent=self.folder1,
+            title="subfolder",
+            read_access=[ACCESS_TYPE.public],
+            write_access=[ACCESS_TYPE.user.format(self.authenticatedUser.id)]
+        )
+        hidden_folder = FileFolder.objects.create(
+            owner=self.authenticatedUser,
+            type=FileFolder.Types.FOLDER,
+            group=self.group,
+            parent=self.folder1,
+            title="hidden",
+            read_access=[ACCESS_TYPE.user.format(self.authenticatedUser.id)],
+            write_access=[ACCESS_TYPE.user.format(self.authenticatedUser.id)]
+        )
+        for parent in [subfolder, hidden_folder]:
+            FileFolder.objects.create(
+                owner=self.authenticatedUser,
+                upload=SimpleUploadedFile('nested.csv', b'nested'),
+                type=FileFolder.Types.FILE,
+                group=self.group,
+                parent=parent,
+                read_access=[ACCESS_TYPE.public],
+                write_access=[ACCESS_TYPE.user.format(self.authenticatedUser.id)]
+            )
+        other_user = mixer.blend(User)
+
+        self.client.force_login(other_user)
+        response = self.client.get('/bulk_download?folder_guids[]=' + str(self.folder1.id))
+
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        with ZipFile(io.BytesIO(b''.join(response.streaming_content)), 'r') as zip_file:
+            self.assertEqual(set(zip_file.namelist()), {'folder1/test.csv', 'folder1/subfolder/nested.csv'})
+            self.assertEqual(zip_file.read('folder1/subfolder/nested.csv'), b'nested')
+
+
+class StreamZipTestCase(FastTenantTestCase):
+
+    def test_stream_zip(self):
+        chunks = list(stream_zip([
+            ('text.txt', ['first line\n', 'second line\n']),
+            ('bytes.bin', [b'\x00' * 1024] * 100),
+        ]))
+
+        self.assertGreater(len(chunks), 2)
+        with ZipFile(io.BytesIO(b''.join(chunks)), 'r') as zip_file:
+            self.assertEqual(zip_file.read('text.txt'), b'first line\nsecond line\n')
+            self.assertEqual(zip_file.read('bytes.bin'), b'\x00' * 1024 * 100)
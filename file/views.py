@@ -1,17 +1,15 @@
-import zipfile
+from http import HTTPStatus
 from os import path
 
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import Http404, FileResponse, StreamingHttpResponse
 from django.shortcuts import redirect
-from django.utils import timezone
 from django.views.decorators.cache import cache_control
 
-from core.http import file_blocked_response
-from core.lib import get_tmp_file_path
+from core.http import file_blocked_response, file_response
 from core.models import Entity
 from core.constances import USER_ROLES
-from file.helpers.compression import add_folders_to_zip, get_download_filename
+from file.helpers.compression import folder_zip_entries, get_download_filename, stream_zip
 from file.helpers.images import generate_thumbnail
 from file.models import FileFolder
 
@@ -44,13 +42,16 @@ def download(request, file_id=None, file_name=None):
             else:
                 return redirect(entity.download_url)
 
-        entity.last_download = timezone.now()
-        entity.save()
-
         attachment_or_inline = "attachment" if not return_file.mime_type else "inline"
-        response = StreamingHttpResponse(streaming_content=return_file.upload.open(), content_type=return_file.mime_type)
-        response['Content-Length'] = return_file.upload.size
-        response['Content-Disposition'] = f"{attachment_or_inline}; filename=%s" % get_download_filename(entity)
+        response = file_response(request, return_file.upload,
+                                 content_type=return_file.mime_type,
+                                 etag=getattr(return_file, 'checksum', None),
+                                 content_disposition=f"{attachment_or_inline}; filename=%s" % get_download_filename(entity))
+
+        # Resumed downloads and seeking in media request the rest of the file, count those once
+        if response.status_code == HTTPStatus.OK or response.get('Content-Range', '').startswith('bytes 0-'):
+            entity.register_download()
+
         return response
 
     except (ObjectDoesNotExist, FileNotFoundError):
@@ -85,9 +86,9 @@ def embed(request, file_id=None, file_name=None):
             else:
                 return redirect(entity.embed_url)
 
-        response = StreamingHttpResponse(streaming_content=return_file.upload.open(), content_type=return_file.mime_type)
-        response['Content-Length'] = return_file.upload.size
-        return response
+        return file_response(request, return_file.upload,
+                             content_type=return_file.mime_type,
+                             etag=getattr(return_file, 'checksum', None))
     except (ObjectDoesNotExist, FileNotFoundError):
         raise Http404("File not found")
 
@@ -119,9 +120,9 @@ def featured(request, entity_guid=None):
                 else:
                     return redirect(entity.featured_image_url)
 
-            response = StreamingHttpResponse(streaming_content=return_file.upload.open(), content_type=return_file.mime_type)
-            response['Content-Length'] = return_file.upload.size
-            return response
+            return file_response(request, return_file.upload,
+                                 content_type=return_file.mime_type,
+                                 etag=getattr(return_file, 'checksum', None))
 
     except ObjectDoesNotExist:
         pass
@@ -138,25 +139,21 @@ def bulk_download(request):
     if not file_ids and not folder_ids:
         raise Http404("File not found")
 
-    temp_file_path = get_tmp_file_path(user, ".zip")
-    zipf = zipfile.ZipFile(temp_file_path, 'w', zipfile.ZIP_DEFLATED)
+    entries = []
 
     # Add selected files to zip
     files = FileFolder.objects.visible(user).filter(id__in=file_ids, type=FileFolder.Types.FILE)
     for f in files:
         if f.group and f.group.is_closed and not f.group.is_full_member(user) and not user.has_role(USER_ROLES.ADMIN):
             continue
-        zipf.writestr(path.basename(get_download_filename(f)), f.upload.read())
-        f.last_download = timezone.now()
-        f.save()
+        entries.append((path.basename(get_download_filename(f)), f.upload))
+        f.register_download()
 
     # Add selected folders to zip
     folders = FileFolder.objects.visible(user).filter(id__in=folder_ids, type=FileFolder.Types.FOLDER)
-    add_folders_to_zip(zipf, folders, user, '')
-
-    zipf.close()
+    entries.extend(folder_zip_entries(folders, user))
 
-    response = FileResponse(open(temp_file_path, 'rb'))
+    response = StreamingHttpResponse(streaming_content=stream_zip(entries), content_type='application/zip')
     response['Content-Disposition'] = "attachment; filename=file_contents.zip"
 
     return response
@@ -58,7 +58,7 @@ def resolve_can_choose_best_answer(obj, info):
 @question.field("comments")
 def resolve_comments(obj, info):
     # pylint: disable=unused-argument
-    comments = list(obj.comments.all())
+    comments = list(obj.get_comment_thread())
     if obj.best_answer and config.QUESTIONER_CAN_CHOOSE_BEST_ANSWER:
         try:
             comments.remove(obj.best_answer)
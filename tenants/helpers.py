@@ -1,5 +1,6 @@
 import os
 from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
 from django_tenants.test.cases import FastTenantTestCase as BaseFastTenantTestCase
 from django_tenants.test.client import TenantClient
@@ -20,6 +21,7 @@ class FastTenantTestCase(BaseFastTenantTestCase):
 
     def tearDown(self) -> None:
         mock.patch.stopall()
+        cache.clear()
         super().tearDown()
 
     def create_tenant_folder(self, folder):
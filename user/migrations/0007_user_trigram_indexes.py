@@ -0,0 +1,25 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_user_custom_id'),
+    ]
+
+    operations = [
+        # Created while migrating the public schema, so every tenant schema finds it on the search path.
+        TrigramExtension(),
+        # Match the UPPER(column::text) LIKE UPPER(...) that icontains lookups produce.
+        migrations.RunSQL(
+            sql=[
+                'CREATE INDEX IF NOT EXISTS user_user_name_trgm ON user_user USING gin ((UPPER("name"::text)) gin_trgm_ops)',
+                'CREATE INDEX IF NOT EXISTS user_user_email_trgm ON user_user USING gin ((UPPER("email"::text)) gin_trgm_ops)',
+            ],
+            reverse_sql=[
+                'DROP INDEX IF EXISTS user_user_name_trgm',
+                'DROP INDEX IF EXISTS user_user_email_trgm',
+            ],
+        ),
+    ]
@@ -84,11 +84,12 @@ class UserManager(BaseUserManager):
             users = users.filter(is_active=True)
 
         if q:
-            users = users.filter(
-                Q(name__icontains=q) |
-                Q(email__icontains=q) |
-                Q(id__iexact=q)
-            )
+            q_filter = Q(name__icontains=q) | Q(email__icontains=q)
+            try:
+                q_filter |= Q(id=uuid.UUID(q))
+            except ValueError:
+                pass
+            users = users.filter(q_filter)
 
         if last_online_before:
             users = users.filter(_profile__last_online__lt=last_online_before)